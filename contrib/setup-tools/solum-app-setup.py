@@ -14,27 +14,41 @@
 #    limitations under the License.
 
 """
-Setup everything for a Github-hosted repo to use solum as its CI tool.
+Setup everything for Github-hosted repos to use solum as their CI tool.
+
+All the Github calls go through one pooled HTTP session, and the calls
+for several repos (tokens, deploy keys, webhooks) are made concurrently.
+The setup steps themselves run as a small dependency graph, so steps that
+do not need each other, such as adding deploy keys and creating the
+assembly, overlap.
 """
 
 import argparse
-import base64
+import collections
 import getpass
 import json
 import os
 import random
 import re
 import string
-import tempfile
+import threading
+import time
 
-import httplib2
-import yaml
+import requests
+from requests import adapters
+from six.moves import input
+from six.moves import queue
 
 from solumclient import client as solum_client
+from solumclient.common import exc
+from solumclient.common import parallel
+from solumclient.common import planutils
+from solumclient.common import yamlutils
 from solumclient.openstack.common import cliutils
 
 
 SOLUM_API_VERSION = '1'
+GITHUB_API = 'https://api.github.com'
 CREDENTIALS = {}
 PLAN_TEMPLATE = {"version": 1,
                  "name": "chef",
@@ -58,52 +72,114 @@ def _get_solum_client():
         exit(1)
 
 
-def _get_token(git_url):
-    # Get an OAuth token with the scope of 'repo' for the user
-    if git_url in CREDENTIALS and 'token' in CREDENTIALS[git_url]:
-        return CREDENTIALS[git_url]['token']
+class SetupError(Exception):
+    """A setup step failed."""
+
+
+class GithubError(SetupError):
+    """A call to the Github API failed."""
+
+
+class Github(object):
+    """Calls to the Github API, over one pooled HTTP session.
+
+    The session keeps its connections open, so calls after the first
+    skip the TCP and TLS handshakes, and is safe to share between the
+    threads making calls for several repos.
+    """
+
+    def __init__(self, api_url=GITHUB_API, workers=parallel.DEFAULT_WORKERS):
+        self.api_url = api_url.rstrip('/')
+        self.workers = workers
+        self.session = requests.Session()
+        adapter = adapters.HTTPAdapter(pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def post(self, path, credentials, data):
+        """POST `data` as JSON, authenticated as the owner of credentials.
+
+        :returns: the decoded JSON response
+        :raises: GithubError if the response is not 200 or 201
+        """
+        resp = self.session.post(
+            self.api_url + path, data=json.dumps(data),
+            auth=(credentials['user'], credentials['password']),
+            headers={'Content-Type': 'application/json'})
+        if resp.status_code not in (200, 201):
+            raise GithubError('POST %s returned %s' % (path,
+                                                       resp.status_code))
+        return resp.json()
+
+    def for_each(self, func, items):
+        """Call func(item) for all items concurrently.
 
+        :raises: GithubError listing what failed, once all calls are done
+        """
+        failed = [str(result.error) for result in
+                  parallel.imap(func, items, workers=self.workers)
+                  if result.error is not None]
+        if failed:
+            raise GithubError('\n'.join(failed))
+
+
+def ask_credentials(git_urls):
+    """Ask for the Github user and password of each repo.
+
+    The password of a user is only asked for once, however many of the
+    repos it is given for.
+    """
     repo_pat = re.compile(r'github\.com[:/](.+?)/(.+?)($|/$|\.git$|\.git/$)')
-    match = repo_pat.search(git_url)
-    if match:
-        user_org_name = match.group(1)
-        repo = match.group(2)
-    else:
-        print('Failed parsing %s' % git_url)
-        exit(1)
+    passwords = {}
+    for git_url in git_urls:
+        if git_url in CREDENTIALS:
+            continue
+        match = repo_pat.search(git_url)
+        if match:
+            user_org_name = match.group(1)
+            repo = match.group(2)
+        else:
+            print('Failed parsing %s' % git_url)
+            exit(1)
 
-    full_repo_name = '/'.join([user_org_name, repo])
-    username = raw_input("Username for repo '%s' [%s]: " % (full_repo_name,
+        full_repo_name = '/'.join([user_org_name, repo])
+        username = input("Username for repo '%s' [%s]: " % (full_repo_name,
                                                             user_org_name))
-    if not username:
-        username = user_org_name
-    password = getpass.getpass("Password: ")
-    # TODO(james_li): add support for two-factor auth
-    CREDENTIALS[git_url] = {}
-    CREDENTIALS[git_url]['user'] = username
-    CREDENTIALS[git_url]['password'] = password
-    CREDENTIALS[git_url]['full_repo'] = full_repo_name
-
-    http = httplib2.Http()
-    auth = base64.encodestring(username + ':' + password)
-    headers = {'Authorization': 'Basic ' + auth,
-               'Content-Type': 'application/json'}
+        if not username:
+            username = user_org_name
+        if username not in passwords:
+            passwords[username] = getpass.getpass("Password: ")
+        # TODO(james_li): add support for two-factor auth
+        CREDENTIALS[git_url] = {}
+        CREDENTIALS[git_url]['user'] = username
+        CREDENTIALS[git_url]['password'] = passwords[username]
+        CREDENTIALS[git_url]['full_repo'] = full_repo_name
+
+
+def _get_token(github, git_url):
+    # Get an OAuth token with the scope of 'repo' for the user
+    if 'token' in CREDENTIALS[git_url]:
+        return CREDENTIALS[git_url]['token']
+
     # 'note' field has to be unique
-    note = 'Solum-status-' + ''.join(random.sample(string.lowercase, 5))
+    note = 'Solum-status-' + ''.join(random.sample(string.ascii_lowercase,
+                                                   5))
     data = {'scopes': 'repo', 'note': note}
+    try:
+        content = github.post('/authorizations', CREDENTIALS[git_url], data)
+    except GithubError as ex:
+        raise GithubError('Failed to get token from Github for %s: %s' %
+                          (git_url, ex))
+    CREDENTIALS[git_url]['token'] = str(content['token'])
+    return CREDENTIALS[git_url]['token']
 
-    # TODO(james_li): make the url configurable
-    resp, content = http.request('https://api.github.com/authorizations',
-                                 'POST', headers=headers,
-                                 body=json.dumps(data))
 
-    if resp['status'] == '201' or resp['status'] == '200':
-        content_dict = json.loads(content)
-        CREDENTIALS[git_url]['token'] = str(content_dict['token'])
-        return CREDENTIALS[git_url]['token']
-    else:
-        print('Failed to get token from Github')
-        exit(1)
+def get_tokens(github, git_urls):
+    """Get the OAuth token of each repo, all at the same time."""
+    ask_credentials(git_urls)
+    github.for_each(lambda git_url: _get_token(github, git_url), git_urls)
+    return dict((git_url, CREDENTIALS[git_url]['token'])
+                for git_url in git_urls)
 
 
 def _filter_trigger_url(url):
@@ -117,45 +193,40 @@ def _filter_trigger_url(url):
     return filtered_url
 
 
-def get_planfile(git_uri, app_name, cmd, public):
+def get_plan(git_uris, app_name, cmd, public):
     plan_dict = dict.copy(PLAN_TEMPLATE)
     plan_dict['name'] = app_name
-    plan_dict['description'] = git_uri  # Put repo uri as plan desc.
-    arti = {"name": "chef", "artifact_type": "chef",
-            "content": {}, "language_pack": "auto"}
-    arti['content']['href'] = git_uri
-    if not public:
-        arti['content']['private'] = True
-    arti['unittest_cmd'] = cmd
-    plan_dict['artifacts'].append(arti)
-
-    # Create a Github token and insert it into plan file
+    plan_dict['description'] = ' '.join(git_uris)  # Repo uris as plan desc.
+    plan_dict['artifacts'] = []
+    for git_uri in git_uris:
+        arti = {"name": "chef", "artifact_type": "chef",
+                "content": {}, "language_pack": "auto"}
+        arti['content']['href'] = git_uri
+        if not public:
+            arti['content']['private'] = True
+        arti['unittest_cmd'] = cmd
+        plan_dict['artifacts'].append(arti)
+    return plan_dict
+
+
+def create_plan(client, plan_dict, tokens):
+    # Insert the Github token of each repo into the plan
     for arti in plan_dict['artifacts']:
-        arti['status_token'] = _get_token(arti['content']['href'])
-    plan_file = tempfile.NamedTemporaryFile(suffix='.yaml',
-                                            prefix='solum_',
-                                            delete=False)
-    plan_file.write(yaml.dump(plan_dict, default_flow_style=False))
-    plan_file_name = plan_file.name
-    plan_file.close()
-    return plan_file_name
-
-
-def create_plan(client, plan_file):
-    cmd = ['solum', 'app', 'create', plan_file]
-    print(' '.join(cmd))
-    with open(plan_file) as definition_file:
-        definition = definition_file.read()
+        arti['status_token'] = tokens[arti['content']['href']]
+    print('solum app create (plan %s)' % plan_dict['name'])
+    try:
+        planutils.validate(plan_dict)
+    except exc.PlanValidationError as ex:
+        raise SetupError('Error in plan: %s' % ex)
 
-    plan = client.plans.create(definition)
+    plan = client.plans.create(yamlutils.dump(plan_dict))
     fields = ['uuid', 'name', 'description', 'uri']
     data = dict([(f, getattr(plan, f, ''))
                  for f in fields])
     cliutils.print_dict(data, wrap=72)
 
     if data['uri'] is None:
-        print('Error: no uri found in plan creation')
-        exit(1)
+        raise SetupError('Error: no uri found in plan creation')
 
     # get public keys in the case of private repos
     artifacts = getattr(plan, 'artifacts', [])
@@ -180,123 +251,201 @@ def create_assembly(client, app_name, plan_uri):
 
     trigger_uri = data['trigger_uri']
     if trigger_uri is None:
-        print('Error in trigger uri')
-        exit(1)
+        raise SetupError('Error in trigger uri')
 
     return trigger_uri
 
 
-def create_webhook(trigger_uri):
-    # Create github web hooks for pull requests
-    for key in CREDENTIALS.keys():
-        user = CREDENTIALS[key]['user']
-        password = CREDENTIALS[key]['password']
-        auth = base64.encodestring(user + ':' + password)
-        http = httplib2.Http()
-        # TODO(james_li): make this url configurable
-        github_url = ('https://api.github.com/repos/%s/hooks' %
-                      CREDENTIALS[key]['full_repo'])
-        headers = {'Authorization': 'Basic ' + auth,
-                   'Content-Type': 'application/json'}
+def create_webhook(github, trigger_uri):
+    # Create github web hooks for pull requests, on all repos at once
+    def create_one(key):
         data = {'name': 'web',
                 'events': ['pull_request', 'commit_comment'],
                 'config': {'content_type': 'json',
                            'url': trigger_uri}}
+        try:
+            github.post('/repos/%s/hooks' % CREDENTIALS[key]['full_repo'],
+                        CREDENTIALS[key], data)
+        except GithubError as ex:
+            raise GithubError("Failed to create web hooks (%s). Make sure "
+                              "you have access to repo '%s'" % (ex, key))
 
-        resp, _ = http.request(github_url, 'POST',
-                               headers=headers,
-                               body=json.dumps(data))
-
-        if resp['status'] != '201' and resp['status'] != '200':
-            print("Failed to create web hooks")
-            print("Make sure you have access to repo '%s'" % key)
-            exit(1)
+    github.for_each(create_one, list(CREDENTIALS.keys()))
 
 
-def add_ssh_keys(args):
+def add_ssh_keys(github, args):
     if args.public:
         return
 
-    # add public keys
-    for key in CREDENTIALS.keys():
-        if ('pub_key' in CREDENTIALS[key] and
-                CREDENTIALS[key]['pub_key'] is not None):
-            user = CREDENTIALS[key]['user']
-            password = CREDENTIALS[key]['password']
-            auth = base64.encodestring(user + ':' + password)
-            http = httplib2.Http()
+    # add public keys, to all repos at once
+    def add_one(key):
+        if args.user_key:
+            path = '/user/keys'
+        else:
+            path = '/repos/%s/keys' % CREDENTIALS[key]['full_repo']
+        data = {'title': 'devops@Solum',
+                'key': CREDENTIALS[key]['pub_key']}
+        try:
+            github.post(path, CREDENTIALS[key], data)
+        except GithubError as ex:
             if args.user_key:
-                # TODO(james_li): make the url configurable
-                github_url = 'https://api.github.com/user/keys'
-            else:
-                github_url = ('https://api.github.com/repos/%s/keys' %
-                              CREDENTIALS[key]['full_repo'])
-            headers = {'Authorization': 'Basic ' + auth,
-                       'Content-Type': 'application/json'}
-            data = {'title': 'devops@Solum',
-                    'key': CREDENTIALS[key]['pub_key']}
-
-            resp, _ = http.request(github_url, 'POST',
-                                   headers=headers,
-                                   body=json.dumps(data))
+                raise GithubError("Failed to add a ssh key to the account "
+                                  "%s: %s" % (CREDENTIALS[key]['user'], ex))
+            raise GithubError("Failed to add a deploy key to the repo %s: "
+                              "%s" % (key, ex))
 
-            if resp['status'] != '201' and resp['status'] != '200':
-                if args.user_key:
-                    print("Failed to add a ssh key to the account %s" % user)
-                else:
-                    print("Failed to add a deploy key to the repo %s" % key)
-                exit(1)
+    github.for_each(add_one, [key for key in CREDENTIALS.keys()
+                              if CREDENTIALS[key].get('pub_key')])
 
 
 def validate_args(args):
-    if len(args.command) == 0 or len(args.git_uri) == 0:
+    if len(args.command) == 0 or not args.git_uris:
         print("Please input for --test-cmd and --git-uri")
         exit(1)
 
-    # try to use a correct git uri
+    # try to use correct git uris
     pat = re.compile(r'github\.com[:/](.+?)/(.+?)($|/.*$|\.git$|\.git/.*$)')
-    match = pat.search(args.git_uri)
-    if match:
+    correct_uris = []
+    for git_uri in args.git_uris:
+        match = pat.search(git_uri)
+        if not match:
+            print("The input git uri %s seems not right" % git_uri)
+            if args.public:
+                print("The correct format is: "
+                      "https://github.com/<USER>/<REPO>")
+            else:
+                print("The correct format is: "
+                      "git@github.com:<USER>/<REPO>.git")
+            exit(1)
         user_org_name = match.group(1)
         repo = match.group(2)
         if args.public:
             correct_uri = 'https://github.com/%s/%s' % (user_org_name, repo)
         else:
             correct_uri = 'git@github.com:%s/%s.git' % (user_org_name, repo)
-        return correct_uri
-    else:
-        print("The input git uri seems not right")
-        if args.public:
-            print("The correct format is: https://github.com/<USER>/<REPO>")
+        if correct_uri not in correct_uris:
+            correct_uris.append(correct_uri)
+    return correct_uris
+
+
+# A setup step: func is called with a dict of the results of the steps
+# done so far, once all the steps it requires are done.
+Step = collections.namedtuple('Step', ['name', 'func', 'requires'])
+
+# A step run: when it started, in seconds since the first step did, and
+# how long it took.
+Timing = collections.namedtuple('Timing', ['name', 'start', 'seconds'])
+
+
+def run_steps(steps):
+    """Run each step in a thread of its own once its requirements are done.
+
+    :returns: the dict of the results of the steps, by name, and the list
+        of their :class:`Timing`, in the order they ended
+    :raises: the error of the first step that failed, once the steps
+        already started are done; steps requiring it are not started
+    """
+    finished = queue.Queue()
+    origin = time.time()
+
+    def run_one(step, done):
+        start = time.time()
+        try:
+            value, error = step.func(done), None
+        except Exception as ex:
+            value, error = None, ex
+        finished.put((step, value, error,
+                      Timing(step.name, start - origin, time.time() - start)))
+
+    results = {}
+    timings = []
+    pending = list(steps)
+    running = 0
+    error = None
+    while True:
+        if error is None:
+            for step in [s for s in pending
+                         if all(name in results for name in s.requires)]:
+                pending.remove(step)
+                thread = threading.Thread(target=run_one,
+                                          args=(step, dict(results)))
+                thread.daemon = True
+                thread.start()
+                running += 1
+        if not running:
+            break
+        try:
+            # A timeout keeps the wait interruptible by ^C on Python 2.
+            step, value, step_error, timing = finished.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        running -= 1
+        timings.append(timing)
+        if step_error is not None:
+            error = error or step_error
         else:
-            print("The correct format is: git@github.com:<USER>/<REPO>.git")
-        exit(1)
+            results[step.name] = value
+    if error is not None:
+        raise error
+    if pending:
+        raise SetupError('Steps never ready: %s' %
+                         ', '.join(step.name for step in pending))
+    return results, timings
+
+
+def setup_steps(client, github, args, git_uris):
+    """Return the steps setting up the repos at `git_uris` with solum."""
+    plan_dict = get_plan(git_uris, args.app_name, args.command, args.public)
+    return [
+        Step('tokens', lambda done: get_tokens(github, git_uris), ()),
+        Step('plan',
+             lambda done: create_plan(client, plan_dict, done['tokens']),
+             ('tokens',)),
+        Step('ssh keys', lambda done: add_ssh_keys(github, args), ('plan',)),
+        Step('assembly',
+             lambda done: create_assembly(client, args.app_name,
+                                          done['plan']),
+             ('plan',)),
+        Step('webhooks',
+             lambda done: create_webhook(
+                 github, _filter_trigger_url(done['assembly'])),
+             ('assembly',)),
+    ]
+
+
+def print_timings(timings):
+    print('Step timings:')
+    for timing in sorted(timings, key=lambda t: t.start):
+        print('  %-10s started at %6.2fs, took %6.2fs' % timing)
+    total = max(t.start + t.seconds for t in timings)
+    print('  %-10s %6.2fs' % ('total', total))
 
 
 def main(args):
-    git_uri = validate_args(args)
+    git_uris = validate_args(args)
     client = _get_solum_client()
-    plan_file = get_planfile(git_uri, args.app_name, args.command, args.public)
+    github = Github(args.github_api, workers=args.workers)
+    # Ask for all the credentials before anything runs.
+    ask_credentials(git_uris)
     print('\n')
     print("************************* Starting setup *************************")
     print('\n')
-    plan_uri = create_plan(client, plan_file)
-    add_ssh_keys(args)
     try:
-        os.remove(plan_file)
-    except OSError:
-        print('Cannot remove %s. Skip and move forward...' % plan_file)
-
-    trigger_uri = create_assembly(client, args.app_name, plan_uri)
-    create_webhook(_filter_trigger_url(trigger_uri))
+        _, timings = run_steps(setup_steps(client, github, args,
+                                           git_uris))
+    except SetupError as ex:
+        print(ex)
+        exit(1)
+    print_timings(timings)
     print('Successfully created Solum plan, assembly and webhooks!')
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('app_name', help="app name")
-    parser.add_argument('--git-uri', required=True, dest='git_uri',
-                        help="git repo uri")
+    parser.add_argument('--git-uri', required=True, dest='git_uris',
+                        action='append',
+                        help="git repo uri; repeat for each repo of the app")
     parser.add_argument('--test-cmd', required=True, dest='command',
                         help="entrypoint to run tests")
     parser.add_argument('--public', action='store_true', default=False,
@@ -305,6 +454,14 @@ if __name__ == '__main__':
                         dest='user_key', help="add SSH key to the user account"
                                               " rather than the repo,"
                                               " defaults to False")
+    parser.add_argument('--github-api', default=GITHUB_API,
+                        dest='github_api',
+                        help="Github API url, defaults to %s" % GITHUB_API)
+    parser.add_argument('--workers', type=int,
+                        default=parallel.DEFAULT_WORKERS,
+                        help="number of Github calls to make at the same"
+                             " time, defaults to %d" %
+                             parallel.DEFAULT_WORKERS)
 
     args = parser.parse_args()
     main(args)
@@ -12,8 +12,22 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import pbr.version
+import sys
 
 
-__version__ = pbr.version.VersionInfo(
-    'python-solumclient').version_string()
+def _version_string():
+    # pbr.version pulls in pkg_resources, which costs more than the rest of
+    # the CLI put together, so it is only imported when the version is read.
+    import pbr.version
+    return pbr.version.VersionInfo('python-solumclient').version_string()
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name == '__version__':
+            globals()['__version__'] = _version_string()
+            return globals()['__version__']
+        raise AttributeError("module %r has no attribute %r" %
+                             (__name__, name))
+else:
+    __version__ = _version_string()
@@ -12,7 +12,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from solumclient.common import auth
 from solumclient.common import client
 from solumclient.openstack.common.apiclient import client as api_client
 
@@ -22,26 +21,22 @@ VERSION_MAP = {
 }
 
 
-def Client(version, **kwargs):
+def Client(version, http_client=None, **kwargs):
     client_class = api_client.BaseClient.get_class(API_NAME, version,
                                                    VERSION_MAP)
-    keystone_auth = auth.KeystoneAuthPlugin(
-        username=kwargs.get('username'),
-        password=kwargs.get('password'),
-        tenant_name=kwargs.get('tenant_name'),
-        token=kwargs.get('token'),
-        auth_url=kwargs.get('auth_url'),
-        endpoint=kwargs.get('endpoint'))
-    http_client = client.HTTPClient(keystone_auth)
+    if http_client is None:
+        http_client = client.make_http_client(**kwargs)
     return client_class(http_client)
 
 
-def get_client(api_version, **kwargs):
+def get_client(api_version, http_client=None, **kwargs):
     """Get an authtenticated client.
 
     This is based on the credentials in the keyword args.
 
     :param api_version: the API version to use
+    :param http_client: optional HTTPClient of another client to share;
+            the credentials are then ignored
     :param kwargs: keyword args containing credentials, either:
             * os_auth_token: pre-existing token to re-use
             * endpoint: solum API endpoint
@@ -60,4 +55,4 @@ def get_client(api_version, **kwargs):
         'endpoint': kwargs.get('solum_url')
     }
 
-    return Client(api_version, **cli_kwargs)
+    return Client(api_version, http_client=http_client, **cli_kwargs)
@@ -12,8 +12,147 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+import json
+import os
+import threading
+import time
+
+import six
+
 from solumclient.common import base as solum_base
+from solumclient.common import exc
+from solumclient.common import parallel
+from solumclient.common import polling
+from solumclient.common import yamlutils
 from solumclient.openstack.common.apiclient import base as apiclient_base
+from solumclient.openstack.common.apiclient import exceptions
+
+
+READY = 'READY'
+
+# Seconds wait_for() and watch() wait in total. Building a language pack
+# image takes longer than deploying an assembly.
+DEFAULT_WAIT_TIMEOUT = 1800
+
+# An image seen in a new state; `previous` is None the first time it is
+# seen.
+StateChange = collections.namedtuple('StateChange', ['image', 'previous'])
+
+# Responses asking the client to slow down, how many times a request is
+# retried after one, and the seconds waited before the first retry when
+# the server gives no Retry-After.
+THROTTLED_STATUSES = (429, 503)
+MAX_RETRIES = 5
+RETRY_DELAY = 1
+MAX_RETRY_DELAY = 60
+
+# A language pack to build, as listed in a manifest.
+BuildSpec = collections.namedtuple('BuildSpec',
+                                   ['name', 'source_uri', 'lp_metadata'])
+
+
+class Build(collections.namedtuple('Build', ['spec', 'image', 'error',
+                                             'started', 'finished'])):
+    """The outcome of building a :class:`BuildSpec`.
+
+    `image` is None if the build could not be submitted, and `error` then
+    says why. `error` is also set on a build submitted but not seen to
+    end because following the builds failed. `started` and `finished` are
+    the times the build was submitted and seen to end; `finished` is None
+    until it ends.
+    """
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        """Seconds the build took, or None if it has not ended."""
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+def _settled(state, states):
+    return state in states or polling.is_failed(state)
+
+
+def load_manifest(path):
+    """Read the language packs to build listed in a YAML manifest.
+
+    The manifest is a list of mappings, each with a name, a git_url and
+    optionally lp_metadata: either the metadata as a mapping, or the path
+    of a JSON file holding it, relative to the manifest.
+
+    :returns: list of :class:`BuildSpec`
+    :raises: ValueError if the manifest or a metadata file is not valid,
+        IOError if one cannot be read
+    """
+    with open(path) as manifest:
+        entries = yamlutils.load(manifest.read())
+    if not isinstance(entries, list):
+        raise ValueError('The manifest is not a list of language packs.')
+    specs = []
+    for number, entry in enumerate(entries, 1):
+        if (not isinstance(entry, dict) or not entry.get('name') or
+                not entry.get('git_url')):
+            raise ValueError('Entry %d of the manifest has no name or no '
+                             'git_url.' % number)
+        metadata = entry.get('lp_metadata')
+        if isinstance(metadata, six.string_types):
+            metadata_path = os.path.join(os.path.dirname(path), metadata)
+            with open(metadata_path) as metadata_file:
+                try:
+                    metadata = json.load(metadata_file)
+                except ValueError as e:
+                    raise ValueError('Error in language pack file %s: %s' %
+                                     (metadata_path, e))
+        if metadata is not None:
+            metadata = json.dumps(metadata)
+        specs.append(BuildSpec(entry['name'], entry['git_url'], metadata))
+    return specs
+
+
+class _Throttle(object):
+    """Limits concurrent requests, adapting to the server pushing back.
+
+    Up to `limit` requests run at once. A 429 or 503 response halves the
+    limit, and the request is retried after the server's Retry-After or a
+    delay doubling at each retry; it keeps its slot while it waits. Each
+    success raises the limit by one again, up to `limit`.
+    """
+
+    def __init__(self, limit):
+        self.max_limit = self.limit = limit
+        self.running = 0
+        self.condition = threading.Condition()
+
+    def call(self, func, **kwargs):
+        delay = RETRY_DELAY
+        retries = 0
+        while True:
+            with self.condition:
+                while self.running >= self.limit:
+                    self.condition.wait()
+                self.running += 1
+            try:
+                result = func(**kwargs)
+            except exceptions.HttpError as e:
+                if (e.http_status not in THROTTLED_STATUSES or
+                        retries >= MAX_RETRIES):
+                    raise
+                with self.condition:
+                    self.limit = max(1, self.limit // 2)
+                retries += 1
+                time.sleep(getattr(e, 'retry_after', 0) or delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+            else:
+                with self.condition:
+                    self.limit = min(self.limit + 1, self.max_limit)
+                return result
+            finally:
+                with self.condition:
+                    self.running -= 1
+                    self.condition.notify_all()
 
 
 class Image(apiclient_base.Resource):
@@ -31,3 +170,129 @@ class ImageManager(solum_base.CrudManager):
 
     def get(self, **kwargs):
         return super(ImageManager, self).get(base_url="/v1", **kwargs)
+
+    def watch(self, images, states=(READY,), timeout=DEFAULT_WAIT_TIMEOUT,
+              workers=parallel.DEFAULT_WORKERS):
+        """Follow image builds until each reaches one of `states` or fails.
+
+        On each poll the images still building are fetched together, up
+        to `workers` at a time, throttled as :meth:`build_many` submits
+        builds. Polls back off as :class:`polling.Poller` does while no
+        state changes.
+
+        :param images: uuids or :class:`Image` objects; an image given
+            more than once is followed once
+        :param states: states to wait for; failed states (see
+            :func:`polling.is_failed`) end the wait too
+        :param timeout: seconds to wait for all of them
+        :returns: generator of :class:`StateChange`, one each time an image
+            is fetched in a state it was not in before
+        :raises: exc.WaitTimeout once `timeout` has passed, holding the
+            images still building
+        """
+        throttle = _Throttle(workers)
+
+        def get_one(uuid):
+            return throttle.call(self.get, image_id=uuid)
+
+        pending = []
+        for uuid in (getattr(i, 'uuid', i) for i in images):
+            if uuid not in pending:
+                pending.append(uuid)
+        last_seen = {}
+        poller = polling.Poller(timeout)
+        while True:
+            changed = False
+            for result in parallel.imap(get_one, list(pending),
+                                        workers=workers):
+                if result.error is not None:
+                    raise result.error
+                found = result.value
+                state = getattr(found, 'state', None)
+                previous = getattr(last_seen.get(result.item), 'state', None)
+                if result.item not in last_seen or previous != state:
+                    changed = True
+                    yield StateChange(found, previous)
+                last_seen[result.item] = found
+                if _settled(state, states):
+                    pending.remove(result.item)
+            if not pending:
+                return
+            if not poller.wait(changed):
+                raise exc.WaitTimeout([last_seen.get(uuid, uuid)
+                                       for uuid in pending])
+
+    def wait_for(self, image, states=(READY,), timeout=DEFAULT_WAIT_TIMEOUT):
+        """Wait for one image build to reach one of `states` or to fail.
+
+        :param image: uuid or :class:`Image`
+        :returns: the :class:`Image` as last fetched
+        :raises: exc.WaitTimeout as :meth:`watch` does
+        """
+        for change in self.watch([image], states=states, timeout=timeout):
+            image = change.image
+        return image
+
+    def build_many(self, specs, workers=parallel.DEFAULT_WORKERS,
+                   states=(READY,), timeout=DEFAULT_WAIT_TIMEOUT,
+                   on_change=None):
+        """Build many images: submit them all, then follow them to the end.
+
+        Builds are submitted up to `workers` at a time. A 429 or 503
+        response halves how many are submitted at once, and the build is
+        retried after the server's Retry-After or a growing delay; each
+        success lets one more through again. Once all are submitted, the
+        builds are followed in one :meth:`watch` loop.
+
+        :param specs: iterable of :class:`BuildSpec`
+        :param states: as for :meth:`watch`
+        :param timeout: seconds to follow the builds for once submitted;
+            builds still going then are returned unfinished. If following
+            the builds fails, e.g. on an error fetching one of them, those
+            still going are returned unfinished with that error.
+        :param on_change: optional callable given each
+            :class:`StateChange` as the builds are followed
+        :returns: list of :class:`Build`, one per spec in input order
+        """
+        throttle = _Throttle(workers)
+
+        def submit(spec):
+            image = throttle.call(self.create, name=spec.name,
+                                  source_uri=spec.source_uri,
+                                  lp_metadata=spec.lp_metadata)
+            return image, time.time()
+
+        builds = []
+        for result in parallel.imap(submit, specs, workers=workers):
+            if result.error is not None:
+                builds.append(Build(result.item, None, result.error, None,
+                                    None))
+            else:
+                image, started = result.value
+                builds.append(Build(result.item, image, None, started, None))
+
+        index_of = dict((build.image.uuid, index)
+                        for index, build in enumerate(builds)
+                        if build.image is not None)
+        try:
+            for change in self.watch([build.image for build in builds
+                                      if build.image is not None],
+                                     states=states, timeout=timeout,
+                                     workers=workers):
+                index = index_of[change.image.uuid]
+                finished = None
+                if _settled(change.image.state, states):
+                    finished = time.time()
+                builds[index] = builds[index]._replace(image=change.image,
+                                                       finished=finished)
+                if on_change is not None:
+                    on_change(change)
+        except exc.WaitTimeout:
+            # The builds still going are left unfinished.
+            pass
+        except Exception as e:
+            # Keep what is known of every build, uuids included.
+            builds = [build._replace(error=e)
+                      if build.image is not None and build.finished is None
+                      else build for build in builds]
+        return builds
@@ -12,7 +12,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from solumclient.common import auth
+from solumclient.builder import client as builder_client
 from solumclient.common import client
 from solumclient.openstack.common.apiclient import client as api_client
 
@@ -22,26 +22,22 @@ VERSION_MAP = {
 }
 
 
-def Client(version, **kwargs):
+def Client(version, http_client=None, **kwargs):
     client_class = api_client.BaseClient.get_class(API_NAME, version,
                                                    VERSION_MAP)
-    keystone_auth = auth.KeystoneAuthPlugin(
-        username=kwargs.get('username'),
-        password=kwargs.get('password'),
-        tenant_name=kwargs.get('tenant_name'),
-        token=kwargs.get('token'),
-        auth_url=kwargs.get('auth_url'),
-        endpoint=kwargs.get('endpoint'))
-    http_client = client.HTTPClient(keystone_auth)
+    if http_client is None:
+        http_client = client.make_http_client(**kwargs)
     return client_class(http_client)
 
 
-def get_client(api_version, **kwargs):
+def get_client(api_version, http_client=None, **kwargs):
     """Get an authtenticated client.
 
     This is based on the credentials in the keyword args.
 
     :param api_version: the API version to use
+    :param http_client: optional HTTPClient of another client to share;
+            the credentials are then ignored
     :param kwargs: keyword args containing credentials, either:
             * os_auth_token: pre-existing token to re-use
             * endpoint: solum API endpoint
@@ -60,4 +56,21 @@ def get_client(api_version, **kwargs):
         'endpoint': kwargs.get('solum_url')
     }
 
-    return Client(api_version, **cli_kwargs)
+    return Client(api_version, http_client=http_client, **cli_kwargs)
+
+
+def get_clients(api_version, **kwargs):
+    """Get authenticated clients of the Solum and builder APIs.
+
+    Both share one HTTPClient: the token is fetched once, the endpoint of
+    each API is looked up in the same service catalog, and requests go
+    through one pool of connections.
+
+    :param api_version: the API version to use
+    :param kwargs: credentials, as for :func:`get_client`
+    :returns: dict of the clients by API name, 'solum' and 'builder'
+    """
+    solum = get_client(api_version, **kwargs)
+    builder = builder_client.get_client(
+        api_version, http_client=solum.http_client, **kwargs)
+    return {API_NAME: solum, builder_client.API_NAME: builder}
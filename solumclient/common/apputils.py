@@ -0,0 +1,205 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+The state of applications, put together from the Solum v1 collections.
+
+An application is a plan with what was made from it: the assemblies
+deployed from the plan, their components, and the plan's pipelines. The
+four collections are listed concurrently, once each, and joined here by
+a :class:`ResourceIndex` keyed on plan uuid and assembly uuid.
+"""
+
+import collections
+
+import six
+
+from solumclient.common import parallel
+from solumclient.v1 import assembly as v1_assembly
+
+# Client managers listed to build the status of applications.
+COLLECTIONS = ('plans', 'assemblies', 'components', 'pipelines')
+
+READY = v1_assembly.READY
+FAILED = 'FAILED'
+IN_PROGRESS = 'IN PROGRESS'
+NOT_DEPLOYED = 'NOT DEPLOYED'
+
+AppStatus = collections.namedtuple(
+    'AppStatus', ['name', 'uuid', 'state', 'assemblies', 'components',
+                  'pipelines'])
+
+
+def uuid_from_uri(uri):
+    """Return the uuid ending a resource URI such as a plan_uri."""
+    return (uri or '').rstrip('/').split('/')[-1]
+
+
+def list_all(client):
+    """List the :data:`COLLECTIONS` concurrently.
+
+    :returns: dict of the resources listed, by collection name
+    :raises: the error of the first collection that could not be listed
+    """
+    def list_one(name):
+        return list(getattr(client, name).list())
+
+    # Authenticate once here rather than in each thread.
+    http_client = getattr(client, 'http_client', None)
+    if http_client is not None and not http_client.cached_token:
+        http_client.authenticate()
+
+    listed = {}
+    for result in parallel.imap(list_one, COLLECTIONS,
+                                workers=len(COLLECTIONS)):
+        if result.error is not None:
+            raise result.error
+        listed[result.item] = result.value
+    return listed
+
+
+def _plan_uuid(resource):
+    return uuid_from_uri(getattr(resource, 'plan_uri', None))
+
+
+def _assembly_uuid(resource):
+    return getattr(resource, 'assembly_uuid', None)
+
+
+# The collections indexed under a parent, with how to get the uuid of the
+# parent (a plan, or an assembly for components) from a resource.
+RELATIONS = {
+    'assemblies': _plan_uuid,
+    'components': _assembly_uuid,
+    'pipelines': _plan_uuid,
+}
+
+
+class ResourceIndex(object):
+    """Plans, assemblies, components and pipelines, indexed by uuid.
+
+    Each resource is also indexed under its parent: assemblies and
+    pipelines under the uuid of their plan, components under the uuid of
+    their assembly. The index is built in one pass over each collection,
+    and is kept up to date with :meth:`add` and :meth:`remove` as
+    resources are created and deleted.
+
+    Removing a resource leaves its children indexed, as they are until
+    the server deletes them too.
+    """
+
+    def __init__(self, plans=(), assemblies=(), components=(),
+                 pipelines=()):
+        self._resources = dict((name, {}) for name in COLLECTIONS)
+        self._children = dict((name, {}) for name in RELATIONS)
+        for name, resources in zip(COLLECTIONS, (plans, assemblies,
+                                                 components, pipelines)):
+            for resource in resources:
+                self.add(name, resource)
+
+    @classmethod
+    def from_client(cls, client):
+        """Return the index of all the resources `client` can list."""
+        return cls(**list_all(client))
+
+    def add(self, collection, resource):
+        """Index a resource of `collection`, e.g. one just created.
+
+        A resource with the same uuid is replaced.
+        """
+        resources = self._resources[collection]
+        if resource.uuid in resources:
+            self.remove(collection, resource.uuid)
+        resources[resource.uuid] = resource
+        if collection in RELATIONS:
+            parent_uuid = RELATIONS[collection](resource)
+            self._children[collection].setdefault(
+                parent_uuid, []).append(resource)
+
+    def remove(self, collection, resource):
+        """Remove a resource, or the uuid of one, from the index.
+
+        :returns: the resource removed, or None if it was not indexed
+        """
+        uuid = getattr(resource, 'uuid', resource)
+        removed = self._resources[collection].pop(uuid, None)
+        if removed is not None and collection in RELATIONS:
+            parent_uuid = RELATIONS[collection](removed)
+            children = self._children[collection]
+            siblings = [child for child in children[parent_uuid]
+                        if child is not removed]
+            if siblings:
+                children[parent_uuid] = siblings
+            else:
+                del children[parent_uuid]
+        return removed
+
+    def get(self, collection, uuid):
+        """Return the resource of `collection` with `uuid`, or None."""
+        return self._resources[collection].get(uuid)
+
+    def _children_of(self, collection, parent):
+        uuid = getattr(parent, 'uuid', parent)
+        return list(self._children[collection].get(uuid, ()))
+
+    def assemblies_of(self, plan):
+        """Return the assemblies deployed from a plan, or its uuid."""
+        return self._children_of('assemblies', plan)
+
+    def components_of(self, assembly):
+        """Return the components of an assembly, or of its uuid."""
+        return self._children_of('components', assembly)
+
+    def pipelines_of(self, plan):
+        """Return the pipelines of a plan, or of its uuid."""
+        return self._children_of('pipelines', plan)
+
+    def plan_of(self, resource):
+        """Return the plan of an assembly or pipeline, or None."""
+        return self.get('plans', _plan_uuid(resource))
+
+
+def rollup(statuses):
+    """Sum up the statuses of an application's assemblies in one state."""
+    if not statuses:
+        return NOT_DEPLOYED
+    if any(v1_assembly.is_failed(status) for status in statuses):
+        return FAILED
+    if all(status == READY for status in statuses):
+        return READY
+    return IN_PROGRESS
+
+
+def _count_statuses(statuses):
+    counts = {}
+    for status in statuses:
+        status = status or 'UNKNOWN'
+        counts[status] = counts.get(status, 0) + 1
+    return ', '.join('%d %s' % (count, status) for status, count
+                     in sorted(six.iteritems(counts),
+                               key=lambda item: (-item[1], item[0])))
+
+
+def app_statuses(index, plans):
+    """Return the :class:`AppStatus` of each of `plans`, in order.
+
+    :param index: :class:`ResourceIndex` of the plans' resources
+    """
+    rows = []
+    for plan in plans:
+        deployed = index.assemblies_of(plan)
+        statuses = [getattr(a, 'status', None) for a in deployed]
+        rows.append(AppStatus(
+            plan.name, plan.uuid, rollup(statuses), _count_statuses(statuses),
+            sum(len(index.components_of(a)) for a in deployed),
+            len(index.pipelines_of(plan))))
+    return rows
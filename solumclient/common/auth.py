@@ -12,8 +12,6 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from keystoneclient.v2_0 import client as ksclient
-
 from solumclient.openstack.common.apiclient import auth
 from solumclient.openstack.common.apiclient import exceptions
 
@@ -31,6 +29,10 @@ class KeystoneAuthPlugin(auth.BaseAuthPlugin):
 
     def _do_authenticate(self, http_client):
         if self.opts.get('token') is None:
+            # keystoneclient is slow to import and is only needed when
+            # there is no token to reuse.
+            from keystoneclient.v2_0 import client as ksclient
+
             ks_kwargs = {
                 'username': self.opts.get('username'),
                 'password': self.opts.get('password'),
@@ -56,6 +58,23 @@ class KeystoneAuthPlugin(auth.BaseAuthPlugin):
 
         return (token, endpoint)
 
+    def catalog_endpoint(self, endpoint_type, service_type):
+        """Look up the endpoint of another service in the Keystone catalog.
+
+        Unlike token_and_endpoint(), the endpoint option is ignored: it is
+        the Solum endpoint. Returns None when there is no catalog, i.e.
+        when authenticating with a token, or no such service in it.
+        """
+        if not hasattr(self, '_ksclient'):
+            return None
+        from keystoneclient import exceptions as ks_exceptions
+        try:
+            return self._ksclient.service_catalog.url_for(
+                service_type=service_type,
+                endpoint_type=endpoint_type)
+        except ks_exceptions.EndpointNotFound:
+            return None
+
     def sufficient_options(self):
         """Check if all required options are present.
 
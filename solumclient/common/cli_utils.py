@@ -13,128 +13,248 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
 import os
+import threading
 
-from solumclient.builder import client as builder_client
-from solumclient import client as solum_client
 from solumclient.common import exc
+from solumclient.common import formatutils
+from solumclient.common import lazyutils
+
+# The API clients import keystoneclient and requests; load them only when a
+# command gets far enough to need one.
+builder_client = lazyutils.lazy_module('solumclient.builder.client')
+solum_client = lazyutils.lazy_module('solumclient.client')
+
+
+# Options forwarded to get_client(); everything else on the command line
+# belongs to the command itself.
+CLIENT_OPTIONS = ('os_username', 'os_password', 'os_tenant_name',
+                  'os_auth_url', 'os_auth_token', 'solum_url')
+
+# Guards the dicts of clients shared by commands run in several threads,
+# e.g. by run_batch.
+_clients_lock = threading.Lock()
+
+
+def arg(*args, **kwargs):
+    """Decorator declaring a command line argument of an action.
+
+    Works like cliutils.arg: the add_argument() parameters are stored on the
+    method and added, in the order written, to the parser of that action
+    when the command tree is built.
+    """
+    def _decorator(func):
+        func.__dict__.setdefault('arguments', []).insert(0, (args, kwargs))
+        return func
+    return _decorator
 
 
 class CommandsBase(object):
     """Base command parsing class."""
-    parser = None
     solum = None
+    # Parsed command line of the running action.
+    args = None
+    # The CommandError reported to the user, if the command failed.
+    error = None
+    output_format = formatutils.TABLE
+    columns = None
+    # Actions that talk to the builder API rather than the Solum API.
+    builder_actions = ('build',)
+
+    def __init__(self, args, clients=None):
+        """Run the action named on the command line.
 
-    def __init__(self, parser):
-        self.parser = parser
+        :param args: argparse.Namespace holding the whole command line,
+            parsed once with the arguments declared on the action
+        :param clients: optional dict used to share authenticated clients
+            between commands; clients missing from it are created and
+            added, existing ones are reused as they are
+        """
+        self.args = args
+        self.output_format = getattr(args, 'output_format', formatutils.TABLE)
+        self.columns = getattr(args, 'columns', None)
 
-        self._get_global_flags()
+        action = self._get_actions().get(getattr(args, 'action', None))
+        if action is None:
+            print(self.__doc__)
+            return
 
         try:
-            self._get_auth_flags()
+            formatutils.check_format(self.output_format)
+            self._check_auth_flags(args)
         except exc.CommandError as ce:
-            print(self.__doc__)
-            print("ERROR: %s" % ce.message)
+            self._report(ce)
             return
 
-        self.parser.add_argument('action',
-                                 default='help',
-                                 help='Action to perform on resource')
-
-        parsed, _ = self.parser.parse_known_args()
-        action = vars(parsed).get('action')
-
-        client_args = vars(parsed)
-        if 'os_auth_token' in client_args:
-            del client_args['os_auth_token']
-        if vars(parsed).get('action') == 'build':
-            self.client = builder_client.get_client(parsed.solum_api_version,
-                                                    **client_args)
-        else:
-            self.client = solum_client.get_client(parsed.solum_api_version,
-                                                  **client_args)
-
-        if parsed.action in self._actions:
-            try:
-                return self._actions[action]()
-            except exc.CommandError as ce:
-                print(self.__doc__)
-                print("ERROR: %s" % ce.message)
-        else:
-            print(self.__doc__)
+        self.client = self._get_client(args, clients)
+        try:
+            return action(self)
+        except exc.CommandError as ce:
+            self._report(ce)
+
+    def _report(self, ce):
+        self.error = ce
+        print(self.__doc__)
+        print("ERROR: %s" % ce.message)
+
+    def _get_client(self, args, clients):
+        kind = 'solum'
+        if args.action in self.builder_actions:
+            kind = 'builder'
+        if clients is None:
+            return make_client(args, kind)
+
+        with _clients_lock:
+            if kind not in clients:
+                # A client of the other API made earlier shares its
+                # HTTPClient, so the session authenticates once for both.
+                http_client = None
+                if clients:
+                    http_client = next(iter(clients.values())).http_client
+                clients[kind] = make_client(args, kind,
+                                            http_client=http_client)
+            return clients[kind]
+
+    @staticmethod
+    def _check_auth_flags(args):
+        if args.os_auth_token:
+            # The token is used as is, so Keystone is never contacted and
+            # the Solum endpoint cannot be looked up in its catalog.
+            if not args.solum_url:
+                raise exc.CommandError("You must provide a Solum URL via "
+                                       "either --solum-url or via "
+                                       "env[SOLUM_URL] when using a token")
+            return
+
+        if not args.os_username:
+            raise exc.CommandError("You must provide a username via "
+                                   "either --os-username or via "
+                                   "env[OS_USERNAME]")
+
+        if not args.os_password:
+            raise exc.CommandError("You must provide a password via "
+                                   "either --os-password or via "
+                                   "env[OS_PASSWORD]")
+
+        if not args.os_tenant_name:
+            raise exc.CommandError("You must provide a tenant_name via "
+                                   "either --os-tenant-name or via "
+                                   "env[OS_TENANT_NAME]")
+
+        if not args.os_auth_url:
+            raise exc.CommandError("You must provide an auth url via "
+                                   "either --os-auth-url or via "
+                                   "env[OS_AUTH_URL]")
 
-    def _get_auth_flags(self):
-        self.parser.add_argument('--os-username',
-                                 default=env('OS_USERNAME'),
-                                 help='Defaults to env[OS_USERNAME]')
-
-        self.parser.add_argument('--os-password',
-                                 default=env('OS_PASSWORD'),
-                                 help='Defaults to env[OS_PASSWORD]')
-
-        self.parser.add_argument('--os-tenant-name',
-                                 default=env('OS_TENANT_NAME'),
-                                 help='Defaults to env[OS_TENANT_NAME]')
-
-        self.parser.add_argument('--os-auth-url',
-                                 default=env('OS_AUTH_URL'),
-                                 help='Defaults to env[OS_AUTH_URL]')
-
-        self.parser.add_argument('--os-auth-token',
-                                 default=env('OS_AUTH_TOKEN'),
-                                 help='Defaults to env[OS_AUTH_TOKEN]')
-
-        self.parser.add_argument('--solum-url',
-                                 default=env('SOLUM_URL'),
-                                 help='Defaults to env[SOLUM_URL]')
-
-        api_version = env('SOLUM_API_VERSION', default='1')
-        self.parser.add_argument('--solum-api-version',
-                                 default=api_version,
-                                 help='Defaults to env[SOLUM_API_VERSION] '
-                                      'or 1')
-
-        parsed, _ = self.parser.parse_known_args()
-
-        client_args = vars(parsed)
-
-        if not parsed.os_auth_token:
-            # Remove arguments that are not to be passed to the client in this
-            # case.
-            del client_args['os_auth_token']
-
-            if not parsed.os_username:
-                raise exc.CommandError("You must provide a username via "
-                                       "either --os-username or via "
-                                       "env[OS_USERNAME]")
-
-            if not parsed.os_password:
-                raise exc.CommandError("You must provide a password via "
-                                       "either --os-password or via "
-                                       "env[OS_PASSWORD]")
-
-            if not parsed.os_tenant_name:
-                raise exc.CommandError("You must provide a tenant_name via "
-                                       "either --os-tenant-name or via "
-                                       "env[OS_TENANT_NAME]")
-
-            if not parsed.os_auth_url:
-                raise exc.CommandError("You must provide an auth url via "
-                                       "either --os-auth-url or via "
-                                       "env[OS_AUTH_URL]")
-
-    @property
-    def _actions(self):
-        """Action handler."""
-        return dict((attr, getattr(self, attr))
-                    for attr in dir(self)
-                    if not attr.startswith('_')
-                    and callable(getattr(self, attr)))
-
-    def _get_global_flags(self):
-        """Get global flags."""
-        # Good location to add_argument() global options like --verbose
-        pass
+    @classmethod
+    def _get_actions(cls):
+        """Map each action name of the class to its method.
+
+        The map is built on first use and kept on the class.
+        """
+        if '_action_registry' not in cls.__dict__:
+            cls._action_registry = dict(
+                (attr, getattr(cls, attr))
+                for attr in dir(cls)
+                if not attr.startswith('_')
+                and callable(getattr(cls, attr)))
+        return cls._action_registry
+
+    def _print_list(self, objs, fields, sortby_index=0, sample=None):
+        """Print resources in the format selected with --format."""
+        formatutils.print_list(objs, fields, fmt=self.output_format,
+                               columns=self.columns,
+                               sortby_index=sortby_index, sample=sample)
+
+    def _print_dict(self, dct, wrap=0):
+        """Print one resource in the format selected with --format."""
+        formatutils.print_dict(dct, fmt=self.output_format,
+                               columns=self.columns, wrap=wrap)
+
+
+def make_client(args, kind='solum', http_client=None):
+    """Return a client authenticated with the credentials in `args`.
+
+    :param kind: 'solum' for the Solum API, 'builder' for the builder API
+    :param http_client: optional HTTPClient of another client to share
+    """
+    client_args = dict((opt, getattr(args, opt, ''))
+                       for opt in CLIENT_OPTIONS)
+    if not client_args['os_auth_token']:
+        del client_args['os_auth_token']
+    if http_client is not None:
+        client_args['http_client'] = http_client
+    if kind == 'builder':
+        return builder_client.get_client(args.solum_api_version,
+                                         **client_args)
+    return solum_client.get_client(args.solum_api_version, **client_args)
+
+
+def add_auth_flags(parser):
+    """Add the credential options to `parser`.
+
+    The defaults come from the environment; see :func:`default_options`.
+    """
+    parser.add_argument('--os-username',
+                        help='Defaults to env[OS_USERNAME]')
+
+    parser.add_argument('--os-password',
+                        help='Defaults to env[OS_PASSWORD]')
+
+    parser.add_argument('--os-tenant-name',
+                        help='Defaults to env[OS_TENANT_NAME]')
+
+    parser.add_argument('--os-auth-url',
+                        help='Defaults to env[OS_AUTH_URL]')
+
+    parser.add_argument('--os-auth-token',
+                        help='Defaults to env[OS_AUTH_TOKEN]')
+
+    parser.add_argument('--solum-url',
+                        help='Defaults to env[SOLUM_URL]')
+
+    parser.add_argument('--solum-api-version',
+                        help='Defaults to env[SOLUM_API_VERSION] '
+                             'or 1')
+
+
+def add_global_flags(parser):
+    """Add the options every command accepts to `parser`."""
+    # Good location to add_argument() global options like --verbose
+    parser.add_argument('--format',
+                        dest='output_format',
+                        help='Output format: %s. Defaults to '
+                             'table' % ', '.join(formatutils.FORMATS))
+    parser.add_argument('--column',
+                        dest='columns',
+                        action='append',
+                        help='Column to show; repeat to show '
+                             'several. Defaults to all columns')
+
+
+def default_options(args=None):
+    """Return a namespace holding a value for every common option.
+
+    Parsing a command line into this namespace only replaces the options
+    actually given. Values are taken from `args` when it has them, e.g. to
+    carry the options given to 'solum shell' over to the commands it runs,
+    and from the environment otherwise.
+    """
+    options = argparse.Namespace(
+        os_username=env('OS_USERNAME'),
+        os_password=env('OS_PASSWORD'),
+        os_tenant_name=env('OS_TENANT_NAME'),
+        os_auth_url=env('OS_AUTH_URL'),
+        os_auth_token=env('OS_AUTH_TOKEN'),
+        solum_url=env('SOLUM_URL'),
+        solum_api_version=env('SOLUM_API_VERSION', default='1'),
+        output_format=formatutils.TABLE,
+        columns=None)
+    for dest in vars(options):
+        if hasattr(args, dest):
+            setattr(options, dest, getattr(args, dest))
+    return options
 
 
 def env(*vars, **kwargs):
@@ -13,16 +13,59 @@
 # under the License.
 
 import logging
+import threading
 import time
 
+from solumclient.common import auth
 from solumclient.common import exc
 from solumclient.openstack.common.apiclient import client as api_client
+from solumclient.openstack.common.apiclient import exceptions
 
 
 _logger = logging.getLogger(__name__)
 
 
 class HTTPClient(api_client.HTTPClient):
+    def __init__(self, *args, **kwargs):
+        super(HTTPClient, self).__init__(*args, **kwargs)
+        self._auth_lock = threading.Lock()
+
+    def client_request(self, client, method, url, **kwargs):
+        """Send a request to the endpoint of `client`.
+
+        The first requests of the clients sharing this HTTPClient may be
+        sent from several threads at once. One of them authenticates while
+        the others wait, then they all use its token.
+        """
+        if not (self.cached_token and client.cached_endpoint):
+            with self._auth_lock:
+                self._cache_token_and_endpoint(client)
+        return super(HTTPClient, self).client_request(client, method, url,
+                                                      **kwargs)
+
+    def _cache_token_and_endpoint(self, client):
+        filter_args = {
+            "endpoint_type": client.endpoint_type or self.endpoint_type,
+            "service_type": client.service_type,
+        }
+        token = endpoint = None
+        try:
+            token, endpoint = self.auth_plugin.token_and_endpoint(
+                **filter_args)
+        except exceptions.EndpointException:
+            pass
+        if not (token and endpoint):
+            self.authenticate()
+            try:
+                token, endpoint = self.auth_plugin.token_and_endpoint(
+                    **filter_args)
+            except exceptions.EndpointException:
+                # Reported by the request itself.
+                return
+        if token and endpoint:
+            self.cached_token = token
+            client.cached_endpoint = endpoint
+
     def request(self, method, url, **kwargs):
         """Send an http request with the specified characteristics.
 
@@ -47,6 +90,14 @@ class HTTPClient(api_client.HTTPClient):
             kwargs.setdefault("cert", self.cert)
         self.serialize(kwargs)
 
+        # A file body is streamed from its current position. Remember it so
+        # that the body can be sent again if the request has to be retried
+        # after re-authenticating.
+        body = kwargs.get('data')
+        body_offset = None
+        if hasattr(body, 'seek') and hasattr(body, 'tell'):
+            body_offset = body.tell()
+
         self._http_log_req(method, url, kwargs)
         if self.timings:
             start_time = time.time()
@@ -60,6 +111,26 @@ class HTTPClient(api_client.HTTPClient):
             _logger.debug(
                 "Request returned failure status: %s",
                 resp.status_code)
+            if body_offset is not None:
+                body.seek(body_offset)
             raise exc.from_response(resp, method, url)
 
         return resp
+
+
+def make_http_client(**kwargs):
+    """Return an HTTPClient authenticating with Keystone.
+
+    Clients of several APIs can share it: it authenticates once for all
+    of them and keeps one pool of connections.
+
+    :param kwargs: the options of :class:`auth.KeystoneAuthPlugin`
+    """
+    keystone_auth = auth.KeystoneAuthPlugin(
+        username=kwargs.get('username'),
+        password=kwargs.get('password'),
+        tenant_name=kwargs.get('tenant_name'),
+        token=kwargs.get('token'),
+        auth_url=kwargs.get('auth_url'),
+        endpoint=kwargs.get('endpoint'))
+    return HTTPClient(keystone_auth)
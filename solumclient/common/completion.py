@@ -0,0 +1,145 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Local cache of resource names for shell completion.
+
+Completion has to answer while the user waits at the keyboard, so names
+are only ever read from files under ``~/.solumclient``, one directory per
+tenant. A cache older than its TTL is still used as is; a detached
+``solum complete --refresh`` process is started to list the resources
+again for the next completion.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_TTL = 300
+
+# Completable resources and the client managers that list them.
+MANAGERS = {
+    'plan': 'plans',
+    'assembly': 'assemblies',
+    'pipeline': 'pipelines',
+    'component': 'components',
+}
+
+
+def cache_dir(options):
+    """Return the cache directory of the tenant `options` authenticate to.
+
+    The base directory is env[SOLUM_COMPLETION_CACHE] or ~/.solumclient.
+    """
+    base = (os.environ.get('SOLUM_COMPLETION_CACHE') or
+            os.path.join(os.path.expanduser('~'), '.solumclient'))
+    # A bare token says nothing about its tenant, so it stands in for it.
+    tenant = options.os_tenant_name or options.os_auth_token
+    key = '\0'.join([options.os_auth_url, options.solum_url, tenant])
+    return os.path.join(base, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+
+def get_ttl():
+    """Return the cache lifetime in seconds, from env[SOLUM_COMPLETION_TTL]."""
+    try:
+        return int(os.environ.get('SOLUM_COMPLETION_TTL', DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+def _age(path):
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def read_names(options, kind):
+    """Return the cached names of `kind`, refreshing them if stale.
+
+    Never contacts the API: a missing or expired cache starts a refresh
+    in the background and whatever is cached now is returned.
+    """
+    path = os.path.join(cache_dir(options), kind)
+    try:
+        with open(path) as cache:
+            names = json.load(cache)['names']
+    except (IOError, ValueError, KeyError):
+        names = []
+    age = _age(path)
+    if age is None or age > get_ttl():
+        spawn_refresh(options, kind)
+    return names
+
+
+def write_names(options, kind, names):
+    """Replace the cached names of `kind`."""
+    directory = cache_dir(options)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+    # Readers never see a partly written file.
+    fd, tmp = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, 'w') as cache:
+        json.dump({'names': sorted(set(names))}, cache)
+    os.rename(tmp, os.path.join(directory, kind))
+
+
+def refresh(client, options, kind):
+    """List the resources of `kind` and cache their names."""
+    resources = getattr(client, MANAGERS[kind]).list()
+    write_names(options, kind,
+                [getattr(r, r.NAME_ATTR, None) or r.uuid for r in resources])
+    try:
+        os.remove(os.path.join(cache_dir(options), kind + '.refreshing'))
+    except OSError:
+        pass
+
+
+def spawn_refresh(options, kind):
+    """Start refreshing the names of `kind` in a detached process.
+
+    At most one refresh per TTL is started, even if it fails, so that
+    completing with bad credentials doesn't fork a process per keypress.
+    """
+    directory = cache_dir(options)
+    marker = os.path.join(directory, kind + '.refreshing')
+    age = _age(marker)
+    if age is not None and age < get_ttl():
+        return
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        with open(marker, 'w'):
+            pass
+    except (IOError, OSError):
+        return
+
+    # Credentials go through the environment rather than the command
+    # line, where any user could read them.
+    env = dict(os.environ)
+    for name, value in [('OS_USERNAME', options.os_username),
+                        ('OS_PASSWORD', options.os_password),
+                        ('OS_TENANT_NAME', options.os_tenant_name),
+                        ('OS_AUTH_URL', options.os_auth_url),
+                        ('OS_AUTH_TOKEN', options.os_auth_token),
+                        ('SOLUM_URL', options.solum_url),
+                        ('SOLUM_API_VERSION', options.solum_api_version)]:
+        env[name] = value or ''
+    with open(os.devnull, 'r+') as devnull:
+        subprocess.Popen([sys.executable, '-m', 'solumclient.solum',
+                          'complete', '--refresh', kind],
+                         stdin=devnull, stdout=devnull, stderr=devnull,
+                         close_fds=True, env=env,
+                         preexec_fn=getattr(os, 'setsid', None))
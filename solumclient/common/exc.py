@@ -28,6 +28,23 @@ class CommandError(BaseException):
     """Invalid usage of CLI."""
 
 
+class PlanValidationError(BaseException):
+    """The plan definition is not valid."""
+    def __init__(self, errors):
+        self.errors = errors
+        message = 'The plan definition is not valid:\n  %s' % (
+            '\n  '.join(errors))
+        super(PlanValidationError, self).__init__(message=message)
+
+
+class WaitTimeout(BaseException):
+    """Timed out waiting for resources to settle."""
+    def __init__(self, pending):
+        self.pending = pending
+        message = 'Timed out waiting for %d resource(s).' % len(pending)
+        super(WaitTimeout, self).__init__(message=message)
+
+
 def from_response(response, method, url):
     """Returns an instance of :class:`HttpError` or subclass based on response.
 
@@ -42,8 +59,6 @@ def from_response(response, method, url):
         "url": url,
         "request_id": response.headers.get("x-compute-request-id"),
     }
-    if "retry-after" in response.headers:
-        kwargs["retry_after"] = response.headers["retry-after"]
 
     content_type = response.headers.get("Content-Type", "")
     if content_type.startswith("application/json"):
@@ -67,4 +82,11 @@ def from_response(response, method, url):
             cls = exceptions.HTTPClientError
         else:
             cls = exceptions.HttpError
-    return cls(**kwargs)
+    error = cls(**kwargs)
+    # Only RequestEntityTooLarge takes retry_after as an argument, but 429
+    # and 503 responses are the ones that usually carry it.
+    try:
+        error.retry_after = int(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        pass
+    return error
@@ -0,0 +1,166 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Render command results as tables or machine-readable formats.
+
+Lists and single resources are drawn as tables by tableutils, which
+reads every row before writing, to size and sort the columns, unless
+asked to sample the first rows only. Every other format writes each
+row as soon as it is read from `objs`, so a list is never held in
+memory as a whole on the way out, and rows come out in the order the
+server returned them.
+"""
+
+import csv
+import json
+import sys
+
+import six
+
+from solumclient.common import exc
+from solumclient.common import lazyutils
+
+tableutils = lazyutils.lazy_module('solumclient.common.tableutils')
+yamlutils = lazyutils.lazy_module('solumclient.common.yamlutils')
+
+
+TABLE = 'table'
+FORMATS = (TABLE, 'json', 'ndjson', 'csv', 'yaml', 'value')
+
+# Rows sized before printing the first when a long table is sampled.
+TABLE_SAMPLE = 50
+
+
+def check_format(fmt):
+    """Raise CommandError if `fmt` is not one of :data:`FORMATS`."""
+    if fmt not in FORMATS:
+        raise exc.CommandError(message='Unknown output format "%s". Choose '
+                               'one of: %s.' % (fmt, ', '.join(FORMATS)))
+
+
+def select_columns(fields, columns):
+    """Return the `fields` named in `columns`, in the order requested."""
+    if not columns:
+        return list(fields)
+    unknown = [c for c in columns if c not in fields]
+    if unknown:
+        raise exc.CommandError(message='Unknown column(s): %s. Available '
+                               'columns: %s.' % (', '.join(unknown),
+                                                 ', '.join(fields)))
+    return list(columns)
+
+
+def _field_attr(field):
+    # Same lookup as cliutils.print_list.
+    return field.lower().replace(' ', '_')
+
+
+def _field_value(obj, field):
+    return getattr(obj, _field_attr(field), '')
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, six.string_types):
+        return value
+    return six.text_type(value)
+
+
+def _json(value):
+    return json.dumps(value, sort_keys=True, default=six.text_type)
+
+
+def _write(out, data):
+    out.write(tableutils.encode(data))
+    out.flush()
+
+
+def print_list(objs, fields, fmt=TABLE, columns=None, sortby_index=0,
+               out=None, sample=None):
+    """Print `objs` one row per object.
+
+    :param objs: iterable of resources; consumed lazily except for tables
+    :param fields: attribute names making up the columns
+    :param fmt: one of :data:`FORMATS`
+    :param columns: optional subset of `fields` to show
+    :param sortby_index: index in `fields` to sort tables by, or None
+    :param sample: for unsorted tables, the number of rows to size the
+        columns on before printing; None reads all rows first
+    """
+    check_format(fmt)
+    selected = select_columns(fields, columns)
+    if fmt == TABLE:
+        if sortby_index is not None:
+            sortby = fields[sortby_index]
+            sortby_index = (selected.index(sortby) if sortby in selected
+                            else None)
+        attrs = [_field_attr(f) for f in selected]
+        rows = ([getattr(o, attr, '') for attr in attrs] for o in objs)
+        return tableutils.print_table(rows, selected,
+                                      sortby_index=sortby_index,
+                                      sample=sample, out=out)
+
+    out = out or sys.stdout
+    rows = (dict((f, _field_value(o, f)) for f in selected) for o in objs)
+    if fmt == 'json':
+        # Stream a JSON array without building it first.
+        separator = '['
+        for row in rows:
+            _write(out, separator + '\n' + _json(row))
+            separator = ','
+        _write(out, '\n]\n' if separator == ',' else '[]\n')
+    elif fmt == 'ndjson':
+        for row in rows:
+            _write(out, _json(row) + '\n')
+    elif fmt == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(selected)
+        for row in rows:
+            writer.writerow([tableutils.encode(_text(row[f]))
+                             for f in selected])
+            out.flush()
+    elif fmt == 'yaml':
+        for row in rows:
+            _write(out, yamlutils.dump([row], default_flow_style=False))
+    elif fmt == 'value':
+        for row in rows:
+            _write(out, ' '.join(_text(row[f]) for f in selected) + '\n')
+
+
+def print_dict(dct, fmt=TABLE, columns=None, wrap=0, out=None):
+    """Print the properties of a single resource.
+
+    :param dct: `dict` of property names and values
+    :param fmt: one of :data:`FORMATS`
+    :param columns: optional subset of the keys of `dct` to show
+    :param wrap: wrapping of the value column, for tables only
+    """
+    check_format(fmt)
+    keys = select_columns(sorted(dct), columns)
+    if columns:
+        dct = dict((k, dct[k]) for k in keys)
+    if fmt == TABLE:
+        return tableutils.print_dict(dct, wrap=wrap, out=out)
+
+    out = out or sys.stdout
+    if fmt in ('json', 'ndjson'):
+        _write(out, _json(dct) + '\n')
+    elif fmt == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(keys)
+        writer.writerow([tableutils.encode(_text(dct[k])) for k in keys])
+    elif fmt == 'yaml':
+        _write(out, yamlutils.dump(dct, default_flow_style=False))
+    elif fmt == 'value':
+        for key in keys:
+            _write(out, _text(dct[key]) + '\n')
@@ -0,0 +1,117 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import sys
+import threading
+
+import six
+from six.moves import queue
+
+
+DEFAULT_WORKERS = 8
+
+# How long the consumer sleeps between checks for a finished call. A bare
+# Condition.wait() cannot be interrupted by ^C on Python 2.
+_POLL_INTERVAL = 0.5
+
+
+Result = collections.namedtuple('Result', ['item', 'value', 'error'])
+
+
+def imap(func, iterable, workers=DEFAULT_WORKERS):
+    """Apply `func` to every item of `iterable` using a pool of threads.
+
+    At most `workers` calls run at the same time and `iterable` is only
+    consumed as fast as the pool drains it, so it may be a generator over
+    an arbitrarily large source. Results are yielded in input order as
+    :class:`Result` tuples; an exception raised by `func` is stored in
+    ``error`` instead of being propagated. An exception raised while
+    iterating `iterable` is re-raised once every earlier item has been
+    yielded.
+
+    If the caller stops iterating early, e.g. by closing the generator or
+    dropping it, no more items are read from `iterable` and the calls not
+    yet started are skipped; the threads end once the calls running
+    finish.
+
+    :param func: callable taking a single item
+    :param iterable: items to process
+    :param workers: maximum number of concurrent calls
+    """
+    workers = max(1, int(workers))
+    tasks = queue.Queue(maxsize=workers)
+    finished = threading.Condition()
+    results = {}
+    state = {'total': None, 'exc_info': None}
+    stopped = threading.Event()
+
+    def feed():
+        count = 0
+        try:
+            for item in iterable:
+                if stopped.is_set():
+                    break
+                tasks.put((count, item))
+                count += 1
+        except Exception:
+            state['exc_info'] = sys.exc_info()
+        finally:
+            for _ in range(workers):
+                tasks.put(None)
+            with finished:
+                state['total'] = count
+                finished.notify_all()
+
+    def work():
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            if stopped.is_set():
+                # Nobody reads the results any more.
+                continue
+            index, item = task
+            try:
+                result = Result(item, func(item), None)
+            except Exception as e:
+                result = Result(item, None, e)
+            with finished:
+                if not stopped.is_set():
+                    results[index] = result
+                finished.notify_all()
+
+    threads = [threading.Thread(target=feed)]
+    threads.extend(threading.Thread(target=work) for _ in range(workers))
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    index = 0
+    try:
+        while True:
+            with finished:
+                while index not in results and (state['total'] is None or
+                                                index < state['total']):
+                    finished.wait(_POLL_INTERVAL)
+                if index not in results:
+                    break
+                result = results.pop(index)
+            yield result
+            index += 1
+    finally:
+        stopped.set()
+        with finished:
+            results.clear()
+
+    if state['exc_info'] is not None:
+        six.reraise(*state['exc_info'])
@@ -0,0 +1,170 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+Client-side validation of Solum v1 plan definitions.
+
+The schema below is compiled into a tree of checker functions the first
+time it is used and the result is kept for the life of the process, so
+validating many plans only pays for walking the definitions themselves.
+"""
+
+import numbers
+
+import six
+
+from solumclient.common import exc
+
+
+SUPPORTED_VERSIONS = (1,)
+
+_STRING = {'type': 'string'}
+
+_REQUIREMENT = {
+    'type': 'mapping',
+    'required': ['requirement_type'],
+    'properties': {
+        'requirement_type': _STRING,
+        'language_pack': _STRING,
+        'fulfillment': _STRING,
+    },
+}
+
+_ARTIFACT = {
+    'type': 'mapping',
+    'required': ['content'],
+    'properties': {
+        'name': _STRING,
+        'artifact_type': _STRING,
+        'language_pack': _STRING,
+        'unittest_cmd': _STRING,
+        'run_cmd': _STRING,
+        'content': {
+            'type': 'mapping',
+            'required': ['href'],
+            'properties': {
+                'href': _STRING,
+                'private': {'type': 'boolean'},
+            },
+        },
+        'requirements': {'type': 'list', 'items': _REQUIREMENT},
+    },
+}
+
+_SERVICE = {
+    'type': 'mapping',
+    'properties': {
+        'name': _STRING,
+        'id': _STRING,
+        'characteristics': {'type': 'list', 'items': _STRING},
+    },
+}
+
+PLAN_SCHEMA = {
+    'type': 'mapping',
+    'required': ['version'],
+    'properties': {
+        'version': {'type': 'integer', 'enum': SUPPORTED_VERSIONS},
+        'name': _STRING,
+        'description': _STRING,
+        'artifacts': {'type': 'list', 'items': _ARTIFACT},
+        'services': {'type': 'list', 'items': _SERVICE},
+        'parameters': {'type': 'mapping'},
+    },
+}
+
+_TYPE_NAMES = {
+    'string': 'a string',
+    'integer': 'an integer',
+    'boolean': 'a boolean',
+    'mapping': 'a mapping',
+    'list': 'a list',
+}
+
+
+def _is_integer(value):
+    return (isinstance(value, numbers.Integral) and
+            not isinstance(value, bool))
+
+
+_TYPE_CHECKS = {
+    'string': lambda v: isinstance(v, six.string_types),
+    'integer': _is_integer,
+    'boolean': lambda v: isinstance(v, bool),
+    'mapping': lambda v: isinstance(v, dict),
+    'list': lambda v: isinstance(v, list),
+}
+
+
+def _join(path, key):
+    if isinstance(key, int):
+        return '%s[%d]' % (path, key)
+    return '%s.%s' % (path, key) if path else key
+
+
+def _compile(schema):
+    """Turn a schema node into a ``check(value, path, errors)`` function."""
+    type_name = schema['type']
+    type_check = _TYPE_CHECKS[type_name]
+    expected = _TYPE_NAMES[type_name]
+    enum = schema.get('enum')
+    required = schema.get('required', ())
+    properties = [(key, _compile(sub))
+                  for key, sub in six.iteritems(schema.get('properties', {}))]
+    items = _compile(schema['items']) if 'items' in schema else None
+
+    def check(value, path, errors):
+        if not type_check(value):
+            errors.append('%s: must be %s' % (path or 'plan', expected))
+            return
+        if enum is not None and value not in enum:
+            errors.append('%s: must be one of %s' %
+                          (path, ', '.join(str(e) for e in enum)))
+        for key in required:
+            if value.get(key) is None:
+                errors.append('%s: is required' % _join(path, key))
+        for key, check_property in properties:
+            if value.get(key) is not None:
+                check_property(value[key], _join(path, key), errors)
+        if items is not None:
+            for index, item in enumerate(value):
+                items(item, _join(path, index), errors)
+
+    return check
+
+
+_checker = None
+
+
+def _get_checker():
+    global _checker
+    if _checker is None:
+        _checker = _compile(PLAN_SCHEMA)
+    return _checker
+
+
+def find_errors(definition):
+    """Return a list of every problem found in a loaded plan definition."""
+    found = []
+    _get_checker()(definition, '', found)
+    return found
+
+
+def validate(definition):
+    """Check a loaded plan definition without contacting the server.
+
+    :param definition: the plan as loaded by :func:`yamlutils.load`
+    :raises: :class:`exc.PlanValidationError` listing every problem found
+    """
+    found = find_errors(definition)
+    if found:
+        raise exc.PlanValidationError(found)
@@ -0,0 +1,53 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+
+# Seconds between two polls.
+MIN_POLL_INTERVAL = 1
+MAX_POLL_INTERVAL = 30
+
+
+def is_failed(status):
+    """Whether `status` means a resource stopped on an error."""
+    status = status or ''
+    return status.startswith('ERROR') or status.endswith('FAILED')
+
+
+class Poller(object):
+    """Sleeps between polls, backing off while nothing changes.
+
+    Polls start MIN_POLL_INTERVAL apart; the interval doubles, up to
+    MAX_POLL_INTERVAL, while nothing changes and drops back as soon as
+    something does.
+    """
+
+    def __init__(self, timeout):
+        """:param timeout: seconds to poll for; None to poll forever"""
+        self.deadline = None if timeout is None else time.time() + timeout
+        self.interval = MIN_POLL_INTERVAL
+
+    def wait(self, changed):
+        """Sleep until the next poll; False if the deadline has passed.
+
+        :param changed: whether the last poll saw any change
+        """
+        remaining = MAX_POLL_INTERVAL
+        if self.deadline is not None:
+            remaining = self.deadline - time.time()
+            if remaining <= 0:
+                return False
+        self.interval = (MIN_POLL_INTERVAL if changed
+                         else min(self.interval * 2, MAX_POLL_INTERVAL))
+        time.sleep(min(self.interval, remaining))
+        return True
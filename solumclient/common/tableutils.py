@@ -0,0 +1,231 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Text tables, as cliutils.print_list and print_dict draw them.
+
+A table is written in two passes instead of being built as one string.
+The first pass turns every cell into text once, measures it and computes
+the sort key of the sort column. The second sorts rows on those keys and
+writes them a line at a time.
+
+Unsorted tables can instead be sampled: column widths are measured on
+the first rows only, writing starts as soon as they are read, and cells
+of later rows wider than their column are wrapped onto more lines.
+"""
+
+import numbers
+import sys
+import textwrap
+import unicodedata
+
+import six
+
+
+# Rows written per call to out.write().
+_WRITE_BATCH = 256
+
+try:
+    _is_ascii = six.text_type.isascii
+except AttributeError:
+    # Python < 3.7
+    def _is_ascii(text):
+        try:
+            text.encode('ascii')
+        except UnicodeError:
+            return False
+        return True
+
+
+def encode(text):
+    """Return `text` as it is to be written out.
+
+    Python 2 cannot write unicode holding non-ASCII characters to a pipe,
+    whose encoding it does not know. There, text is encoded in UTF-8 as
+    cliutils.print_list did with strutils.safe_encode.
+    """
+    if six.PY2 and isinstance(text, six.text_type):
+        return text.encode('utf-8')
+    return text
+
+
+def _text(value):
+    # PrettyTable shows None as 'None'; so does this.
+    if isinstance(value, six.text_type):
+        return value
+    if isinstance(value, six.binary_type):
+        return value.decode('utf-8', 'replace')
+    return six.text_type(value)
+
+
+def _char_width(char):
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+def text_width(text):
+    """Return the number of terminal columns a line of `text` takes up."""
+    if _is_ascii(text):
+        return len(text)
+    return sum(_char_width(c) for c in text)
+
+
+def _cell_width(text):
+    if '\n' in text:
+        return max(text_width(line) for line in text.split('\n'))
+    return text_width(text)
+
+
+def sort_key(value):
+    """Return a key ordering values of mixed types without raising.
+
+    None comes first, then numbers and strings of digits by value, then
+    any other value by its text.
+    """
+    if value is None:
+        return (0, 0)
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        return (1, value)
+    text = _text(value)
+    if text.lstrip('-').replace('.', '', 1).isdigit():
+        return (1, float(text))
+    return (2, text)
+
+
+def _wrap(line, width):
+    """Split a line wider than `width` into (text, width) pieces."""
+    piece, piece_width = [], 0
+    for char in line:
+        char_width = _char_width(char)
+        if piece and piece_width + char_width > width:
+            yield u''.join(piece), piece_width
+            piece, piece_width = [], 0
+        piece.append(char)
+        piece_width += char_width
+    yield u''.join(piece), piece_width
+
+
+class _Row(object):
+    """The cells of a row as text, with the width each one needs."""
+    __slots__ = ('texts', 'widths')
+
+    def __init__(self, values):
+        self.texts = texts = [_text(value) for value in values]
+        # Plain ASCII on one line is by far the most common cell.
+        self.widths = [len(text) if _is_ascii(text) and '\n' not in text
+                       else _cell_width(text) for text in texts]
+
+    def lines(self, widths):
+        """Return the lines drawing this row in columns of `widths`."""
+        if (max(map(int.__sub__, self.widths, widths)) <= 0 and
+                not any('\n' in text for text in self.texts)):
+            return [u'| %s |\n' % u' | '.join(
+                [text + u' ' * (width - text_width)
+                 for text, text_width, width
+                 in zip(self.texts, self.widths, widths)])]
+
+        # Cells of several lines, or wider than their column.
+        columns = []
+        for text, width in zip(self.texts, widths):
+            pieces = []
+            for line in text.split('\n'):
+                line_width = text_width(line)
+                if line_width <= width:
+                    pieces.append((line, line_width))
+                else:
+                    pieces.extend(_wrap(line, width))
+            columns.append(pieces)
+        height = max(len(pieces) for pieces in columns)
+        lines = []
+        for index in range(height):
+            parts = []
+            for pieces, width in zip(columns, widths):
+                line, line_width = (pieces[index] if index < len(pieces)
+                                    else (u'', 0))
+                parts.append(line + u' ' * (width - line_width))
+            lines.append(u'| %s |\n' % u' | '.join(parts))
+        return lines
+
+
+def print_table(rows, fields, sortby_index=0, sample=None, out=None):
+    """Write `rows` as a table with a column per field.
+
+    :param rows: iterable of sequences holding a value per field
+    :param fields: column headings
+    :param sortby_index: index of the column to sort rows by, or None to
+        keep them in the order read
+    :param sample: for unsorted tables, how many rows to measure before
+        writing; None measures them all
+    :param out: file to write to; defaults to sys.stdout
+    """
+    out = out or sys.stdout
+    heading = _Row(fields)
+    widths = list(heading.widths)
+    if sortby_index is not None:
+        sample = None
+    rows = iter(rows)
+
+    measured = []
+    keys = []
+    for values in rows:
+        row = _Row(values)
+        widths[:] = map(max, widths, row.widths)
+        measured.append(row)
+        if sortby_index is not None:
+            keys.append(sort_key(values[sortby_index]))
+        elif sample is not None and len(measured) >= sample:
+            break
+    if sortby_index is not None:
+        # Sorting is stable: ties keep the order read.
+        order = sorted(range(len(measured)), key=keys.__getitem__)
+        measured = [measured[index] for index in order]
+
+    border = u'+%s+\n' % u'+'.join(u'-' * (width + 2) for width in widths)
+    out.write(encode(border + u''.join(heading.lines(widths)) + border))
+    for start in range(0, len(measured), _WRITE_BATCH):
+        lines = []
+        for row in measured[start:start + _WRITE_BATCH]:
+            lines.extend(row.lines(widths))
+        out.write(encode(u''.join(lines)))
+    if sample is not None:
+        # Rows past the sample are written as soon as they are read.
+        out.flush()
+        for values in rows:
+            out.write(encode(u''.join(_Row(values).lines(widths))))
+            out.flush()
+    out.write(encode(border))
+    out.flush()
+
+
+def print_dict(dct, dict_property='Property', wrap=0, out=None):
+    """Write a `dict` as a table of two columns, as cliutils.print_dict.
+
+    :param dct: `dict` to write, a row per key in its order
+    :param dict_property: heading of the first column
+    :param wrap: width to wrap the second column at; 0 does not wrap
+    :param out: file to write to; defaults to sys.stdout
+    """
+    rows = []
+    for key, value in six.iteritems(dct):
+        if isinstance(value, dict):
+            value = six.text_type(value)
+        if wrap > 0:
+            value = textwrap.fill(six.text_type(value), wrap)
+        # A value holding escaped newlines, e.g. a fault with its stack
+        # trace, takes a row per line.
+        if value and isinstance(value, six.string_types) and (
+                r'\n' in value):
+            for index, line in enumerate(value.strip().split(r'\n')):
+                rows.append((key if index == 0 else '', line))
+        else:
+            rows.append((key, value))
+    print_table(rows, [dict_property, 'Value'], sortby_index=None, out=out)
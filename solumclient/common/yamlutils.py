@@ -25,15 +25,19 @@ else:
     yaml_dumper = yaml.SafeDumper
 
 
+def _parse_error(exc):
+    msg = 'An error occurred during YAML parsing.'
+    if hasattr(exc, 'problem_mark'):
+        msg += ' Error position: (%s:%s)' % (exc.problem_mark.line + 1,
+                                             exc.problem_mark.column + 1)
+    return ValueError(msg)
+
+
 def load(s):
     try:
         yml_dict = yaml.load(s, yaml_loader)
     except yaml.YAMLError as exc:
-        msg = 'An error occurred during YAML parsing.'
-        if hasattr(exc, 'problem_mark'):
-            msg += ' Error position: (%s:%s)' % (exc.problem_mark.line + 1,
-                                                 exc.problem_mark.column + 1)
-        raise ValueError(msg)
+        raise _parse_error(exc)
     if not isinstance(yml_dict, dict) and not isinstance(yml_dict, list):
         raise ValueError('The source is not a YAML mapping or list.')
     if isinstance(yml_dict, dict) and len(yml_dict) < 1:
@@ -41,5 +45,48 @@ def load(s):
     return yml_dict
 
 
-def dump(s):
-    return yaml.dump(s, Dumper=yaml_dumper)
+def dump(s, **kwargs):
+    return yaml.dump(s, Dumper=yaml_dumper, **kwargs)
+
+
+def dump_iter(mapping):
+    """Serialize a mapping as a sequence of YAML chunks.
+
+    Each top-level key is emitted in block style as its own chunk, so the
+    concatenated chunks form one valid document while only one entry is
+    held in serialized form at a time. Suitable as a chunked request body.
+    """
+    for key in sorted(mapping):
+        yield yaml.dump({key: mapping[key]}, Dumper=yaml_dumper,
+                        default_flow_style=False)
+
+
+class DumpChunks(object):
+    """The chunks of :func:`dump_iter`, which can be iterated over again.
+
+    As a request body it is serialized afresh on each attempt, so a
+    request retried, e.g. after re-authenticating, is sent whole again;
+    the generator of dump_iter() would be empty by then.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+
+    def __iter__(self):
+        return dump_iter(self.mapping)
+
+
+def load_all(stream):
+    """Lazily load every document of a multi-document YAML stream.
+
+    Documents are parsed one at a time as the generator is consumed, so
+    `stream` may be an open file of any size. Empty documents are skipped.
+    A syntax error raises ValueError once the documents before it have
+    been yielded.
+    """
+    try:
+        for document in yaml.load_all(stream, yaml_loader):
+            if document is not None:
+                yield document
+    except yaml.YAMLError as exc:
+        raise _parse_error(exc)
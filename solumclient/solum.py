@@ -41,17 +41,35 @@ Notes:
 from __future__ import print_function
 
 import argparse
+import cmd
+import collections
+import contextlib
 import copy
 import json
+import shlex
 import sys
+import threading
+
+import six
 
 from solumclient.common import cli_utils
 from solumclient.common import exc
-from solumclient.common import yamlutils
-from solumclient.openstack.common import cliutils
-from solumclient.v1 import assembly as cli_assem
-from solumclient.v1 import pipeline as cli_pipe
-from solumclient.v1 import plan as cli_plan
+from solumclient.common import formatutils
+from solumclient.common import lazyutils
+
+# Everything below pulls in yaml, prettytable, requests or keystoneclient.
+# They are only loaded once a command actually uses them, which keeps
+# 'solum help' and argument errors fast.
+apputils = lazyutils.lazy_module('solumclient.common.apputils')
+completion = lazyutils.lazy_module('solumclient.common.completion')
+parallel = lazyutils.lazy_module('solumclient.common.parallel')
+planutils = lazyutils.lazy_module('solumclient.common.planutils')
+yamlutils = lazyutils.lazy_module('solumclient.common.yamlutils')
+cliutils = lazyutils.lazy_module('solumclient.openstack.common.cliutils')
+cli_assem = lazyutils.lazy_module('solumclient.v1.assembly')
+cli_image = lazyutils.lazy_module('solumclient.builder.v1.image')
+cli_pipe = lazyutils.lazy_module('solumclient.v1.pipeline')
+cli_plan = lazyutils.lazy_module('solumclient.v1.plan')
 
 
 class PlanCommands(cli_utils.CommandsBase):
@@ -68,89 +86,153 @@ Available commands:
     solum plan create <PLANFILE> [--param-file <PARAMFILE>]
         Register a plan with Solum.
 
+    solum plan load <PLANFILE> [--workers <N>]
+        Register every plan in a multi-document YAML file.
+
     solum plan delete <PLAN>
         Destroy a plan. Plans with dependent assemblies cannot be deleted.
     """
 
+    @cli_utils.arg('plan_file',
+                   metavar='plan file',
+                   help="A yaml file that defines a plan,"
+                        " check out solum repo for examples")
+    @cli_utils.arg('--param-file',
+                   dest='param_file',
+                   help="A yaml file containing custom"
+                        " parameters to be used in the"
+                        " application, check out solum repo for"
+                        " examples")
     def create(self):
         """Create a plan."""
-        self.parser.add_argument('plan_file',
-                                 help="A yaml file that defines a plan,"
-                                      " check out solum repo for examples")
-        self.parser.add_argument('--param-file',
-                                 dest='param_file',
-                                 help="A yaml file containing custom"
-                                      " parameters to be used in the"
-                                      " application, check out solum repo for"
-                                      " examples")
-
-        self.parser._names['plan_file'] = 'plan file'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         try:
-            with open(args.plan_file) as definition_file:
-                plan_definition = definition_file.read()
-                definition = yamlutils.load(plan_definition)
+            definition_file = open(args.plan_file, 'rb')
         except IOError:
             message = "Could not open plan file %s." % args.plan_file
             raise exc.CommandError(message=message)
-        except ValueError:
-            message = ("Plan file %s was not a valid YAML mapping." %
-                       args.plan_file)
-            raise exc.CommandError(message=message)
 
-        if args.param_file:
+        with definition_file:
             try:
-                with open(args.param_file) as param_f:
-                    param_definition = param_f.read()
-                definition['parameters'] = yamlutils.load(param_definition)
-            except IOError:
-                message = "Could not open param file %s." % args.param_file
-                raise exc.CommandError(message=message)
+                definition = yamlutils.load(definition_file)
             except ValueError:
-                message = ("Param file %s was not a valid YAML mapping." %
-                           args.param_file)
+                message = ("Plan file %s was not a valid YAML mapping." %
+                           args.plan_file)
                 raise exc.CommandError(message=message)
-        plan = self.client.plans.create(yamlutils.dump(definition))
+
+            if args.param_file:
+                try:
+                    with open(args.param_file) as param_f:
+                        param_definition = param_f.read()
+                    definition['parameters'] = yamlutils.load(
+                        param_definition)
+                except IOError:
+                    message = ("Could not open param file %s." %
+                               args.param_file)
+                    raise exc.CommandError(message=message)
+                except ValueError:
+                    message = ("Param file %s was not a valid YAML mapping." %
+                               args.param_file)
+                    raise exc.CommandError(message=message)
+            try:
+                planutils.validate(definition)
+            except exc.PlanValidationError as e:
+                raise exc.CommandError(message="Plan file %s: %s" %
+                                       (args.plan_file, e))
+
+            if args.param_file:
+                # The merged plan is streamed out one section at a time.
+                body = yamlutils.DumpChunks(definition)
+            else:
+                # Nothing to merge: upload the file exactly as written
+                # rather than serializing the parsed plan again.
+                definition_file.seek(0)
+                body = definition_file
+            plan = self.client.plans.create(body)
+
         fields = ['uuid', 'name', 'description', 'uri', 'artifacts']
         data = dict([(f, getattr(plan, f, ''))
                      for f in fields])
         artifacts = copy.deepcopy(data['artifacts'])
         del data['artifacts']
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
         self._show_public_keys(artifacts)
 
+    @cli_utils.arg('plan_file',
+                   metavar='plan file',
+                   help="A yaml file holding one or more plan"
+                        " documents separated by '---'")
+    @cli_utils.arg('--workers',
+                   type=int,
+                   help="Number of plans to upload at the"
+                        " same time")
+    def load(self):
+        """Register every plan in a multi-document YAML file."""
+        args = self.args
+        workers = _check_workers(args.workers)
+
+        fields = ['document', 'name', 'uuid', 'status']
+        Row = collections.namedtuple('Row', fields)
+        rows = []
+        try:
+            with open(args.plan_file) as definition_file:
+                results = self.client.plans.create_many(
+                    yamlutils.load_all(definition_file),
+                    workers=workers)
+                for index, result in enumerate(results):
+                    name = ''
+                    if isinstance(result.item, dict):
+                        name = result.item.get('name', '')
+                    if result.error is not None:
+                        rows.append(Row(index + 1, name, '',
+                                        'ERROR: %s' % result.error))
+                    else:
+                        rows.append(Row(index + 1, name,
+                                        getattr(result.value, 'uuid', ''),
+                                        'created'))
+        except IOError:
+            message = "Could not open plan file %s." % args.plan_file
+            raise exc.CommandError(message=message)
+        except ValueError as e:
+            # Plans read before the syntax error have still been registered.
+            rows.append(Row(len(rows) + 1, '', '', 'ERROR: %s' % e))
+        self._print_list(rows, fields, sortby_index=None)
+
+    @cli_utils.arg('plan_uuid',
+                   metavar='plan',
+                   help="Tenant/project-wide unique "
+                   "plan uuid or name")
     def delete(self):
         """Delete a plan."""
-        self.parser.add_argument('plan_uuid',
-                                 help="Tenant/project-wide unique "
-                                 "plan uuid or name")
-        self.parser._names['plan_uuid'] = 'plan'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         plan = self.client.plans.find(name_or_id=args.plan_uuid)
         cli_plan.PlanManager(self.client).delete(plan_id=str(plan.uuid))
 
+    @cli_utils.arg('plan_uuid',
+                   metavar='plan',
+                   help="Plan uuid or name")
     def show(self):
         """Show a plan's resource."""
-        self.parser.add_argument('plan_uuid',
-                                 help="Plan uuid or name")
-        self.parser._names['plan_uuid'] = 'plan'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         response = self.client.plans.find(name_or_id=args.plan_uuid)
         fields = ['uuid', 'name', 'description', 'uri', 'artifacts']
         data = dict([(f, getattr(response, f, ''))
                      for f in fields])
         artifacts = copy.deepcopy(data['artifacts'])
         del data['artifacts']
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
         self._show_public_keys(artifacts)
 
     def list(self):
         """List all plans."""
         fields = ['uuid', 'name', 'description']
         response = self.client.plans.list()
-        cliutils.print_list(response, fields)
+        self._print_list(response, fields)
 
     def _show_public_keys(self, artifacts):
+        if self.output_format != formatutils.TABLE:
+            # Keep machine-readable output parseable.
+            return
         public_keys = {}
         if artifacts:
             for arti in artifacts:
@@ -185,24 +267,34 @@ Available commands:
     solum assembly create <NAME> <PLAN_URI> [--description <DESCRIPTION>]
         Create an assembly from a registered plan.
 
-    solum assembly logs <NAME>
-        Print an index of all operation logs for an assembly.
+    solum assembly logs <NAME>... [--follow] [--content]
+                        [--strategy <STRATEGY>] [--since <TIME>]
+                        [--until <TIME>] [--fetch <DIR> [--workers <N>]]
+        Print an index of all operation logs for assemblies. With
+        --follow, keep printing logs as they are added. With --content,
+        print what local and Swift logs hold instead of where they are.
+        With --fetch, download them all, a few at a time; fetching
+        again resumes the downloads that did not finish.
+
+    solum assembly wait <NAME>... [--status <STATUS>] [--timeout <SECONDS>]
+        Wait until each assembly is READY (or in a --status given) or
+        failed, printing each one as soon as it is.
 
     solum assembly delete <NAME>
         Destroy an assembly.
     """
 
+    @cli_utils.arg('name',
+                   help="Assembly name")
+    @cli_utils.arg('plan_uri',
+                   metavar='plan URI',
+                   help="Tenant/project-wide unique "
+                   "plan (uri/uuid or name)")
+    @cli_utils.arg('--description',
+                   help="Assembly description")
     def create(self):
         """Create an assembly."""
-        self.parser.add_argument('name',
-                                 help="Assembly name")
-        self.parser.add_argument('plan_uri',
-                                 help="Tenant/project-wide unique "
-                                 "plan (uri/uuid or name)")
-        self.parser.add_argument('--description',
-                                 help="Assembly description")
-        self.parser._names['plan_uri'] = 'plan URI'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         name = args.name
         plan_uri = args.plan_uri
         if '/' not in plan_uri:
@@ -219,14 +311,14 @@ Available commands:
                   'trigger_uri']
         data = dict([(f, getattr(assembly, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
 
+    @cli_utils.arg('assembly_uuid',
+                   metavar='assembly',
+                   help="Assembly uuid or name")
     def delete(self):
         """Delete an assembly."""
-        self.parser.add_argument('assembly_uuid',
-                                 help="Assembly uuid or name")
-        self.parser._names['assembly_uuid'] = 'assembly'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         assem = self.client.assemblies.find(name_or_id=args.assembly_uuid)
         cli_assem.AssemblyManager(self.client).delete(
             assembly_id=str(assem.uuid))
@@ -236,16 +328,78 @@ Available commands:
         fields = ['uuid', 'name', 'description', 'status', 'created_at',
                   'updated_at']
         response = self.client.assemblies.list()
-        cliutils.print_list(response, fields, sortby_index=5)
-
+        self._print_list(response, fields, sortby_index=5)
+
+    @cli_utils.arg('assemblies',
+                   metavar='assembly',
+                   nargs='+',
+                   help="Assembly uuid or name")
+    @cli_utils.arg('--follow',
+                   action='store_true',
+                   help="Keep printing logs as they are added,"
+                        " until interrupted")
+    @cli_utils.arg('--content',
+                   action='store_true',
+                   help="Print the content of local and Swift logs")
+    @cli_utils.arg('--strategy',
+                   help="Only the logs stored with this strategy,"
+                        " e.g. local or swift")
+    @cli_utils.arg('--since',
+                   metavar='time',
+                   help="Only the logs created at or after this"
+                        " ISO 8601 time")
+    @cli_utils.arg('--until',
+                   metavar='time',
+                   help="Only the logs created at or before this"
+                        " ISO 8601 time; not with --follow")
+    @cli_utils.arg('--fetch',
+                   metavar='directory',
+                   help="Download the logs into this directory,"
+                        " one subdirectory per assembly")
+    @cli_utils.arg('--workers',
+                   type=int,
+                   help="Number of logs to download at the same"
+                        " time with --fetch")
     def logs(self):
         """Get Logs."""
-        self.parser.add_argument('assembly',
-                                 help="Assembly uuid or name")
-        args, _ = self.parser.parse_known_args()
-        assem = self.client.assemblies.find(name_or_id=args.assembly)
-        response = cli_assem.AssemblyManager(self.client).logs(
-            assembly_id=str(assem.uuid))
+        args = self.args
+        assemblies = self._find_assemblies(args.assemblies)
+        if args.fetch:
+            self._fetch_logs(assemblies, args.fetch,
+                             _check_workers(args.workers))
+            return
+        if len(assemblies) > 1 and (args.follow or args.content):
+            raise exc.CommandError(message="--follow and --content take a "
+                                   "single assembly.")
+        assem = assemblies[0]
+        userlogs = self.client.userlogs
+        try:
+            if args.content:
+                self._print_log_content(userlogs.content(
+                    str(assem.uuid), timeout=None if args.follow else 0,
+                    strategy=args.strategy, since=args.since))
+                return
+            if args.follow:
+                # A table is only printed once all its rows are known.
+                if self.output_format == formatutils.TABLE:
+                    self.output_format = 'value'
+                self._print_list(userlogs.follow(str(assem.uuid),
+                                                 strategy=args.strategy,
+                                                 since=args.since),
+                                 ['assembly_uuid', 'strategy', 'location'],
+                                 sortby_index=None)
+                return
+        except KeyboardInterrupt:
+            return
+        except IOError as e:
+            raise exc.CommandError(message="Could not read log: %s" % e)
+
+        response = []
+        for assem in assemblies:
+            response.extend(userlogs.list(str(assem.uuid),
+                                          strategy=args.strategy,
+                                          since=args.since,
+                                          until=args.until))
 
         fields = ["assembly_uuid"]
         for log in response:
@@ -265,20 +419,136 @@ Available commands:
                 if 'location' not in fields:
                     fields.append('location')
 
-        cliutils.print_list(response, fields)
-
+        self._print_list(response, fields)
+
+    def _find_assemblies(self, names):
+        if len(names) == 1:
+            return [self.client.assemblies.find(name_or_id=names[0])]
+        # One list() rather than a find() per assembly.
+        by_key = {}
+        for assem in self.client.assemblies.list():
+            by_key.setdefault(assem.uuid, assem)
+            by_key.setdefault(assem.name, assem)
+        missing = [name for name in names if name not in by_key]
+        if missing:
+            raise exc.CommandError(message="Assemblies not found: %s." %
+                                   ', '.join(missing))
+        return [by_key[name] for name in names]
+
+    def _fetch_logs(self, assemblies, directory, workers):
+        args = self.args
+        userlogs = self.client.userlogs
+        fields = ['assembly_uuid', 'location', 'file', 'status']
+        Row = collections.namedtuple('Row', fields)
+        failed = []
+
+        def list_logs(assem):
+            return list(userlogs.list(str(assem.uuid),
+                                      strategy=args.strategy,
+                                      since=args.since, until=args.until))
+
+        def rows():
+            logs = []
+            for result in parallel.imap(list_logs, assemblies,
+                                        workers=workers):
+                if result.error is not None:
+                    failed.append(result.item.uuid)
+                    yield Row(result.item.uuid, '', '',
+                              'ERROR: %s' % result.error)
+                else:
+                    logs.extend(result.value)
+            for result in userlogs.fetch(logs, directory, workers=workers):
+                log = result.item
+                if result.error is not None:
+                    failed.append(log.location)
+                    yield Row(log.assembly_uuid, log.location, '',
+                              'ERROR: %s' % result.error)
+                else:
+                    yield Row(log.assembly_uuid, log.location, result.value,
+                              'fetched')
+
+        self._print_list(rows(), fields, sortby_index=None,
+                         sample=formatutils.TABLE_SAMPLE)
+        if failed:
+            raise exc.CommandError(message="Could not fetch: %s." %
+                                   ', '.join(failed))
+
+    @staticmethod
+    def _print_log_content(chunks):
+        out = sys.stdout
+        if hasattr(out, 'buffer'):
+            write = out.buffer.write
+        else:
+            # Not a console, e.g. a StringIO.
+            def write(data):
+                out.write(data.decode('utf-8', 'replace'))
+        current = None
+        for log, chunk in chunks:
+            if log is not current:
+                # Name the log each time the output switches to it.
+                write(('==> %s <==\n' % log.location).encode('utf-8'))
+                current = log
+            write(chunk)
+            out.flush()
+
+    @cli_utils.arg('assemblies',
+                   metavar='assembly',
+                   nargs='+',
+                   help="Assembly uuid or name")
+    @cli_utils.arg('--status',
+                   dest='statuses',
+                   action='append',
+                   help="Status to wait for; repeat to accept"
+                        " several. Defaults to READY")
+    @cli_utils.arg('--timeout',
+                   type=int,
+                   help="Seconds to wait in total. Defaults to 600")
+    def wait(self):
+        """Wait for assemblies to reach a status."""
+        args = self.args
+        statuses = args.statuses or [cli_assem.READY]
+        timeout = args.timeout
+        if timeout is None:
+            timeout = cli_assem.DEFAULT_WAIT_TIMEOUT
+
+        fields = ['uuid', 'name', 'status']
+        Row = collections.namedtuple('Row', fields)
+        unsettled = []
+
+        def rows():
+            settled = self.client.assemblies.wait_for(
+                args.assemblies, statuses=statuses, timeout=timeout)
+            try:
+                for assem in settled:
+                    if assem.status not in statuses:
+                        unsettled.append(assem.name)
+                    yield Row(assem.uuid, assem.name, assem.status)
+            except exc.WaitTimeout as e:
+                for assem in e.pending:
+                    if isinstance(assem, six.string_types):
+                        # Never listed.
+                        assem = Row('', assem, 'NOT FOUND')
+                    unsettled.append(assem.name)
+                    yield Row(assem.uuid, assem.name, assem.status)
+
+        self._print_list(rows(), fields, sortby_index=None,
+                         sample=formatutils.TABLE_SAMPLE)
+        if unsettled:
+            raise exc.CommandError(message="Not %s: %s." % (
+                ' or '.join(statuses), ', '.join(unsettled)))
+
+    @cli_utils.arg('assembly_uuid',
+                   metavar='assembly',
+                   help="Assembly uuid or name")
     def show(self):
         """Show an assembly's resource."""
-        self.parser.add_argument('assembly_uuid',
-                                 help="Assembly uuid or name")
-        self.parser._names['assembly_uuid'] = 'assembly'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         response = self.client.assemblies.find(name_or_id=args.assembly_uuid)
         fields = ['uuid', 'name', 'description', 'status', 'application_uri',
                   'trigger_uri', 'created_at', 'updated_at']
         data = dict([(f, getattr(response, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
 
 
 class ComponentCommands(cli_utils.CommandsBase):
@@ -294,23 +564,23 @@ Available commands:
 
     """
 
+    @cli_utils.arg('component_uuid',
+                   metavar='component',
+                   help="Component uuid or name")
     def show(self):
         """Show a component's resource."""
-        self.parser.add_argument('component_uuid',
-                                 help="Component uuid or name")
-        self.parser._names['component_uuid'] = 'component'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         response = self.client.components.find(name_or_id=args.component_uuid)
         fields = ['uuid', 'name', 'description', 'uri', 'assembly_uuid']
         data = dict([(f, getattr(response, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
 
     def list(self):
         """List all components."""
         fields = ['uuid', 'name', 'description', 'assembly_uuid']
         response = self.client.components.list()
-        cliutils.print_list(response, fields)
+        self._print_list(response, fields)
 
 
 class PipelineCommands(cli_utils.CommandsBase):
@@ -331,18 +601,18 @@ Available commands:
         Destroy a pipeline.
     """
 
+    @cli_utils.arg('plan_uri',
+                   metavar='plan URI',
+                   help="Tenant/project-wide unique "
+                   "plan (uri/uuid or name)")
+    @cli_utils.arg('workbook_name',
+                   metavar='workbook',
+                   help="Workbook name")
+    @cli_utils.arg('name',
+                   help="Pipeline name")
     def create(self):
         """Create a pipeline."""
-        self.parser.add_argument('plan_uri',
-                                 help="Tenant/project-wide unique "
-                                 "plan (uri/uuid or name)")
-        self.parser.add_argument('workbook_name',
-                                 help="Workbook name")
-        self.parser.add_argument('name',
-                                 help="Pipeline name")
-        self.parser._names['plan_uri'] = 'plan URI'
-        self.parser._names['workbook_name'] = 'workbook'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         plan_uri = args.plan_uri
         if '/' not in plan_uri:
             # might be a plan uuid/name
@@ -359,14 +629,14 @@ Available commands:
                   'trigger_uri']
         data = dict([(f, getattr(pipeline, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
 
+    @cli_utils.arg('pipeline_uuid',
+                   metavar='pipeline',
+                   help="Pipeline uuid or name")
     def delete(self):
         """Delete an pipeline."""
-        self.parser.add_argument('pipeline_uuid',
-                                 help="Pipeline uuid or name")
-        self.parser._names['pipeline_uuid'] = 'pipeline'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         pipeline = self.client.pipelines.find(name_or_id=args.pipeline_uuid)
         cli_pipe.PipelineManager(self.client).delete(
             pipeline_id=str(pipeline.uuid))
@@ -375,20 +645,20 @@ Available commands:
         """List all pipelines."""
         fields = ['uuid', 'name', 'description']
         response = self.client.pipelines.list()
-        cliutils.print_list(response, fields)
+        self._print_list(response, fields)
 
+    @cli_utils.arg('pipeline_uuid',
+                   metavar='pipeline',
+                   help="Pipeline uuid or name")
     def show(self):
         """Show a pipeline's resource."""
-        self.parser.add_argument('pipeline_uuid',
-                                 help="Pipeline uuid or name")
-        self.parser._names['pipeline_uuid'] = 'pipeline'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         response = self.client.pipelines.find(name_or_id=args.pipeline_uuid)
         fields = ['uuid', 'name', 'description',
                   'trigger_uri', 'workbook_name', 'last_execution']
         data = dict([(f, getattr(response, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
 
 
 class LanguagePackCommands(cli_utils.CommandsBase):
@@ -405,20 +675,30 @@ Available commands:
     solum languagepack create <LPFILE>
         Create a new language pack from a file.
 
-    solum languagepack build <NAME> <GIT_REPO> <METADATA>
-        Create a new language pack from a git repo.
+    solum languagepack build <NAME> <GIT_REPO> [--lp_metadata <METADATA>]
+                             [--wait] [--timeout <SECONDS>]
+        Create a new language pack from a git repo. With --wait, print
+        each change of state of the build until it is READY or failed.
+
+    solum languagepack buildmany <MANIFEST> [--workers <N>]
+                                 [--timeout <SECONDS>]
+        Build every language pack listed in a YAML manifest, up to N at
+        a time, and follow the builds until they are READY or failed.
+        Prints how long each one took.
 
     solum languagepack delete <LP>
         Destroy a language pack.
 
     """
 
+    builder_actions = ('build', 'buildmany')
+
+    @cli_utils.arg('lp_file',
+                   metavar='languagepack file',
+                   help="Language pack file.")
     def create(self):
         """Create a language pack."""
-        self.parser.add_argument('lp_file',
-                                 help="Language pack file.")
-        self.parser._names['lp_file'] = 'languagepack file'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         with open(args.lp_file) as lang_pack_file:
             try:
                 data = json.load(lang_pack_file)
@@ -431,14 +711,14 @@ Available commands:
                   'os_platform']
         data = dict([(f, getattr(languagepack, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
 
+    @cli_utils.arg('lp_id',
+                   metavar='languagepack',
+                   help="Language pack id")
     def delete(self):
         """Delete a language pack."""
-        self.parser.add_argument('lp_id',
-                                 help="Language pack id")
-        self.parser._names['lp_id'] = 'languagepack'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         self.client.languagepacks.delete(lp_id=args.lp_id)
 
     def list(self):
@@ -446,48 +726,133 @@ Available commands:
         fields = ['uuid', 'name', 'description', 'compiler_versions',
                   'os_platform']
         response = self.client.languagepacks.list()
-        cliutils.print_list(response, fields)
+        self._print_list(response, fields)
 
+    @cli_utils.arg('lp_id',
+                   metavar='languagepack',
+                   help="Language pack id")
     def show(self):
         """Get a language pack."""
-        self.parser.add_argument('lp_id',
-                                 help="Language pack id")
-        self.parser._names['lp_id'] = 'languagepack'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         response = self.client.languagepacks.get(lp_id=args.lp_id)
         fields = ['uuid', 'name', 'description', 'compiler_versions',
                   'os_platform']
         data = dict([(f, getattr(response, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
-
+        self._print_dict(data, wrap=72)
+
+    @cli_utils.arg('name',
+                   help="Language pack name.")
+    @cli_utils.arg('git_url',
+                   metavar='repo URL',
+                   help=("Github url of custom "
+                         "language pack repository."))
+    @cli_utils.arg('--lp_metadata',
+                   help="Language pack file.")
+    @cli_utils.arg('--wait',
+                   action='store_true',
+                   help="Wait for the build to be READY or failed")
+    @cli_utils.arg('--timeout',
+                   type=int,
+                   help="Seconds to wait with --wait. Defaults to 1800")
     def build(self):
         """Build a custom language pack."""
-        self.parser.add_argument('name',
-                                 help="Language pack name.")
-        self.parser.add_argument('git_url',
-                                 help=("Github url of custom "
-                                       "language pack repository."))
-        self.parser.add_argument('--lp_metadata',
-                                 help="Language pack file.")
-        self.parser._names['git_url'] = 'repo URL'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         lp_metadata = None
 
         if args.lp_metadata:
             with open(args.lp_metadata) as lang_pack_metadata:
                 try:
                     lp_metadata = json.dumps(json.load(lang_pack_metadata))
-                except ValueError as exc:
-                    print("Error in language pack file: %s", str(exc))
+                except ValueError as e:
+                    print("Error in language pack file: %s", str(e))
                     sys.exit(1)
         response = self.client.images.create(name=args.name,
                                              source_uri=args.git_url,
                                              lp_metadata=lp_metadata)
+        if args.wait:
+            response = self._wait_for_image(response, args.timeout)
         fields = ['uuid', 'name', 'decription', 'state']
         data = dict([(f, getattr(response, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
+        if args.wait and response.state != cli_image.READY:
+            raise exc.CommandError(message="Language pack build ended in "
+                                   "%s." % response.state)
+
+    @cli_utils.arg('manifest',
+                   help="YAML list of the language packs to build, each"
+                        " with a name, a git_url and optionally"
+                        " lp_metadata")
+    @cli_utils.arg('--workers',
+                   type=int,
+                   help="Number of builds to submit at the same time")
+    @cli_utils.arg('--timeout',
+                   type=int,
+                   help="Seconds to follow the builds for once submitted."
+                        " Defaults to 1800")
+    def buildmany(self):
+        """Build many language packs."""
+        args = self.args
+        workers = _check_workers(args.workers)
+        timeout = args.timeout
+        if timeout is None:
+            timeout = cli_image.DEFAULT_WAIT_TIMEOUT
+        try:
+            specs = cli_image.load_manifest(args.manifest)
+        except (IOError, ValueError) as e:
+            raise exc.CommandError(message="Could not read manifest: %s" % e)
+
+        def print_change(change):
+            if (change.previous is not None and
+                    self.output_format == formatutils.TABLE):
+                print('%s: %s -> %s' % (change.image.name, change.previous,
+                                        change.image.state))
+                sys.stdout.flush()
+
+        builds = self.client.images.build_many(specs, workers=workers,
+                                               timeout=timeout,
+                                               on_change=print_change)
+        fields = ['name', 'uuid', 'state', 'seconds', 'error']
+        Row = collections.namedtuple('Row', fields)
+        rows = []
+        for build in builds:
+            if build.image is None:
+                rows.append(Row(build.spec.name, '', 'NOT SUBMITTED', '',
+                                str(build.error)))
+                continue
+            duration = build.duration
+            if build.error is not None:
+                error = str(build.error)
+            else:
+                error = '' if duration is not None else 'timed out'
+            rows.append(Row(build.spec.name, build.image.uuid,
+                            build.image.state,
+                            '' if duration is None else int(round(duration)),
+                            error))
+        self._print_list(rows, fields, sortby_index=None)
+        failed = [row.name for row in rows if row.state != cli_image.READY]
+        if failed:
+            raise exc.CommandError(message="Not READY: %s." %
+                                   ', '.join(failed))
+
+    def _wait_for_image(self, image, timeout):
+        if timeout is None:
+            timeout = cli_image.DEFAULT_WAIT_TIMEOUT
+        state = getattr(image, 'state', None)
+        try:
+            for change in self.client.images.watch([image],
+                                                   timeout=timeout):
+                image = change.image
+                if (image.state != state and
+                        self.output_format == formatutils.TABLE):
+                    print('%s: %s -> %s' % (image.name, state, image.state))
+                    sys.stdout.flush()
+                state = image.state
+        except exc.WaitTimeout:
+            raise exc.CommandError(message="Timed out waiting for the "
+                                   "language pack build; it is %s." % state)
+        return image
 
 
 class AppCommands(cli_utils.CommandsBase):
@@ -500,6 +865,10 @@ Available commands:
     solum app show <APP>
         Print detailed information about one application.
 
+    solum app status [<APP>...]
+        Print the state of applications: how many of their assemblies
+        are in each status, and their components and pipelines.
+
     solum app create [--planfile <PLANFILE>] [--git-url <GIT_URL>]
                      [--langpack <LANGPACK>] [--run-cmd <RUN_CMD>]
                      [--name <NAME>] [--desc <DESCRIPTION>]
@@ -508,16 +877,20 @@ Available commands:
     solum app deploy <APP>
         Deploy an application, building any applicable artifacts first.
 
-    solum app delete <APP>
-        Delete an application and all related artifacts.
+    solum app delete <APP> [--wait] [--timeout <SECONDS>]
+        Delete an application and all related artifacts. With --wait,
+        the plan is only deleted once its assemblies are gone.
 """
 
     def _get_assemblies_by_plan(self, plan):
-        # TODO(datsun180b): Write this.
-        return []
+        index = apputils.ResourceIndex(
+            assemblies=self.client.assemblies.list())
+        return index.assemblies_of(plan)
 
     def _show_public_keys(self, artifacts):
         # Shamelessly plucked from PlanCommands.
+        if self.output_format != formatutils.TABLE:
+            return
         public_keys = {}
         if artifacts:
             for arti in artifacts:
@@ -545,47 +918,67 @@ Available commands:
         fields = ['uuid', 'name', 'description', 'status', 'created_at',
                   'updated_at']
         assemblies = self.client.assemblies.list()
-        cliutils.print_list(assemblies, fields, sortby_index=5)
-
+        self._print_list(assemblies, fields, sortby_index=5)
+
+    @cli_utils.arg('apps',
+                   metavar='application',
+                   nargs='*',
+                   help="Application name; defaults to all")
+    def status(self):
+        """Print the state of applications."""
+        args = self.args
+        listed = apputils.list_all(self.client)
+        plans = listed['plans']
+        if args.apps:
+            by_key = {}
+            for plan in plans:
+                by_key.setdefault(plan.uuid, plan)
+                by_key.setdefault(plan.name, plan)
+            missing = [app for app in args.apps if app not in by_key]
+            if missing:
+                raise exc.CommandError(message="Applications not found: "
+                                       "%s." % ', '.join(missing))
+            plans = [by_key[app] for app in args.apps]
+        rows = apputils.app_statuses(apputils.ResourceIndex(**listed),
+                                     plans)
+        self._print_list(rows, list(apputils.AppStatus._fields))
+
+    @cli_utils.arg('app',
+                   metavar='application',
+                   help="Application name")
     def show(self):
         """Print detailed information about one application."""
         # This is just "plan show <PLAN>".
         # TODO(datsun180b): List the details of the plan, and
         # also the current build state, build number, and running
         # assembly status. We don't have all the pieces for that yet.
-        self.parser.add_argument('app',
-                                 help="Application name")
-        self.parser._names['app'] = 'application'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         plan = self.client.plans.find(name_or_id=args.app)
         fields = ['uuid', 'name', 'description', 'uri', 'artifacts']
         data = dict([(f, getattr(plan, f, ''))
                      for f in fields])
         artifacts = copy.deepcopy(data['artifacts'])
         del data['artifacts']
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
         self._show_public_keys(artifacts)
 
+    @cli_utils.arg('--planfile',
+                   help="Local planfile location")
+    @cli_utils.arg('--git-url',
+                   help='Source repo')
+    @cli_utils.arg('--langpack',
+                   help='Language pack')
+    @cli_utils.arg('--run-cmd',
+                   help="Application entry point")
+    @cli_utils.arg('--name',
+                   help="Application name")
+    @cli_utils.arg('--desc',
+                   help="Application description")
     def create(self):
         """Register a new application with Solum."""
         # This is just "plan create" with a little proactive
         # parsing of the planfile.
-
-        self.parser.add_argument('--planfile',
-                                 help="Local planfile location")
-        self.parser.add_argument('--git-url',
-                                 help='Source repo')
-        self.parser.add_argument('--langpack',
-                                 help='Language pack')
-
-        self.parser.add_argument('--run-cmd',
-                                 help="Application entry point")
-        self.parser.add_argument('--name',
-                                 help="Application name")
-        self.parser.add_argument('--desc',
-                                 help="Application description")
-
-        args, _ = self.parser.parse_known_args()
+        args = self.args
 
         # Get the plan file. Either get it from args, or supply
         # a skeleton.
@@ -669,24 +1062,29 @@ Available commands:
         if args.desc is not None:
             plan_definition['description'] = args.desc
 
+        try:
+            planutils.validate(plan_definition)
+        except exc.PlanValidationError as e:
+            raise exc.CommandError(message=str(e))
+
         plan = self.client.plans.create(yamlutils.dump(plan_definition))
         fields = ['uuid', 'name', 'description', 'uri', 'artifacts']
         data = dict([(f, getattr(plan, f, ''))
                      for f in fields])
         artifacts = copy.deepcopy(data['artifacts'])
         del data['artifacts']
-        cliutils.print_dict(data, wrap=72)
+        self._print_dict(data, wrap=72)
         self._show_public_keys(artifacts)
 
+    @cli_utils.arg('app',
+                   metavar='application',
+                   help="Application name")
     def deploy(self):
         """Deploy an application, building any applicable artifacts first."""
         # This is just "assembly create" with a little bit of introspection.
         # TODO(datsun180b): Add build() method, and add --build-id argument
         # to this method to allow for build-only and deploy-only workflows.
-        self.parser.add_argument('app',
-                                 help="Application name")
-        self.parser._names['app'] = 'application'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         plan = self.client.plans.find(name_or_id=args.app)
 
         assembly = self.client.assemblies.create(name=plan.name,
@@ -696,26 +1094,61 @@ Available commands:
                   'trigger_uri']
         data = dict([(f, getattr(assembly, f, ''))
                      for f in fields])
-        cliutils.print_dict(data, wrap=72)
-
+        self._print_dict(data, wrap=72)
+
+    @cli_utils.arg('app',
+                   metavar='application',
+                   help="Application name")
+    @cli_utils.arg('--wait',
+                   action='store_true',
+                   help="Wait for the assemblies to be gone before"
+                        " deleting the plan")
+    @cli_utils.arg('--timeout',
+                   type=int,
+                   help="Seconds to wait with --wait. Defaults to 600")
     def delete(self):
         """Delete an application and all related artifacts."""
         # This is "assembly delete" followed by "plan delete".
-        self.parser.add_argument('app',
-                                 help="Application name")
-        self.parser._names['app'] = 'application'
-        args, _ = self.parser.parse_known_args()
+        args = self.args
         plan = self.client.plans.find(name_or_id=args.app)
-        assemblies = [a for a in self.client.assemblies.list()
-                      if a.plan_uri.split('/')[-1] == plan.uuid]
-        for assembly in assemblies:
-            assem = self.client.assemblies.find(name_or_id=assembly.uuid)
-            cli_assem.AssemblyManager(self.client).delete(
-                assembly_id=str(assem.uuid))
+        # The listed assemblies are deleted as they are, all at once.
+        assemblies = self._get_assemblies_by_plan(plan)
+        failed = ['%s (%s)' % (result.item.name, result.error)
+                  for result in self.client.assemblies.delete_many(
+                      assemblies)
+                  if result.error is not None]
+        if failed:
+            raise exc.CommandError(message="Could not delete assemblies: "
+                                   "%s. The plan was kept." %
+                                   ', '.join(failed))
+
+        if args.wait:
+            timeout = args.timeout
+            if timeout is None:
+                timeout = cli_assem.DEFAULT_WAIT_TIMEOUT
+            try:
+                self.client.assemblies.wait_for_removal(assemblies,
+                                                        timeout=timeout)
+            except exc.WaitTimeout as e:
+                raise exc.CommandError(
+                    message="Timed out waiting for assemblies to be "
+                    "deleted: %s. The plan was kept." %
+                    ', '.join(a.name for a in e.pending))
 
         cli_plan.PlanManager(self.client).delete(plan_id=str(plan.uuid))
 
 
+class _HelpFormatter(argparse.HelpFormatter):
+    """HelpFormatter that doesn't look up the terminal size.
+
+    argparse makes one for every argument it adds. The solum CLI prints
+    its own help, so the width they would be formatted to doesn't matter.
+    """
+
+    def __init__(self, prog, width=80, **kwargs):
+        super(_HelpFormatter, self).__init__(prog, width=width, **kwargs)
+
+
 class PermissiveParser(argparse.ArgumentParser):
     """An ArgumentParser that handles errors without exiting.
 
@@ -725,45 +1158,361 @@ class PermissiveParser(argparse.ArgumentParser):
 
     """
 
-    # Used in _check_positional_arguments to give a clearer name to missing
-    # positional arguments.
-    _names = None
+    # The CommandsBase subclass run by the commands this parser reads.
+    command_class = None
 
     def __init__(self, *args, **kwargs):
-        self._names = {}
         kwargs['add_help'] = False
         kwargs['description'] = argparse.SUPPRESS
         kwargs['usage'] = argparse.SUPPRESS
+        kwargs.setdefault('formatter_class', _HelpFormatter)
         super(PermissiveParser, self).__init__(*args, **kwargs)
 
     def error(self, message):
-        raise exc.CommandError(message=message)
+        # Keep track of the parser that failed, so the help of its command
+        # can be shown.
+        e = exc.CommandError(message=message)
+        e.parser = self
+        raise e
 
     def _report_missing_args(self):
         pass
 
-    def parse_known_args(self, *args, **kwargs):
-        # Instead of sys.exit(), how about we just hand back an
-        # empty Namespace and let someone else decide when to exit.
-        ns, rem = argparse.Namespace(), []
+    def parse_known_args(self, args=None, namespace=None):
+        if namespace is None:
+            namespace = argparse.Namespace()
         try:
-            kwargs['namespace'] = ns
-            ns, rem = super(PermissiveParser, self).parse_known_args(
-                *args, **kwargs)
+            return super(PermissiveParser, self).parse_known_args(
+                args, namespace)
         except exc.CommandError:
-            pass
-        self._check_positional_arguments(ns)
-        return ns, rem
+            # Prefer naming the first missing argument over argparse's own
+            # message.
+            self._check_positional_arguments(namespace)
+            raise
 
     def _check_positional_arguments(self, namespace):
         for argument in self._positionals._group_actions:
-            argname = argument.dest
-            localname = self._names.get(argname, argname)
+            localname = argument.metavar or argument.dest
             article = 'an' if localname[0] in 'AEIOUaeiou' else 'a'
-            if not vars(namespace).get(argname):
+            if not vars(namespace).get(argument.dest):
                 message = 'You must specify %(article)s %(localname)s.'
                 message %= {'article': article, 'localname': localname}
-                raise exc.CommandError(message=message)
+                self.error(message)
+
+
+# Options of any action that take no value; see _get_flag_options().
+_flag_options = None
+
+
+def _get_flag_options():
+    global _flag_options
+    if _flag_options is None:
+        _flag_options = set(
+            option
+            for command_class in RESOURCES.values()
+            for action in command_class._get_actions().values()
+            for args, kwargs in getattr(action, 'arguments', [])
+            if kwargs.get('action') in ('store_true', 'store_false',
+                                        'store_const', 'count')
+            for option in args)
+    return _flag_options
+
+
+def _positional_words(argv, limit=None):
+    """Return the words of `argv` that are not options, up to `limit`.
+
+    Options are skipped along with their value, unless they are flags or
+    written as --option=value.
+    """
+    words = []
+    argv = iter(argv)
+    for arg in argv:
+        if limit is not None and len(words) == limit:
+            break
+        if arg == '--':
+            words.extend(argv)
+        elif arg.startswith('-') and arg != '-':
+            if '=' not in arg and arg not in _get_flag_options():
+                next(argv, None)
+        else:
+            words.append(arg)
+    return words[:limit]
+
+
+def _command_words(argv):
+    """Return the resource and action named in `argv`, or None."""
+    return (_positional_words(argv, limit=2) + [None, None])[:2]
+
+
+def build_parser(argv):
+    """Build the parser for the command named in `argv`.
+
+    The resource and action are looked up in RESOURCES first, so the
+    parser only holds the common options and the arguments the action
+    declares with cli_utils.arg, and parsing `argv` once gives the action
+    everything it needs. Options that are not given are left out of the
+    result; parse into cli_utils.default_options() to get a value for
+    each of them.
+    """
+    resource, action = _command_words(argv)
+    parser = PermissiveParser()
+    cli_utils.add_auth_flags(parser)
+    cli_utils.add_global_flags(parser)
+    if resource is None:
+        return parser
+
+    parser.add_argument('resource')
+    arguments = []
+    command_class = RESOURCES.get(resource)
+    if command_class is not None:
+        parser.command_class = command_class
+        if action is not None:
+            parser.add_argument('action')
+            method = command_class._get_actions().get(action)
+            arguments = getattr(method, 'arguments', [])
+    elif resource == 'batch':
+        arguments = _batch.arguments
+    elif resource == 'complete':
+        arguments = _complete.arguments
+    for args, kwargs in arguments:
+        parser.add_argument(*args, **kwargs)
+    return parser
+
+
+def _run_line(argv, options, clients=None):
+    """Run one command line of a shell or batch session.
+
+    :param options: namespace from cli_utils.default_options() holding the
+        values of the options the line does not give
+    :returns: the finished CommandsBase instance
+    """
+    parser = build_parser(argv)
+    if parser.command_class is None:
+        raise exc.CommandError(message='Unknown command "%s".' % argv[0])
+    args, _ = parser.parse_known_args(argv, copy.copy(options))
+    return parser.command_class(args, clients=clients)
+
+
+class SolumShell(cmd.Cmd):
+    """Interactive session that runs solum commands with one client.
+
+    The authenticated client, its connection pool and its cached token are
+    kept for the whole session, so only the first command pays for
+    authentication and connection setup.
+    """
+
+    prompt = 'solum> '
+    intro = ('Solum interactive shell. Type a command without the leading '
+             '"solum", "help" for the list of commands, or "exit" to quit.')
+
+    def __init__(self, options=None, clients=None, **kwargs):
+        cmd.Cmd.__init__(self, **kwargs)
+        # Options given to 'solum shell' itself (credentials, --solum-url)
+        # apply to every command of the session.
+        self.options = options or cli_utils.default_options()
+        self.clients = {} if clients is None else clients
+
+    def default(self, line):
+        try:
+            argv = shlex.split(line)
+            _run_line(argv, self.options, clients=self.clients)
+        except exc.CommandError as e:
+            parser = getattr(e, 'parser', None)
+            if parser is not None and parser.command_class is not None:
+                print(parser.command_class.__doc__)
+            print("ERROR: %s" % e.message)
+        except Exception as e:
+            print("ERROR: %s" % e)
+
+    def emptyline(self):
+        # Don't repeat the previous command.
+        pass
+
+    def do_help(self, arg):
+        if arg in RESOURCES:
+            print(RESOURCES[arg].__doc__)
+        else:
+            print(main.__doc__)
+
+    def do_exit(self, arg):
+        """Leave the shell."""
+        return True
+
+    do_quit = do_exit
+
+    def do_EOF(self, arg):
+        print()
+        return True
+
+
+class _ThreadStdout(object):
+    """Route writes to a per-thread buffer while one is being captured."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def capture(self):
+        buf = six.StringIO()
+        self._local.buffer = buf
+        try:
+            yield buf
+        finally:
+            self._local.buffer = None
+
+    def write(self, data):
+        buf = getattr(self._local, 'buffer', None)
+        (buf if buf is not None else self.stream).write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+BatchCommand = collections.namedtuple('BatchCommand', ['line', 'command'])
+
+
+def read_batch(stream):
+    """Split a batch file into groups of commands that may run together.
+
+    Blank lines and lines starting with '#' are skipped. A line holding
+    only ``wait`` ends a group: nothing after it starts until every
+    command before it has finished.
+
+    :returns: list of lists of :class:`BatchCommand`
+    """
+    groups = [[]]
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line == 'wait':
+            groups.append([])
+        else:
+            groups[-1].append(BatchCommand(number, line))
+    return [group for group in groups if group]
+
+
+def run_batch(stream, options=None, workers=None, clients=None, out=None):
+    """Run the commands of a batch file and write NDJSON results.
+
+    Commands share one set of clients, so authentication and connections
+    are set up once. The first command runs on its own to do that; after
+    it, up to `workers` commands of the same group run at a time. One JSON
+    object is written to `out` per command, in input order, holding the
+    line number, the command, its status ("ok" or "error"), its printed
+    output and the error message.
+
+    :param options: namespace from cli_utils.default_options() holding the
+        values of the options a command does not give
+    :returns: the number of commands that failed
+    """
+    options = options or cli_utils.default_options()
+    workers = workers or parallel.DEFAULT_WORKERS
+    clients = {} if clients is None else clients
+    out = out or sys.stdout
+    groups = read_batch(stream)
+    if groups and len(groups[0]) > 1:
+        groups[0:1] = [groups[0][:1], groups[0][1:]]
+
+    stdout = _ThreadStdout(sys.stdout)
+
+    def run_one(command):
+        argv = shlex.split(command.command)
+        with stdout.capture() as buf:
+            try:
+                handled = _run_line(argv, options, clients=clients)
+                if handled.error is not None:
+                    raise handled.error
+            except Exception as e:
+                # Keep what the command printed before it failed.
+                e.output = buf.getvalue()
+                raise
+            return buf.getvalue()
+
+    failures = 0
+    orig, sys.stdout = sys.stdout, stdout
+    try:
+        for group in groups:
+            for result in parallel.imap(run_one, group, workers=workers):
+                record = {'line': result.item.line,
+                          'command': result.item.command,
+                          'status': 'ok',
+                          'output': result.value,
+                          'error': None}
+                if result.error is not None:
+                    failures += 1
+                    record['status'] = 'error'
+                    record['output'] = getattr(result.error, 'output', '')
+                    record['error'] = str(result.error)
+                out.write(json.dumps(record, sort_keys=True) + '\n')
+                out.flush()
+    finally:
+        sys.stdout = orig
+    return failures
+
+
+RESOURCES = {
+    'app': AppCommands,
+    'plan': PlanCommands,
+    'assembly': AssemblyCommands,
+    'pipeline': PipelineCommands,
+    'languagepack': LanguagePackCommands,
+    'component': ComponentCommands,
+}
+
+
+# Positional arguments, by metavar, that take the name of a resource kept in
+# the completion cache.
+COMPLETED_ARGUMENTS = {
+    'plan': 'plan',
+    'plan URI': 'plan',
+    'application': 'plan',
+    'assembly': 'assembly',
+    'pipeline': 'pipeline',
+    'component': 'component',
+}
+
+
+def complete_words(words, options):
+    """Return the possible values of the last word of a command line.
+
+    :param words: the words of a solum command line after "solum", up to
+        and including the word being completed
+    :param options: namespace from cli_utils.default_options()
+    """
+    typed, prefix = words[:-1], words[-1] if words else ''
+    if typed and typed[-1].startswith('-') and '=' not in typed[-1]:
+        # The value of an option.
+        return []
+
+    positionals = _positional_words(typed)
+    if not positionals:
+        candidates = sorted(RESOURCES) + ['batch', 'help', 'shell']
+    elif positionals[0] not in RESOURCES:
+        candidates = []
+    elif len(positionals) == 1:
+        candidates = sorted(RESOURCES[positionals[0]]._get_actions())
+    else:
+        action = RESOURCES[positionals[0]]._get_actions().get(positionals[1])
+        declared = getattr(action, 'arguments', [])
+        arguments = [(kwargs.get('metavar', args[0]), kwargs.get('nargs'))
+                     for args, kwargs in declared
+                     if not args[0].startswith('-')]
+        index = len(positionals) - 2
+        if arguments and arguments[-1][1] in ('*', '+'):
+            # The last argument takes any number of values.
+            index = min(index, len(arguments) - 1)
+        kind = None
+        if index < len(arguments):
+            kind = COMPLETED_ARGUMENTS.get(arguments[index][0])
+        if kind is None:
+            return []
+        # Credentials given on the command line select the tenant.
+        options, _ = build_parser([]).parse_known_args(typed,
+                                                       copy.copy(options))
+        candidates = completion.read_names(options, kind)
+    return [c for c in candidates if c.startswith(prefix)]
 
 
 def main():
@@ -775,6 +1524,11 @@ Available commands:
     solum help
         Show this help message.
 
+    Commands that print resources accept --format <FORMAT>, one of table
+    (the default), json, ndjson, csv, yaml or value, and --column <NAME>,
+    which may be repeated to pick the columns shown. Formats other than
+    table print each row as soon as it is read.
+
 
     solum app list
         Print an index of all deployed applications.
@@ -782,6 +1536,10 @@ Available commands:
     solum app show <APP>
         Print detailed information about one application.
 
+    solum app status [<APP>...]
+        Print the state of applications: how many of their assemblies
+        are in each status, and their components and pipelines.
+
     solum app create [--planfile <PLANFILE>] [--git-url <GIT_URL>]
                      [--langpack <LANGPACK>] [--run-cmd <RUN_CMD>]
                      [--name <NAME>] [--desc <DESCRIPTION>]
@@ -790,8 +1548,9 @@ Available commands:
     solum app deploy <APP>
         Deploy an application, building any applicable artifacts first.
 
-    solum app delete <APP>
-        Delete an application and all related artifacts.
+    solum app delete <APP> [--wait] [--timeout <SECONDS>]
+        Delete an application and all related artifacts. With --wait,
+        the plan is only deleted once its assemblies are gone.
 
 
     solum plan list
@@ -803,6 +1562,9 @@ Available commands:
     solum plan create <PLANFILE> [--param-file <PARAMFILE>]
         Register a plan with Solum.
 
+    solum plan load <PLANFILE> [--workers <N>]
+        Register every plan in a multi-document YAML file.
+
     solum plan delete <PLAN>
         Destroy a plan. Plans with dependent assemblies cannot be deleted.
 
@@ -813,6 +1575,19 @@ Available commands:
     solum assembly create <NAME> <PLAN_URI> [--description <DESCRIPTION>]
         Create an assembly from a registered plan.
 
+    solum assembly logs <NAME>... [--follow] [--content]
+                        [--strategy <STRATEGY>] [--since <TIME>]
+                        [--until <TIME>] [--fetch <DIR> [--workers <N>]]
+        Print an index of all operation logs for assemblies. With
+        --follow, keep printing logs as they are added. With --content,
+        print what local and Swift logs hold instead of where they are.
+        With --fetch, download them all, a few at a time; fetching
+        again resumes the downloads that did not finish.
+
+    solum assembly wait <NAME>... [--status <STATUS>] [--timeout <SECONDS>]
+        Wait until each assembly is READY (or in a --status given) or
+        failed, printing each one as soon as it is.
+
     solum assembly delete <PLAN>
         Destroy an assembly.
 
@@ -835,36 +1610,117 @@ Available commands:
 
     solum pipeline delete <PIPELINE>
         Destroy a pipeline.
-    """
 
-    parser = PermissiveParser()
 
-    resources = {
-        'app': AppCommands,
-        'plan': PlanCommands,
-        'assembly': AssemblyCommands,
-        'pipeline': PipelineCommands,
-        'languagepack': LanguagePackCommands,
-        'component': ComponentCommands,
-    }
+    solum batch <FILE> [--workers <N>]
+        Run the commands listed in FILE ('-' for stdin), up to N at a
+        time, over one authenticated client. A line reading "wait" waits
+        for the commands before it. One JSON result per command is
+        printed, in input order.
 
-    choices = resources.keys()
+    solum shell
+        Start an interactive session. Commands are typed without the
+        leading "solum" and share one authenticated connection.
 
-    parser.add_argument('resource', choices=choices,
-                        default='help',
-                        help="Target noun to act upon")
+    solum complete -- <WORD>...
+        Print the possible values of the last WORD of a solum command
+        line, for the bash and zsh completion scripts in tools/. Names of
+        resources come from a local cache that is refreshed in the
+        background every SOLUM_COMPLETION_TTL seconds (300 by default).
 
-    parsed, _ = parser.parse_known_args()
-    resource = vars(parsed).get('resource')
+    solum complete --refresh <RESOURCE>
+        Refresh the cached names of plans, assemblies, pipelines or
+        components now.
+    """
 
-    if resource in resources:
+    parser = build_parser(sys.argv[1:])
+    try:
+        args, _ = parser.parse_known_args(
+            namespace=cli_utils.default_options())
+    except exc.CommandError as ce:
+        command_class = parser.command_class
+        print(command_class.__doc__ if command_class else main.__doc__)
+        print("ERROR: %s" % ce.message)
+        return
+
+    resource = getattr(args, 'resource', None)
+    if resource in RESOURCES:
         try:
-            resources[resource](parser)
+            if RESOURCES[resource](args).error is not None:
+                return 1
         except Exception as e:
-            print("ERROR: %s" % e.message)
-
+            print("ERROR: %s" % six.text_type(e))
+            return 1
+    elif resource == 'shell':
+        SolumShell(options=cli_utils.default_options(args)).cmdloop()
+    elif resource == 'batch':
+        return _batch(args)
+    elif resource == 'complete':
+        return _complete(args)
     else:
         print(main.__doc__)
 
+
+@cli_utils.arg('batch_file',
+               metavar='batch file',
+               help="File of solum commands, one per line, "
+                    "or '-' for stdin")
+@cli_utils.arg('--workers',
+               type=int,
+               help="Number of commands to run at the same time")
+def _batch(args):
+    try:
+        workers = _check_workers(args.workers)
+        if args.batch_file == '-':
+            commands = sys.stdin.readlines()
+        else:
+            try:
+                with open(args.batch_file) as batch_file:
+                    commands = batch_file.readlines()
+            except IOError:
+                raise exc.CommandError(message="Could not open batch file "
+                                       "%s." % args.batch_file)
+    except exc.CommandError as ce:
+        print("ERROR: %s" % ce.message)
+        return 2
+    return 1 if run_batch(commands,
+                          options=cli_utils.default_options(args),
+                          workers=workers) else 0
+
+
+@cli_utils.arg('words',
+               metavar='word',
+               nargs='*',
+               help="Words of the command line to complete, after '--'")
+@cli_utils.arg('--refresh',
+               metavar='resource',
+               help="Cache the names of this resource now")
+def _complete(args):
+    try:
+        if args.refresh:
+            if args.refresh not in completion.MANAGERS:
+                raise exc.CommandError(message='Cannot complete names of '
+                                       '"%s".' % args.refresh)
+            cli_utils.CommandsBase._check_auth_flags(args)
+            completion.refresh(cli_utils.make_client(args), args,
+                               args.refresh)
+        else:
+            for word in complete_words(args.words, args):
+                print(word)
+    except Exception as e:
+        print("ERROR: %s" % e)
+        return 1
+    return 0
+
+
+def _check_workers(workers):
+    """Return the number of workers asked for with --workers."""
+    if workers is None:
+        return parallel.DEFAULT_WORKERS
+    if workers < 1:
+        raise exc.CommandError(message="--workers must be at least 1.")
+    return workers
+
+
 if __name__ == '__main__':
     sys.exit(main())
@@ -15,11 +15,34 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import threading
+
 import fixtures
 from oslotest import base
 import testscenarios
 
 
+class FakeClock(object):
+    """Stands for the `time` module of the modules under test.
+
+    Time only passes when slept, so waits and back-offs are checked
+    without waiting; `sleeps` holds the seconds of each sleep.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
 class TestCase(testscenarios.WithScenarios, base.BaseTestCase):
 
     """Test case base class for all unit tests."""
@@ -29,3 +52,17 @@ class TestCase(testscenarios.WithScenarios, base.BaseTestCase):
 
         super(TestCase, self).setUp()
         self.log_fixture = self.useFixture(fixtures.FakeLogger())
+
+    def use_fake_clock(self, *modules):
+        """Give `modules` a :class:`FakeClock` in place of `time`.
+
+        Only the name `time` of each module is patched, not the time
+        module itself, so other code and threads keep the real clock.
+
+        :returns: the clock
+        """
+        clock = FakeClock()
+        for module in modules:
+            self.useFixture(fixtures.MonkeyPatch(
+                '%s.time' % module.__name__, clock))
+        return clock
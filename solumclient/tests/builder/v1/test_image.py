@@ -12,8 +12,17 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
+import os
+
+import fixtures
+import mock
+
 from solumclient.builder.v1 import client as builder_client
 from solumclient.builder.v1 import image
+from solumclient.common import exc
+from solumclient.common import polling
+from solumclient.openstack.common.apiclient import exceptions
 from solumclient.openstack.common.apiclient import fake_client
 from solumclient.tests import base
 
@@ -71,3 +80,170 @@ class ImageManagerTest(base.TestCase):
         self.assertEqual(image_fixture['type'], image_obj.type)
         self.assertEqual(image_fixture['project_id'], image_obj.project_id)
         self.assertEqual(image_fixture['user_id'], image_obj.user_id)
+
+
+class ImageWaitTest(base.TestCase):
+
+    def setUp(self):
+        super(ImageWaitTest, self).setUp()
+        self.mgr = image.ImageManager(None)
+        self.clock = self.use_fake_clock(polling, image)
+
+    def set_states(self, **states):
+        """Make get() return, for each uuid, its states one poll at a time.
+
+        The last state is returned for every poll after it.
+        """
+        def get(image_id):
+            left = states[image_id]
+            state = left.pop(0) if len(left) > 1 else left[0]
+            return image.Image(self.mgr, {'uuid': image_id, 'name': image_id,
+                                          'state': state}, loaded=True)
+        self.mgr.get = mock.Mock(side_effect=get)
+
+    def test_watch(self):
+        self.set_states(i1=['QUEUED', 'BUILDING', 'BUILDING', 'READY'],
+                        i2=['BUILDING', 'ERROR'])
+        changes = [(c.image.uuid, c.previous, c.image.state)
+                   for c in self.mgr.watch(['i1', 'i2'], timeout=60)]
+        self.assertEqual([('i1', None, 'QUEUED'), ('i2', None, 'BUILDING'),
+                          ('i1', 'QUEUED', 'BUILDING'),
+                          ('i2', 'BUILDING', 'ERROR'),
+                          ('i1', 'BUILDING', 'READY')], changes)
+        # Settled images are not fetched again.
+        self.assertEqual(6, self.mgr.get.call_count)
+        # Polls back off while no state changes.
+        self.assertEqual([1, 1, 2], self.clock.sleeps)
+
+    def test_watch_repeated_images(self):
+        self.set_states(i1=['BUILDING', 'READY'])
+        changes = [(c.image.uuid, c.image.state) for c in self.mgr.watch(
+            ['i1', image.Image(self.mgr, {'uuid': 'i1'}, loaded=True), 'i1'],
+            timeout=60)]
+        self.assertEqual([('i1', 'BUILDING'), ('i1', 'READY')], changes)
+        self.assertEqual(2, self.mgr.get.call_count)
+
+    def test_wait_for(self):
+        self.set_states(i1=['BUILDING', 'READY'])
+        built = self.mgr.wait_for(image.Image(self.mgr, {'uuid': 'i1'},
+                                              loaded=True))
+        self.assertEqual('READY', built.state)
+
+    def test_wait_for_timeout(self):
+        self.set_states(i1=['BUILDING'])
+        e = self.assertRaises(exc.WaitTimeout, self.mgr.wait_for, 'i1',
+                              timeout=10)
+        self.assertEqual(['BUILDING'], [i.state for i in e.pending])
+
+
+class ImageBuildManyTest(base.TestCase):
+
+    def setUp(self):
+        super(ImageBuildManyTest, self).setUp()
+        self.mgr = image.ImageManager(None)
+        self.clock = self.use_fake_clock(polling, image)
+
+    def make_image(self, uuid, state):
+        return image.Image(self.mgr, {'uuid': uuid, 'name': uuid,
+                                      'state': state}, loaded=True)
+
+    def test_load_manifest(self):
+        tempdir = self.useFixture(fixtures.TempDir()).path
+        with open(os.path.join(tempdir, 'java.json'), 'w') as metadata:
+            json.dump({'OS': 'Ubuntu'}, metadata)
+        manifest = os.path.join(tempdir, 'manifest.yaml')
+        with open(manifest, 'w') as f:
+            f.write('- name: java\n'
+                    '  git_url: git://example.com/java.git\n'
+                    '  lp_metadata: java.json\n'
+                    '- name: php\n'
+                    '  git_url: git://example.com/php.git\n'
+                    '  lp_metadata: {OS: Fedora}\n'
+                    '- name: go\n'
+                    '  git_url: git://example.com/go.git\n')
+        self.assertEqual(
+            [('java', 'git://example.com/java.git', '{"OS": "Ubuntu"}'),
+             ('php', 'git://example.com/php.git', '{"OS": "Fedora"}'),
+             ('go', 'git://example.com/go.git', None)],
+            image.load_manifest(manifest))
+
+        with open(manifest, 'w') as f:
+            f.write('- name: java\n')
+        e = self.assertRaises(ValueError, image.load_manifest, manifest)
+        self.assertIn('Entry 1', str(e))
+
+    def test_throttle(self):
+        throttle = image._Throttle(4)
+        busy = exceptions.HttpError(http_status=429)
+        busy.retry_after = 7
+        func = mock.Mock(side_effect=[exceptions.ServiceUnavailable(),
+                                      busy, 'done'])
+        self.assertEqual('done', throttle.call(func, image_id='i1'))
+        func.assert_called_with(image_id='i1')
+        # Halved twice, then raised by one.
+        self.assertEqual(2, throttle.limit)
+        self.assertEqual([image.RETRY_DELAY, 7], self.clock.sleeps)
+        self.assertEqual(0, throttle.running)
+
+        func = mock.Mock(side_effect=exceptions.NotFound())
+        self.assertRaises(exceptions.NotFound, throttle.call, func)
+        self.assertEqual(1, func.call_count)
+
+        func = mock.Mock(side_effect=exceptions.ServiceUnavailable())
+        self.assertRaises(exceptions.ServiceUnavailable, throttle.call, func)
+        self.assertEqual(image.MAX_RETRIES + 1, func.call_count)
+
+    def test_build_many(self):
+        specs = [image.BuildSpec('i%d' % n, 'git://example.com/%d.git' % n,
+                                 None) for n in range(1, 4)]
+
+        def create(name, source_uri, lp_metadata):
+            if name == 'i3':
+                raise exceptions.BadRequest()
+            return self.make_image(name, 'QUEUED')
+        self.mgr.create = mock.Mock(side_effect=create)
+        states = {'i1': ['BUILDING', 'READY'], 'i2': ['BUILDING']}
+
+        def get(image_id):
+            left = states[image_id]
+            return self.make_image(image_id,
+                                   left.pop(0) if len(left) > 1 else left[0])
+        self.mgr.get = mock.Mock(side_effect=get)
+
+        changes = []
+        builds = self.mgr.build_many(specs, workers=2, timeout=10,
+                                     on_change=changes.append)
+        self.assertEqual(specs, [build.spec for build in builds])
+        self.assertEqual(['READY', 'BUILDING'],
+                         [build.image.state for build in builds[:2]])
+        self.assertEqual(1, builds[0].duration)
+        self.assertIsNone(builds[1].duration)
+        self.assertIsNone(builds[2].image)
+        self.assertIsInstance(builds[2].error, exceptions.BadRequest)
+        self.assertEqual([('i1', None), ('i2', None), ('i1', 'BUILDING')],
+                         [(c.image.uuid, c.previous) for c in changes])
+
+    def test_build_many_keeps_builds_when_a_get_fails(self):
+        specs = [image.BuildSpec('i%d' % n, 'git://example.com/%d.git' % n,
+                                 None) for n in range(1, 3)]
+        self.mgr.create = mock.Mock(
+            side_effect=lambda name, **kwargs: self.make_image(name,
+                                                               'QUEUED'))
+        states = {'i1': ['BUILDING', 'READY'],
+                  'i2': ['BUILDING', exceptions.InternalServerError()]}
+
+        def get(image_id):
+            state = states[image_id].pop(0)
+            if isinstance(state, Exception):
+                raise state
+            return self.make_image(image_id, state)
+        self.mgr.get = mock.Mock(side_effect=get)
+
+        builds = self.mgr.build_many(specs, workers=2, timeout=10)
+        self.assertEqual(['i1', 'i2'], [build.image.uuid for build in builds])
+        self.assertEqual('READY', builds[0].image.state)
+        self.assertIsNone(builds[0].error)
+        self.assertEqual('BUILDING', builds[1].image.state)
+        self.assertIsNone(builds[1].finished)
+        self.assertIsInstance(builds[1].error,
+                              exceptions.InternalServerError)
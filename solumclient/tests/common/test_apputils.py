@@ -0,0 +1,126 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import threading
+
+import mock
+
+from solumclient.common import apputils
+from solumclient.tests import base
+
+Plan = collections.namedtuple('Plan', 'uuid name')
+Assembly = collections.namedtuple('Assembly', 'uuid plan_uri status')
+Component = collections.namedtuple('Component', 'uuid assembly_uuid')
+Pipeline = collections.namedtuple('Pipeline', 'uuid plan_uri')
+
+
+class TestAppUtils(base.TestCase):
+
+    def setUp(self):
+        super(TestAppUtils, self).setUp()
+        self.plans = [Plan('p1', 'web'), Plan('p2', 'db'), Plan('p3', 'new')]
+        self.assemblies = [
+            Assembly('a1', 'http://x/v1/plans/p1', 'READY'),
+            Assembly('a2', 'http://x/v1/plans/p1', 'BUILDING'),
+            Assembly('a3', 'http://x/v1/plans/p1', 'READY'),
+            Assembly('a4', 'http://x/v1/plans/p2', 'ERROR'),
+            Assembly('a5', 'http://x/v1/plans/gone', 'READY')]
+        self.components = [Component('c1', 'a1'), Component('c2', 'a1'),
+                           Component('c3', 'a4'), Component('c4', 'a5')]
+        self.pipelines = [Pipeline('l1', 'http://x/v1/plans/p2/')]
+        self.index = apputils.ResourceIndex(
+            self.plans, self.assemblies, self.components, self.pipelines)
+
+    def test_app_statuses(self):
+        self.assertEqual(
+            [('web', 'p1', 'IN PROGRESS', '2 READY, 1 BUILDING', 2, 0),
+             ('db', 'p2', 'FAILED', '1 ERROR', 1, 1),
+             ('new', 'p3', 'NOT DEPLOYED', '', 0, 0)],
+            apputils.app_statuses(self.index, self.plans))
+
+    def test_index_relations(self):
+        index = self.index
+        self.assertEqual(self.assemblies[:3], index.assemblies_of('p1'))
+        self.assertEqual(self.assemblies[:3],
+                         index.assemblies_of(self.plans[0]))
+        self.assertEqual([], index.assemblies_of('p3'))
+        self.assertEqual(self.components[:2],
+                         index.components_of(self.assemblies[0]))
+        self.assertEqual(self.pipelines, index.pipelines_of('p2'))
+        self.assertEqual(self.plans[1], index.plan_of(self.pipelines[0]))
+        self.assertIsNone(index.plan_of(self.assemblies[4]))
+        self.assertEqual(self.components[2], index.get('components', 'c3'))
+
+    def test_index_add_remove(self):
+        index = self.index
+        created = Assembly('a6', 'http://x/v1/plans/p3', 'BUILDING')
+        index.add('assemblies', created)
+        self.assertEqual([created], index.assemblies_of('p3'))
+        # Re-adding a uuid replaces the resource, under its new parent.
+        ready = Assembly('a2', 'http://x/v1/plans/p3', 'READY')
+        index.add('assemblies', ready)
+        self.assertEqual([self.assemblies[0], self.assemblies[2]],
+                         index.assemblies_of('p1'))
+        self.assertEqual([created, ready], index.assemblies_of('p3'))
+
+        self.assertEqual(created, index.remove('assemblies', 'a6'))
+        self.assertEqual(ready, index.remove('assemblies', ready))
+        self.assertIsNone(index.remove('assemblies', 'a6'))
+        self.assertEqual([], index.assemblies_of('p3'))
+        self.assertIsNone(index.get('assemblies', 'a2'))
+        # Children stay indexed until they are removed too.
+        self.assertEqual(self.components[:2], index.components_of('a1'))
+        index.remove('assemblies', 'a1')
+        self.assertEqual(self.components[:2], index.components_of('a1'))
+
+    def test_index_from_client(self):
+        client = mock.Mock()
+        for name in apputils.COLLECTIONS:
+            getattr(client, name).list.return_value = []
+        client.assemblies.list.return_value = self.assemblies
+        index = apputils.ResourceIndex.from_client(client)
+        self.assertEqual(self.assemblies[3:4], index.assemblies_of('p2'))
+
+    def test_rollup(self):
+        self.assertEqual('READY', apputils.rollup(['READY', 'READY']))
+        self.assertEqual('FAILED', apputils.rollup(['READY', 'BUILD_FAILED']))
+        self.assertEqual('IN PROGRESS', apputils.rollup(['READY', None]))
+        self.assertEqual('NOT DEPLOYED', apputils.rollup([]))
+
+    def test_list_all_is_concurrent(self):
+        client = mock.Mock()
+        all_started = threading.Event()
+        started = []
+
+        def listing(name):
+            def list_collection():
+                # Every listing waits for all four to have started.
+                started.append(name)
+                if len(started) == len(apputils.COLLECTIONS):
+                    all_started.set()
+                self.assertTrue(all_started.wait(5))
+                return iter([name])
+            return list_collection
+
+        for name in apputils.COLLECTIONS:
+            getattr(client, name).list = listing(name)
+        listed = apputils.list_all(client)
+        self.assertEqual(dict((name, [name])
+                              for name in apputils.COLLECTIONS), listed)
+
+    def test_list_all_error(self):
+        client = mock.Mock()
+        for name in apputils.COLLECTIONS:
+            getattr(client, name).list.return_value = []
+        client.components.list.side_effect = ValueError('down')
+        self.assertRaises(ValueError, apputils.list_all, client)
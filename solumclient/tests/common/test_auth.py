@@ -75,6 +75,18 @@ class KeystoneAuthPluginTest(base.TestCase):
         self.assertIsInstance(token, mock.MagicMock)
         self.assertEqual("http://solum", endpoint)
 
+    def test_catalog_endpoint(self, mock_ksclient):
+        self.assertIsNone(self.cs.auth_plugin.catalog_endpoint(
+            "publicURL", "object-store"))
+        catalog = mock_ksclient.return_value.service_catalog
+        catalog.url_for.return_value = "http://swift"
+        self.cs.auth_plugin.opts['endpoint'] = "http://solum"
+        self.cs.authenticate()
+        self.assertEqual("http://swift", self.cs.auth_plugin.catalog_endpoint(
+            "publicURL", "object-store"))
+        catalog.url_for.assert_called_with(service_type="object-store",
+                                           endpoint_type="publicURL")
+
 
 @mock.patch.object(ksclient, 'Client')
 class KeystoneAuthPluginTokenTest(base.TestCase):
@@ -89,3 +101,4 @@ class KeystoneAuthPluginTokenTest(base.TestCase):
             "fake-endpoint-type", "fake-service-type")
         self.assertEqual('fake-token', token)
         self.assertEqual('http://solum', endpoint)
+        self.assertFalse(mock_ksclient.called)
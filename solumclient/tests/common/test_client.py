@@ -16,6 +16,7 @@ import mock
 import requests
 
 from solumclient.common import client
+from solumclient.common import yamlutils
 from solumclient.openstack.common.apiclient import auth
 from solumclient.openstack.common.apiclient import client as api_client
 from solumclient.openstack.common.apiclient import exceptions
@@ -67,3 +68,23 @@ class ClientTest(base.TestCase):
             self.assertRaises(
                 exceptions.HttpError, http_client.client_request,
                 TestClient(http_client), "GET", "/resource")
+
+    def test_chunked_body_resent_after_unauthorized(self):
+        http_client = client.HTTPClient(FakeAuthPlugin())
+        plan = {'version': 1, 'name': 'ex_plan1',
+                'artifacts': [{'name': 'web'}]}
+        sent = []
+
+        def request(method, url, **kwargs):
+            sent.append(''.join(kwargs['data']))
+            resp = requests.Response()
+            resp.status_code = 401 if len(sent) == 1 else 201
+            return resp
+
+        with mock.patch("requests.Session.request", side_effect=request):
+            http_client.client_request(
+                TestClient(http_client), "POST", "/v1/plans",
+                data=yamlutils.DumpChunks(plan))
+        self.assertEqual(2, len(sent))
+        self.assertEqual(sent[0], sent[1])
+        self.assertEqual(plan, yamlutils.load(sent[1]))
@@ -30,23 +30,20 @@ class TestCli_Utils(base.TestCase):
                       'OS_PASSWORD': 'password',
                       'OS_TENANT_NAME': 'tenant_name',
                       'OS_AUTH_URL': 'http://no.where'},
-            output={'solum_api_version': '1',
-                    'os_username': 'username',
+            output={'os_username': 'username',
                     'solum_url': '',
                     'os_tenant_name': 'tenant_name',
                     'os_auth_url': 'http://no.where',
-                    'os_password': 'password',
-                    'action': 'create'})),
+                    'os_password': 'password'})),
         ('token', dict(
             fake_env={'OS_AUTH_TOKEN': '123456',
                       'SOLUM_URL': 'http://10.0.2.15:9777'},
             output={'os_auth_url': '',
+                    'os_auth_token': '123456',
                     'solum_url': 'http://10.0.2.15:9777',
-                    'solum_api_version': '1',
                     'os_username': '',
                     'os_tenant_name': '',
-                    'os_password': '',
-                    'action': 'create'})),
+                    'os_password': ''})),
         ('solum_url_with_no_token', dict(
             fake_env={'OS_USERNAME': 'username',
                       'OS_PASSWORD': 'password',
@@ -55,11 +52,9 @@ class TestCli_Utils(base.TestCase):
                       'SOLUM_URL': 'http://10.0.2.15:9777'},
             output={'os_auth_url': 'http://no.where',
                     'solum_url': 'http://10.0.2.15:9777',
-                    'solum_api_version': '1',
                     'os_username': 'username',
                     'os_tenant_name': 'tenant_name',
-                    'os_password': 'password',
-                    'action': 'create'})),
+                    'os_password': 'password'})),
     ]
 
     # Patch os.environ to avoid reading auth info
@@ -68,18 +63,48 @@ class TestCli_Utils(base.TestCase):
         env = dict((k, v) for k, v in self.fake_env.items() if k != exclude)
         self.useFixture(fixtures.MonkeyPatch('os.environ', env))
 
-    def fake_argv(self):
-        self.useFixture(fixtures.MonkeyPatch('sys.argv', ['foo', 'create']))
-
     @mock.patch.object(solum_client, "get_client")
     def test_env_parsing(self, mock_get_client):
-        parser = solumclient.solum.PermissiveParser()
-
         self.make_env()
-        self.fake_argv()
-        FakeCommands(parser)
-        mock_get_client.assert_called_once_with(
-            self.output['solum_api_version'], **self.output)
+        FakeCommands(parse_args(['create']))
+        mock_get_client.assert_called_once_with('1', **self.output)
+
+
+class TestCli_UtilsToken(base.TestCase):
+
+    @mock.patch.object(solum_client, "get_client")
+    def test_token_requires_solum_url(self, mock_get_client):
+        self.useFixture(fixtures.MonkeyPatch(
+            'os.environ', {'OS_AUTH_TOKEN': '123456'}))
+        command = FakeCommands(parse_args(['create']))
+        self.assertFalse(mock_get_client.called)
+        self.assertIn('--solum-url', command.error.message)
+
+    def test_action_arguments(self):
+        self.useFixture(fixtures.MonkeyPatch('os.environ', {}))
+        argv = ['--format', 'json', 'plan', 'show', 'myplan',
+                '--os-username', 'user']
+        parser = solumclient.solum.build_parser(argv)
+        args, _ = parser.parse_known_args(argv, cli_utils.default_options())
+        self.assertEqual('plan', args.resource)
+        self.assertEqual('show', args.action)
+        self.assertEqual('myplan', args.plan_uuid)
+        self.assertEqual('user', args.os_username)
+        self.assertEqual('json', args.output_format)
+        self.assertEqual('', args.os_password)
+
+    def test_actions_are_cached(self):
+        actions = FakeCommands._get_actions()
+        self.assertEqual(['create'], list(actions))
+        self.assertIs(actions, FakeCommands._get_actions())
+
+
+def parse_args(argv):
+    parser = solumclient.solum.PermissiveParser()
+    cli_utils.add_auth_flags(parser)
+    cli_utils.add_global_flags(parser)
+    parser.add_argument('action')
+    return parser.parse_known_args(argv, cli_utils.default_options())[0]
 
 
 class FakeCommands(cli_utils.CommandsBase):
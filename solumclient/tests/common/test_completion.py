@@ -0,0 +1,92 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import subprocess
+import time
+
+import fixtures
+import mock
+
+from solumclient.common import cli_utils
+from solumclient.common import completion
+from solumclient.tests import base
+
+
+class FakePlan(object):
+    NAME_ATTR = 'name'
+
+    def __init__(self, uuid, name):
+        self.uuid = uuid
+        self.name = name
+
+
+class TestCompletion(base.TestCase):
+
+    def setUp(self):
+        super(TestCompletion, self).setUp()
+        self.cache = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.MonkeyPatch('os.environ', {
+            'SOLUM_COMPLETION_CACHE': self.cache,
+            'OS_TENANT_NAME': 'tenant',
+            'OS_AUTH_URL': 'http://auth'}))
+        self.options = cli_utils.default_options()
+        patcher = mock.patch.object(subprocess, 'Popen')
+        self.popen = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_dir_is_per_tenant(self):
+        other = cli_utils.default_options()
+        other.os_tenant_name = 'other'
+        self.assertTrue(completion.cache_dir(self.options).startswith(
+            self.cache))
+        self.assertEqual(completion.cache_dir(self.options),
+                         completion.cache_dir(cli_utils.default_options()))
+        self.assertNotEqual(completion.cache_dir(self.options),
+                            completion.cache_dir(other))
+
+    def test_read_fresh_cache(self):
+        completion.write_names(self.options, 'plan', ['b', 'a', 'b'])
+        self.assertEqual(['a', 'b'],
+                         completion.read_names(self.options, 'plan'))
+        self.assertFalse(self.popen.called)
+
+    def test_read_missing_cache_refreshes(self):
+        self.assertEqual([], completion.read_names(self.options, 'plan'))
+        self.assertEqual(1, self.popen.call_count)
+        argv = self.popen.call_args[0][0]
+        self.assertEqual(['complete', '--refresh', 'plan'], argv[-3:])
+        env = self.popen.call_args[1]['env']
+        self.assertEqual('tenant', env['OS_TENANT_NAME'])
+
+        # Don't start another refresh until the first one had its chance.
+        completion.read_names(self.options, 'plan')
+        self.assertEqual(1, self.popen.call_count)
+
+    def test_read_stale_cache_refreshes(self):
+        completion.write_names(self.options, 'plan', ['a'])
+        path = os.path.join(completion.cache_dir(self.options), 'plan')
+        old = time.time() - completion.DEFAULT_TTL - 1
+        os.utime(path, (old, old))
+        self.assertEqual(['a'], completion.read_names(self.options, 'plan'))
+        self.assertEqual(1, self.popen.call_count)
+
+    def test_refresh(self):
+        client = mock.Mock()
+        client.plans.list.return_value = [FakePlan('u1', 'one'),
+                                          FakePlan('u2', None)]
+        completion.spawn_refresh(self.options, 'plan')
+        completion.refresh(client, self.options, 'plan')
+        self.assertEqual(['one', 'u2'],
+                         completion.read_names(self.options, 'plan'))
+        self.assertEqual(
+            ['plan'], os.listdir(completion.cache_dir(self.options)))
@@ -51,3 +51,13 @@ class ExceptionTest(base.TestCase):
         self.assertEqual(method, ex.method)
         self.assertEqual(url, ex.url)
         self.assertEqual(status_code, ex.http_status)
+
+    def test_from_response_with_retry_after(self):
+        ex = exc.from_response(
+            FakeResponse(status_code=503,
+                         headers={"Content-Type": "text/plain",
+                                  "retry-after": "7"},
+                         text="busy"),
+            'POST', 'http://example.com:9777/v1/images')
+        self.assertIsInstance(ex, exceptions.ServiceUnavailable)
+        self.assertEqual(7, ex.retry_after)
@@ -0,0 +1,146 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import json
+
+import mock
+import six
+
+from solumclient.common import exc
+from solumclient.common import formatutils
+from solumclient.common import tableutils
+from solumclient.common import yamlutils
+from solumclient.tests import base
+
+Resource = collections.namedtuple('Resource', 'uuid name description')
+
+RESOURCES = [Resource('u1', 'one', 'first'),
+             Resource('u2', 'two', None)]
+FIELDS = ['uuid', 'name', 'description']
+
+
+class TestFormatUtils(base.TestCase):
+
+    def _print_list(self, objs, **kwargs):
+        out = six.StringIO()
+        formatutils.print_list(objs, FIELDS, out=out, **kwargs)
+        return out.getvalue()
+
+    def _print_dict(self, dct, **kwargs):
+        out = six.StringIO()
+        formatutils.print_dict(dct, out=out, **kwargs)
+        output = out.getvalue()
+        # Python 2 writes UTF-8.
+        if isinstance(output, six.binary_type):
+            output = output.decode('utf-8')
+        return output
+
+    @mock.patch.object(tableutils, 'print_table')
+    def test_list_table(self, mock_print_table):
+        formatutils.print_list(RESOURCES, FIELDS, columns=['name', 'uuid'])
+        mock_print_table.assert_called_once_with(
+            mock.ANY, ['name', 'uuid'], sortby_index=1, sample=None,
+            out=None)
+        self.assertEqual([['one', 'u1'], ['two', 'u2']],
+                         list(mock_print_table.call_args[0][0]))
+
+    @mock.patch.object(tableutils, 'print_table')
+    def test_list_table_sort_column_not_shown(self, mock_print_table):
+        formatutils.print_list(RESOURCES, FIELDS, columns=['name'],
+                               sample=10)
+        mock_print_table.assert_called_once_with(
+            mock.ANY, ['name'], sortby_index=None, sample=10, out=None)
+
+    def test_list_table_output(self):
+        self.assertEqual(
+            '+------+------+-------------+\n'
+            '| uuid | name | description |\n'
+            '+------+------+-------------+\n'
+            '| u1   | one  | first       |\n'
+            '| u2   | two  | None        |\n'
+            '+------+------+-------------+\n',
+            self._print_list(RESOURCES[::-1]))
+
+    def test_list_json(self):
+        output = self._print_list(RESOURCES, fmt='json')
+        self.assertEqual([{'uuid': 'u1', 'name': 'one',
+                           'description': 'first'},
+                          {'uuid': 'u2', 'name': 'two',
+                           'description': None}],
+                         json.loads(output))
+
+    def test_list_json_empty(self):
+        self.assertEqual([], json.loads(self._print_list([], fmt='json')))
+
+    def test_list_ndjson_streams(self):
+        out = six.StringIO()
+
+        def resources():
+            yield RESOURCES[0]
+            # The first row is written before the next one is read.
+            self.assertEqual({'uuid': 'u1'}, json.loads(out.getvalue()))
+            yield RESOURCES[1]
+
+        formatutils.print_list(resources(), FIELDS, fmt='ndjson',
+                               columns=['uuid'], out=out)
+        self.assertEqual('{"uuid": "u1"}\n{"uuid": "u2"}\n', out.getvalue())
+
+    def test_list_csv(self):
+        output = self._print_list(RESOURCES, fmt='csv')
+        self.assertEqual('uuid,name,description\nu1,one,first\nu2,two,\n',
+                         output)
+
+    def test_list_yaml(self):
+        output = self._print_list(RESOURCES, fmt='yaml', columns=['uuid'])
+        self.assertEqual([{'uuid': 'u1'}, {'uuid': 'u2'}],
+                         yamlutils.load(output))
+
+    def test_list_value(self):
+        output = self._print_list(RESOURCES, fmt='value',
+                                  columns=['name', 'uuid'])
+        self.assertEqual('one u1\ntwo u2\n', output)
+
+    def test_unknown_format(self):
+        self.assertRaises(exc.CommandError, formatutils.print_list,
+                          RESOURCES, FIELDS, fmt='xml')
+
+    def test_unknown_column(self):
+        e = self.assertRaises(exc.CommandError, formatutils.print_list,
+                              RESOURCES, FIELDS, fmt='json',
+                              columns=['uuid', 'bogus'])
+        self.assertIn('bogus', str(e))
+
+    def test_dict_table(self):
+        dct = collections.OrderedDict([('uuid', u'\u00e9t\u00e9'),
+                                       ('name', 'one'),
+                                       ('description', None)])
+        # Text, not the repr of bytes, on Python 3.
+        self.assertEqual(
+            u'+-------------+-------+\n'
+            u'| Property    | Value |\n'
+            u'+-------------+-------+\n'
+            u'| uuid        | \u00e9t\u00e9   |\n'
+            u'| name        | one   |\n'
+            u'| description | None  |\n'
+            u'+-------------+-------+\n',
+            self._print_dict(dct))
+
+    def test_dict_json(self):
+        output = self._print_dict({'a': 1, 'b': 2}, fmt='json',
+                                  columns=['b'])
+        self.assertEqual({'b': 2}, json.loads(output))
+
+    def test_dict_value(self):
+        output = self._print_dict({'a': 1, 'b': 2}, fmt='value',
+                                  columns=['b', 'a'])
+        self.assertEqual('2\n1\n', output)
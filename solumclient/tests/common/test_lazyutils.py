@@ -0,0 +1,40 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from solumclient.common import lazyutils
+from solumclient.common import yamlutils
+from solumclient.tests import base
+
+
+class TestLazyUtils(base.TestCase):
+
+    def test_import_deferred(self):
+        with mock.patch.object(lazyutils.importutils,
+                               'import_module') as import_module:
+            lazyutils.lazy_module('solumclient.common.yamlutils')
+            self.assertFalse(import_module.called)
+
+    def test_attribute_access(self):
+        lazy = lazyutils.lazy_module('solumclient.common.yamlutils')
+        self.assertIs(yamlutils.load, lazy.load)
+
+    def test_patching_real_module_is_seen(self):
+        lazy = lazyutils.lazy_module('solumclient.common.yamlutils')
+        with mock.patch.object(yamlutils, 'dump') as mock_dump:
+            lazy.dump({})
+        mock_dump.assert_called_once_with({})
+
+    def test_missing_module(self):
+        lazy = lazyutils.lazy_module('solumclient.no_such_module')
+        self.assertRaises(ImportError, getattr, lazy, 'anything')
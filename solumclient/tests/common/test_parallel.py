@@ -0,0 +1,98 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import threading
+import time
+
+from solumclient.common import parallel
+from solumclient.tests import base
+
+
+class TestParallel(base.TestCase):
+
+    def test_imap_preserves_order(self):
+        def slow_square(n):
+            time.sleep(0.01 * (5 - n))
+            return n * n
+
+        results = list(parallel.imap(slow_square, range(5), workers=5))
+        self.assertEqual([0, 1, 2, 3, 4], [r.item for r in results])
+        self.assertEqual([0, 1, 4, 9, 16], [r.value for r in results])
+        self.assertTrue(all(r.error is None for r in results))
+
+    def test_imap_captures_errors(self):
+        def fail_on_two(n):
+            if n == 2:
+                raise ValueError('two')
+            return n
+
+        results = list(parallel.imap(fail_on_two, range(4), workers=2))
+        self.assertEqual([0, 1, None, 3], [r.value for r in results])
+        self.assertIsInstance(results[2].error, ValueError)
+
+    def test_imap_bounds_concurrency(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def track(n):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+            return n
+
+        results = list(parallel.imap(track, range(20), workers=3))
+        self.assertEqual(20, len(results))
+        self.assertTrue(state['peak'] <= 3)
+
+    def test_imap_empty(self):
+        self.assertEqual([], list(parallel.imap(lambda n: n, [])))
+
+    def test_imap_reraises_iteration_error(self):
+        def items():
+            yield 1
+            yield 2
+            raise ValueError('broken source')
+
+        results = parallel.imap(lambda n: n, items(), workers=2)
+        self.assertEqual(1, next(results).value)
+        self.assertEqual(2, next(results).value)
+        self.assertRaises(ValueError, next, results)
+
+    def test_imap_stops_when_closed(self):
+        lock = threading.Lock()
+        calls = []
+
+        def slow(n):
+            with lock:
+                calls.append(n)
+            time.sleep(0.01)
+            return n
+
+        read = []
+
+        def items():
+            for n in range(1000):
+                read.append(n)
+                yield n
+
+        results = parallel.imap(slow, items(), workers=2)
+        self.assertEqual(0, next(results).value)
+        results.close()
+        time.sleep(0.1)
+        called, consumed = len(calls), len(read)
+        time.sleep(0.1)
+        # Neither the calls nor the reading of items went on.
+        self.assertEqual((called, consumed), (len(calls), len(read)))
+        self.assertLess(consumed, 20)
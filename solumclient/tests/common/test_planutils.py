@@ -0,0 +1,83 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from solumclient.common import exc
+from solumclient.common import planutils
+from solumclient.tests import base
+
+
+valid_plan = {
+    'version': 1,
+    'name': 'ex_plan1',
+    'description': 'dsc1.',
+    'artifacts': [{
+        'name': 'My python app',
+        'artifact_type': 'heroku',
+        'language_pack': 'python',
+        'content': {'href': 'git://example.com/project.git',
+                    'private': True},
+        'requirements': [{
+            'requirement_type': 'git_pull',
+            'language_pack': '1dae5a09ef2b4d8cbf3594b0eb4f6b94',
+            'fulfillment': '1dae5a09ef2b4d8cbf3594b0eb4f6b94'}]}],
+    'services': [{'name': 'Build Service',
+                  'id': 'build',
+                  'characteristics': ['python_build_service']}],
+}
+
+
+class TestPlanUtils(base.TestCase):
+
+    def test_validate_valid_plan(self):
+        planutils.validate(valid_plan)
+        self.assertEqual([], planutils.find_errors({'version': 1}))
+
+    def test_validate_reports_every_error(self):
+        plan = {
+            'name': ['not', 'a', 'string'],
+            'artifacts': [
+                {'content': {}},
+                {'content': {'href': 5}, 'language_pack': 7,
+                 'requirements': [{}]},
+                'not-a-mapping'],
+            'services': {'name': 'should be a list'},
+        }
+        errors = planutils.find_errors(plan)
+        self.assertEqual(sorted([
+            'version: is required',
+            'name: must be a string',
+            'artifacts[0].content.href: is required',
+            'artifacts[1].content.href: must be a string',
+            'artifacts[1].language_pack: must be a string',
+            'artifacts[1].requirements[0].requirement_type: is required',
+            'artifacts[2]: must be a mapping',
+            'services: must be a list',
+        ]), sorted(errors))
+
+    def test_validate_version(self):
+        self.assertEqual(['version: must be one of 1'],
+                         planutils.find_errors({'version': 2}))
+        self.assertEqual(['version: must be an integer'],
+                         planutils.find_errors({'version': True}))
+
+    def test_validate_not_a_mapping(self):
+        self.assertEqual(['plan: must be a mapping'],
+                         planutils.find_errors(['version', 1]))
+
+    def test_validate_raises(self):
+        e = self.assertRaises(exc.PlanValidationError,
+                              planutils.validate,
+                              {'artifacts': [{'content': {}}]})
+        self.assertEqual(['version: is required',
+                          'artifacts[0].content.href: is required'],
+                         sorted(e.errors, reverse=True))
+        self.assertIn('artifacts[0].content.href: is required', str(e))
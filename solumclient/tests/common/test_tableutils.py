@@ -0,0 +1,123 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import io
+
+import mock
+import six
+
+from solumclient.common import tableutils
+from solumclient.tests import base
+
+
+class TestTableUtils(base.TestCase):
+
+    def _print_table(self, rows, fields=('uuid', 'name'), **kwargs):
+        out = six.StringIO()
+        tableutils.print_table(rows, list(fields), out=out, **kwargs)
+        output = out.getvalue()
+        # Python 2 writes UTF-8.
+        if isinstance(output, six.binary_type):
+            output = output.decode('utf-8')
+        return output
+
+    def test_sorted_by_typed_keys(self):
+        rows = [('b', 1), ('a', None), (10, 2), ('9', 3), (None, 4)]
+        self.assertEqual(
+            '+------+------+\n'
+            '| uuid | name |\n'
+            '+------+------+\n'
+            '| None | 4    |\n'
+            '| 9    | 3    |\n'
+            '| 10   | 2    |\n'
+            '| a    | None |\n'
+            '| b    | 1    |\n'
+            '+------+------+\n',
+            self._print_table(rows))
+
+    def test_sort_is_stable(self):
+        output = self._print_table([('x', 'one'), ('x', 'two')],
+                                   sortby_index=0)
+        self.assertLess(output.index('one'), output.index('two'))
+
+    def test_empty(self):
+        self.assertEqual('+------+\n'
+                         '| uuid |\n'
+                         '+------+\n'
+                         '+------+\n',
+                         self._print_table([], fields=['uuid']))
+
+    def test_multiline_and_wide_cells(self):
+        self.assertEqual(
+            u'+-------+--------+\n'
+            u'| uuid  | name   |\n'
+            u'+-------+--------+\n'
+            u'| first | \u00e9\u4e2d    |\n'
+            u'| line  | wider! |\n'
+            u'+-------+--------+\n',
+            self._print_table([(u'first\nline', u'\u00e9\u4e2d\nwider!')]))
+
+    def test_python2_writes_utf8(self):
+        out = io.BytesIO()
+        with mock.patch.object(six, 'PY2', True):
+            tableutils.print_table([(u'\u00e9', u'\u4e2d')], ['uuid', 'name'],
+                                   out=out)
+        self.assertIn(u'| \u00e9    | \u4e2d   |',
+                      out.getvalue().decode('utf-8'))
+
+    def test_dict(self):
+        out = six.StringIO()
+        tableutils.print_dict({'fault': 'Traceback:\\n  line 1'},
+                              out=out)
+        self.assertEqual('+----------+------------+\n'
+                         '| Property | Value      |\n'
+                         '+----------+------------+\n'
+                         '| fault    | Traceback: |\n'
+                         '|          |   line 1   |\n'
+                         '+----------+------------+\n',
+                         out.getvalue())
+
+    def test_dict_wrap(self):
+        out = six.StringIO()
+        tableutils.print_dict({'description': 'one two three'}, wrap=7,
+                              out=out)
+        self.assertIn('| description | one two |\n'
+                      '|             | three   |\n', out.getvalue())
+
+    def test_sample(self):
+        def rows():
+            yield ('a', 'b')
+            self.written = out.getvalue()
+            yield ('longer', 'c')
+
+        out = six.StringIO()
+        tableutils.print_table(rows(), ['uuid', 'name'], sortby_index=None,
+                               sample=1, out=out)
+        # The sampled rows were out before the next one was read.
+        self.assertIn('| a    | b    |\n', self.written)
+        self.assertEqual('+------+------+\n'
+                         '| uuid | name |\n'
+                         '+------+------+\n'
+                         '| a    | b    |\n'
+                         '| long | c    |\n'
+                         '| er   |      |\n'
+                         '+------+------+\n',
+                         out.getvalue())
+
+    def test_sample_ignored_when_sorting(self):
+        output = self._print_table([('b', 1), ('longer', 2)], sample=1)
+        self.assertIn('| longer | 2    |\n', output)
+
+    def test_text_width(self):
+        self.assertEqual(3, tableutils.text_width(u'abc'))
+        self.assertEqual(4, tableutils.text_width(u'\u4e2d\u6587'))
+        self.assertEqual(1, tableutils.text_width(u'e\u0301'))
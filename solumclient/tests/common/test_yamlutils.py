@@ -46,3 +46,26 @@ class TestYamlUtils(base.TestCase):
             yaml_dumper = yaml.SafeDumper
         yamlutils.dump('version: 1')
         dump.assert_called_with('version: 1', Dumper=yaml_dumper)
+
+    def test_load_all_yaml(self):
+        docs = yamlutils.load_all('a: x\n---\n---\nb: y\n')
+        self.assertEqual([{'a': 'x'}, {'b': 'y'}], list(docs))
+
+    def test_load_all_is_lazy(self):
+        docs = yamlutils.load_all('a: x\n---\n}invalid: y\'m\'l3!')
+        self.assertEqual({'a': 'x'}, next(docs))
+        self.assertRaises(ValueError, next, docs)
+
+    def test_dump_iter(self):
+        plan = {'version': 1,
+                'name': 'ex_plan1',
+                'artifacts': [{'content': {'href': 'git://a/b.git'}}]}
+        chunks = list(yamlutils.dump_iter(plan))
+        self.assertEqual(3, len(chunks))
+        self.assertEqual(plan, yamlutils.load(''.join(chunks)))
+
+    def test_dump_chunks(self):
+        plan = {'version': 1, 'name': 'ex_plan1'}
+        chunks = yamlutils.DumpChunks(plan)
+        self.assertEqual(list(yamlutils.dump_iter(plan)), list(chunks))
+        self.assertEqual(list(yamlutils.dump_iter(plan)), list(chunks))
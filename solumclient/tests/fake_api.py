@@ -0,0 +1,531 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""A fake Solum v1 and builder API, served over HTTP in this process.
+
+Unlike apiclient's FakeHTTPClient, which answers canned responses in
+place of the HTTP client, this is a real HTTP server on 127.0.0.1 that
+keeps what is created in memory, so the clients are driven end to end:
+requests, connections, authentication headers, YAML and JSON bodies.
+
+Plans are sent and answered in YAML; assemblies, components, pipelines,
+language packs and images in JSON. Assemblies and images move through
+their statuses as time passes, creating an assembly adds its component
+and its logs, and deleting it removes them. Answers can be slowed down,
+padded and made to fail::
+
+    with fake_api.FakeSolumAPI(latency=0.05) as api:
+        api.inject_error(503, method='POST', path='/v1/images',
+                         retry_after=1)
+        clients = client.get_clients('1', os_auth_token='fake',
+                                     solum_url=api.url)
+
+Logs are kept in Swift, under OBJECT_STORE, and read with ranged GETs.
+Clients find that endpoint in the service catalog of a Keystone v2
+token, which the fake also answers at its auth_url::
+
+    clients = client.get_clients('1', os_username='user',
+                                 os_password='secret',
+                                 os_tenant_name='tenant',
+                                 os_auth_url=api.auth_url)
+"""
+
+import datetime
+import json
+import random
+import threading
+import time
+import uuid
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib import parse as urlparse
+
+from solumclient.common import yamlutils
+
+# The collections served, all under /v1. Plans are in YAML.
+COLLECTIONS = ('plans', 'assemblies', 'components', 'pipelines',
+               'language_packs', 'images')
+
+# The statuses assemblies and images go through, one every `step_time`
+# seconds, by collection: (field, statuses, failed status).
+PROGRESS = {
+    'assemblies': ('status', ('QUEUED', 'BUILDING', 'DEPLOYING', 'READY'),
+                   'ERROR'),
+    'images': ('state', ('QUEUED', 'BUILDING', 'READY'), 'ERROR'),
+}
+
+# Logs added for each assembly created, and the bytes in each.
+DEFAULT_LOGS_PER_ASSEMBLY = 3
+DEFAULT_LOG_BYTES = 1024
+
+# Where the Swift objects are served, and the container of the logs.
+OBJECT_STORE = '/swift/v1/AUTH_fake'
+LOG_CONTAINER = 'solum_logs'
+
+# The services in the catalog of the Keystone tokens, by type: the path
+# of their endpoint.
+SERVICES = {
+    'application_deployment': '',
+    'image_builder': '',
+    'object-store': OBJECT_STORE,
+}
+
+
+class _Fault(object):
+    """Errors answered to the requests matching a method and path."""
+
+    def __init__(self, status, method, path, times, retry_after):
+        self.status = status
+        self.method = method
+        self.path = path
+        self.times = times
+        self.retry_after = retry_after
+
+    def matches(self, method, path):
+        return ((self.method is None or self.method == method) and
+                (self.path is None or path.startswith(self.path)))
+
+
+class _Error(Exception):
+    def __init__(self, status, message, retry_after=None):
+        super(_Error, self).__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _now():
+    return datetime.datetime.utcnow().isoformat()
+
+
+class FakeSolumAPI(object):
+    """The Solum v1 and builder API, kept in memory and served over HTTP.
+
+    All options can be changed while the server runs.
+
+    :param latency: seconds every answer is delayed by. Requests are
+        answered in threads of their own, so delayed requests overlap.
+    :param step_time: seconds an assembly or image spends in each status
+        of :data:`PROGRESS`; 0 makes them final as soon as created
+    :param payload_bytes: size of a 'padding' field added to every
+        resource answered, to make answers as large as real ones
+    :param error_rate: share of requests, from 0 to 1, answered with
+        `error_status` at random
+    :param error_status: the status of those errors
+    :param seed: seed of the random errors
+    :param logs_per_assembly: logs added to each assembly created
+    :param log_bytes: size of the content of each log
+    :param log_strategy: where the logs are kept: 'swift', in the object
+        store served here, or 'local', at relative paths with no content
+    """
+
+    def __init__(self, latency=0, step_time=0, payload_bytes=0,
+                 error_rate=0, error_status=503, seed=None,
+                 logs_per_assembly=DEFAULT_LOGS_PER_ASSEMBLY,
+                 log_bytes=DEFAULT_LOG_BYTES, log_strategy='swift'):
+        self.latency = latency
+        self.step_time = step_time
+        self.payload_bytes = payload_bytes
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.logs_per_assembly = logs_per_assembly
+        self.log_bytes = log_bytes
+        self.log_strategy = log_strategy
+        # Names of the assemblies and images that end in failure.
+        self.failing = set()
+        # (method, path) of every request received, in order.
+        self.requests = []
+        self.max_in_flight = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._faults = []
+        self._resources = dict((name, {}) for name in COLLECTIONS)
+        self._created = {}
+        self._logs = {}
+        self._objects = {}
+        self._server = None
+
+    @property
+    def url(self):
+        """The endpoint to give clients, e.g. as solum_url."""
+        return 'http://127.0.0.1:%d' % self._server.server_port
+
+    @property
+    def auth_url(self):
+        """The Keystone v2 endpoint to give clients, as os_auth_url."""
+        return self.url + '/v2.0'
+
+    def start(self):
+        """Serve on a free port of 127.0.0.1, from a daemon thread."""
+        self._server = _ThreadingServer(('127.0.0.1', 0), _Handler)
+        self._server.api = self
+        thread = threading.Thread(target=self._server.serve_forever,
+                                  args=(0.01,))
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def inject_error(self, status, method=None, path=None, times=1,
+                     retry_after=None):
+        """Answer `status` to the next requests matching method and path.
+
+        :param method: e.g. 'POST'; None matches any method
+        :param path: start of the paths matched, e.g. '/v1/images'; None
+            matches any path
+        :param times: how many requests fail; None fails all of them
+        :param retry_after: seconds sent in a Retry-After header
+        """
+        with self._lock:
+            self._faults.append(_Fault(status, method, path, times,
+                                       retry_after))
+
+    def add(self, collection, resource):
+        """Store a resource as if it had been created, with no request.
+
+        A uuid and uri are given to it if it has none, and assemblies get
+        their component and logs. Meant to fill the server quickly once
+        started, e.g. before a benchmark.
+
+        :returns: the resource as stored
+        """
+        with self._lock:
+            return self._add(collection, dict(resource))
+
+    def get(self, collection, resource_uuid):
+        """Return a resource as it would be answered now, or None."""
+        with self._lock:
+            resource = self._resources[collection].get(resource_uuid)
+            return None if resource is None else self._show(collection,
+                                                            resource)
+
+    def log_content(self, log):
+        """Return the bytes kept in Swift for a log, or None.
+
+        :param log: a log as answered, or its :class:`UserLog`
+        """
+        location = log['location'] if isinstance(log, dict) else log.location
+        with self._lock:
+            return self._objects.get(self._object_path(location))
+
+    @staticmethod
+    def _object_path(location):
+        return '/'.join([OBJECT_STORE, LOG_CONTAINER, location])
+
+    def _add(self, collection, resource):
+        resource_uuid = resource.setdefault('uuid', str(uuid.uuid4()))
+        resource.setdefault('uri', '%s/v1/%s/%s' % (self.url, collection,
+                                                    resource_uuid))
+        resource.setdefault('created_at', _now())
+        self._resources[collection][resource_uuid] = resource
+        self._created[resource_uuid] = time.time()
+        if collection == 'assemblies':
+            resource.setdefault('trigger_uri', '%s/v1/triggers/%s' % (
+                self.url, uuid.uuid4()))
+            self._add('components', {
+                'name': '%s-component' % resource.get('name'),
+                'assembly_uuid': resource_uuid})
+            self._logs[resource_uuid] = [
+                self._add_log(resource_uuid, number)
+                for number in range(self.logs_per_assembly)]
+        elif collection == 'pipelines':
+            resource.setdefault('trigger_uri', '%s/v1/triggers/%s' % (
+                self.url, uuid.uuid4()))
+        return resource
+
+    def _add_log(self, assembly_uuid, number):
+        location = '%s/%d.log' % (assembly_uuid, number)
+        log = {
+            'assembly_uuid': assembly_uuid,
+            'location': location,
+            'strategy': self.log_strategy,
+            'strategy_info': '{}',
+            'created_at': _now(),
+        }
+        if self.log_strategy == 'swift':
+            log['strategy_info'] = json.dumps({'container': LOG_CONTAINER})
+            line = ('%s: step done\n' % location).encode('utf-8')
+            content = line * (self.log_bytes // len(line) + 1)
+            self._objects[self._object_path(location)] = (
+                content[:self.log_bytes])
+        return log
+
+    def _remove(self, collection, resource_uuid):
+        self._resources[collection].pop(resource_uuid)
+        self._created.pop(resource_uuid, None)
+        if collection == 'assemblies':
+            for log in self._logs.pop(resource_uuid, ()):
+                self._objects.pop(self._object_path(log['location']), None)
+            for component in list(self._resources['components'].values()):
+                if component.get('assembly_uuid') == resource_uuid:
+                    self._remove('components', component['uuid'])
+
+    def _show(self, collection, resource):
+        shown = dict(resource)
+        if collection in PROGRESS:
+            field, statuses, failed = PROGRESS[collection]
+            step = len(statuses) - 1
+            if self.step_time:
+                elapsed = time.time() - self._created[resource['uuid']]
+                step = min(int(elapsed / self.step_time), step)
+            shown[field] = statuses[step]
+            if (step == len(statuses) - 1 and
+                    resource.get('name') in self.failing):
+                shown[field] = failed
+        if self.payload_bytes:
+            shown['padding'] = 'x' * self.payload_bytes
+        return shown
+
+    def _find(self, collection, resource_uuid):
+        try:
+            return self._resources[collection][resource_uuid]
+        except KeyError:
+            raise _Error(404, 'Could not find %s %s.' % (collection,
+                                                         resource_uuid))
+
+    def _fault(self, method, path):
+        """Return the error to answer a request with, if any."""
+        for fault in self._faults:
+            if fault.matches(method, path):
+                if fault.times is not None:
+                    fault.times -= 1
+                    if fault.times <= 0:
+                        self._faults.remove(fault)
+                return _Error(fault.status, 'Injected error.',
+                              fault.retry_after)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return _Error(self.error_status, 'Injected error.')
+
+    def handle(self, method, path, query, body, headers=None):
+        """Answer a request; returns (status, headers, body).
+
+        :raises: _Error for the requests answered with an error
+        """
+        with self._lock:
+            self.requests.append((method, path))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            error = self._fault(method, path)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if error is not None:
+                raise error
+            with self._lock:
+                return self._route(method, path, query, body,
+                                   headers or {})
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _route(self, method, path, query, body, headers):
+        if path.rstrip('/') == '/v2.0/tokens':
+            if method != 'POST':
+                raise _Error(405, 'Method not allowed.')
+            return self._token(body)
+        if path.startswith(OBJECT_STORE + '/'):
+            if method != 'GET':
+                raise _Error(405, 'Method not allowed.')
+            return self._read_object(path, headers.get('Range'))
+        parts = path.strip('/').split('/')
+        if parts[0] != 'v1' or len(parts) < 2 or parts[1] not in COLLECTIONS:
+            raise _Error(404, 'No such resource: %s' % path)
+        collection = parts[1]
+        if len(parts) == 4 and collection == 'assemblies' and (
+                parts[3] == 'logs'):
+            if method != 'GET':
+                raise _Error(405, 'Method not allowed.')
+            self._find(collection, parts[2])
+            return self._answer(collection, self._list_logs(parts[2], query))
+        if len(parts) == 2:
+            if method == 'GET':
+                return self._answer(collection, [
+                    self._show(collection, resource)
+                    for resource in self._resources[collection].values()])
+            if method == 'POST':
+                resource = self._add(collection,
+                                     self._load(collection, body))
+                return self._answer(collection,
+                                    self._show(collection, resource), 201)
+        elif len(parts) == 3:
+            resource = self._find(collection, parts[2])
+            if method == 'GET':
+                return self._answer(collection,
+                                    self._show(collection, resource))
+            if method == 'PUT':
+                if body:
+                    resource.update(self._load(collection, body))
+                    resource['uuid'] = parts[2]
+                resource['updated_at'] = _now()
+                return self._answer(collection,
+                                    self._show(collection, resource))
+            if method == 'DELETE':
+                self._remove(collection, parts[2])
+                return 204, {}, b''
+        else:
+            raise _Error(404, 'No such resource: %s' % path)
+        raise _Error(405, 'Method not allowed.')
+
+    def _list_logs(self, assembly_uuid, query):
+        logs = [log for log in self._logs.get(assembly_uuid, ())
+                if (log['strategy'] == query.get('strategy', log['strategy'])
+                    and log['created_at'] >= query.get('since', '')
+                    and log['created_at'] <= query.get('until',
+                                                       log['created_at']))]
+        if 'marker' in query:
+            locations = [log['location'] for log in logs]
+            if query['marker'] in locations:
+                logs = logs[locations.index(query['marker']) + 1:]
+        if 'limit' in query:
+            logs = logs[:int(query['limit'])]
+        return logs
+
+    def _token(self, body):
+        try:
+            auth = json.loads(body.decode('utf-8'))['auth']
+        except (ValueError, KeyError):
+            raise _Error(400, 'Could not load the body.')
+        credentials = auth.get('passwordCredentials') or {}
+        tenant_name = auth.get('tenantName') or 'fake'
+        catalog = [{
+            'type': service_type,
+            'name': service_type,
+            'endpoints': [{
+                'region': 'RegionOne',
+                'publicURL': self.url + path,
+                'internalURL': self.url + path,
+                'adminURL': self.url + path,
+            }],
+        } for service_type, path in sorted(SERVICES.items())]
+        access = {
+            'token': {
+                'id': 'fake-token',
+                'expires': '2099-01-01T00:00:00Z',
+                'tenant': {'id': tenant_name, 'name': tenant_name},
+            },
+            'user': {
+                'id': credentials.get('username', 'fake'),
+                'name': credentials.get('username', 'fake'),
+                'roles': [],
+            },
+            'serviceCatalog': catalog,
+        }
+        return self._answer(None, {'access': access})
+
+    def _read_object(self, path, byte_range):
+        """Answer an object, or the bytes from the start of a Range."""
+        try:
+            content = self._objects[path]
+        except KeyError:
+            raise _Error(404, 'No such object: %s' % path)
+        if not byte_range:
+            return 200, {'Content-Type': 'application/octet-stream'}, content
+        try:
+            # Only the 'bytes=<start>-' form is sent by the client.
+            start = int(byte_range.split('=', 1)[1].rstrip('-'))
+        except (IndexError, ValueError):
+            raise _Error(400, 'Bad Range: %s' % byte_range)
+        if start >= len(content):
+            raise _Error(416, 'Requested range not satisfiable.')
+        return 206, {
+            'Content-Type': 'application/octet-stream',
+            'Content-Range': 'bytes %d-%d/%d' % (start, len(content) - 1,
+                                                 len(content)),
+        }, content[start:]
+
+    @staticmethod
+    def _load(collection, body):
+        try:
+            if collection == 'plans':
+                loaded = yamlutils.load(body.decode('utf-8'))
+            else:
+                loaded = json.loads(body.decode('utf-8'))
+        except ValueError as e:
+            raise _Error(400, 'Could not load the body: %s' % e)
+        if not isinstance(loaded, dict):
+            raise _Error(400, 'The body is not a mapping.')
+        return loaded
+
+    @staticmethod
+    def _answer(collection, data, status=200):
+        if collection == 'plans':
+            return (status, {'Content-Type': 'application/x-yaml'},
+                    yamlutils.dump(data).encode('utf-8'))
+        return (status, {'Content-Type': 'application/json'},
+                json.dumps(data).encode('utf-8'))
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Hands each request to the server's :class:`FakeSolumAPI`.
+
+    Connections are kept alive, as the clients' sessions expect. Each
+    answer is buffered and sent in one write: sending the headers and the
+    body apart stalls kept-alive connections on delayed ACKs.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if not size:
+                    # Skip any trailers, up to the blank line ending them.
+                    while self.rfile.readline().strip():
+                        pass
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _handle(self):
+        url = urlparse.urlsplit(self.path)
+        query = dict(urlparse.parse_qsl(url.query))
+        body = self._read_body()
+        try:
+            status, headers, content = self.server.api.handle(
+                self.command, url.path, query, body, self.headers)
+        except _Error as e:
+            status, headers = e.status, {'Content-Type': 'application/json'}
+            content = json.dumps({'faultstring': str(e),
+                                  'debuginfo': None}).encode('utf-8')
+            if e.retry_after is not None:
+                headers['Retry-After'] = str(e.retry_after)
+        self.send_response(status)
+        headers = dict(headers)
+        headers['Content-Length'] = str(len(content))
+        for name, value in sorted(headers.items()):
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, *args):
+        pass
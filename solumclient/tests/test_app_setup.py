@@ -0,0 +1,239 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import base64
+import json
+import os
+import threading
+import time
+
+import mock
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from solumclient.common import yamlutils
+from solumclient.tests import base
+
+SCRIPT = os.path.join(os.path.dirname(__file__), '..', '..', 'contrib',
+                      'setup-tools', 'solum-app-setup.py')
+
+
+def _load_script():
+    try:
+        from importlib import util
+    except ImportError:
+        # Python 2
+        import imp
+        return imp.load_source('solum_app_setup', SCRIPT)
+    spec = util.spec_from_file_location('solum_app_setup', SCRIPT)
+    module = util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+app_setup = _load_script()
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class _GithubStandIn(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answers POSTs like the Github API, recording each of them.
+
+    Connections are kept alive, and each answer takes a little while so
+    that calls made at the same time overlap.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight,
+                                       server.in_flight)
+        time.sleep(0.05)
+        body = json.loads(self.rfile.read(
+            int(self.headers['Content-Length'])).decode('utf-8'))
+        with server.lock:
+            server.in_flight -= 1
+            server.requests.append((self.path,
+                                    self.headers.get('Authorization'),
+                                    body, self.client_address[1]))
+            answer = {'token': 'token-%d' % len(server.requests)}
+        status = 404 if self.path in server.failing else 201
+        content = json.dumps(answer).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class AppSetupTest(base.TestCase):
+
+    def setUp(self):
+        super(AppSetupTest, self).setUp()
+        server = _ThreadingServer(('127.0.0.1', 0), _GithubStandIn)
+        server.lock = threading.Lock()
+        server.requests = []
+        server.failing = set()
+        server.in_flight = server.max_in_flight = 0
+        thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+
+        patcher = mock.patch.dict(app_setup.CREDENTIALS, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def github(self, workers=8):
+        github = app_setup.Github('http://127.0.0.1:%d/' %
+                                  self.server.server_port, workers=workers)
+        github.session.trust_env = False
+        return github
+
+    def add_credentials(self, *repos):
+        for repo in repos:
+            app_setup.CREDENTIALS['git@github.com:%s.git' % repo] = {
+                'user': repo.split('/')[0], 'password': 'secret',
+                'full_repo': repo, 'pub_key': 'ssh-rsa %s' % repo}
+
+    def test_get_tokens(self):
+        git_urls = ['git@github.com:org/api.git', 'git@github.com:org/web.git',
+                    'https://github.com/me/tools']
+        with mock.patch.object(app_setup, 'input', return_value=''):
+            with mock.patch.object(app_setup.getpass, 'getpass',
+                                   return_value='secret') as getpass:
+                tokens = app_setup.get_tokens(self.github(), git_urls)
+        # One password per user.
+        self.assertEqual(2, getpass.call_count)
+        self.assertEqual(3, len(set(tokens.values())))
+        self.assertEqual(['/authorizations'] * 3,
+                         [r[0] for r in self.server.requests])
+        self.assertEqual(
+            set(['Basic ' + base64.b64encode(user).decode('ascii')
+                 for user in [b'org:secret', b'me:secret']]),
+            set(r[1] for r in self.server.requests))
+        self.assertGreater(self.server.max_in_flight, 1)
+
+        # Tokens already got are reused.
+        self.assertEqual(tokens, app_setup.get_tokens(self.github(),
+                                                      git_urls))
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_add_ssh_keys_and_webhooks(self):
+        self.add_credentials('org/api', 'org/web')
+        github = self.github(workers=1)
+        args = mock.Mock(public=False, user_key=False)
+        app_setup.add_ssh_keys(github, args)
+        app_setup.create_webhook(github, 'https://solum/trigger')
+        self.assertEqual(['/repos/org/api/hooks', '/repos/org/api/keys',
+                          '/repos/org/web/hooks', '/repos/org/web/keys'],
+                         sorted(r[0] for r in self.server.requests))
+        self.assertEqual(['https://solum/trigger'] * 2,
+                         [r[2]['config']['url'] for r in self.server.requests
+                          if r[0].endswith('/hooks')])
+        # One worker, so every call went over the same connection.
+        self.assertEqual(1, len(set(r[3] for r in self.server.requests)))
+
+    def test_webhooks_are_concurrent(self):
+        self.add_credentials('org/api', 'org/web', 'org/docs', 'me/tools')
+        app_setup.create_webhook(self.github(), 'https://solum/trigger')
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_failure_names_the_repo(self):
+        self.add_credentials('org/api', 'org/web')
+        self.server.failing.add('/repos/org/web/keys')
+        args = mock.Mock(public=False, user_key=False)
+        e = self.assertRaises(app_setup.GithubError, app_setup.add_ssh_keys,
+                              self.github(), args)
+        self.assertIn('deploy key to the repo git@github.com:org/web.git',
+                      str(e))
+        self.assertNotIn('org/api', str(e))
+        # The other repo got its key all the same.
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_run_steps(self):
+        def step(name, requires=(), seconds=0.05, error=None):
+            def func(done):
+                time.sleep(seconds)
+                if error is not None:
+                    raise error
+                return (name, sorted(done))
+            return app_setup.Step(name, func, requires)
+
+        results, timings = app_setup.run_steps([
+            step('a'), step('b', ('a',), 0.1), step('c', ('a',), 0.1),
+            step('d', ('b',))])
+        self.assertIn('b', results['d'][1])
+        self.assertEqual(('c', ['a']), results['c'])
+        timing = dict((t.name, t) for t in timings)
+        # b and c both only need a, so they run at the same time.
+        self.assertLess(timing['c'].start,
+                        timing['b'].start + timing['b'].seconds)
+        self.assertGreaterEqual(timing['d'].start,
+                                timing['b'].start + timing['b'].seconds)
+
+        e = self.assertRaises(app_setup.SetupError, app_setup.run_steps, [
+            step('a'), step('b', ('a',), error=app_setup.SetupError('b')),
+            step('c', ('a',), 0.1), step('d', ('b',))])
+        self.assertEqual('b', str(e))
+
+    def test_setup_steps(self):
+        git_urls = ['git@github.com:org/api.git', 'git@github.com:org/web.git']
+        self.add_credentials('org/api', 'org/web')
+        for git_url in git_urls:
+            del app_setup.CREDENTIALS[git_url]['pub_key']
+
+        client = mock.Mock()
+        client.plans.create.return_value = mock.Mock(
+            uri='http://solum/v1/plans/p1',
+            artifacts=[mock.Mock(content={'href': git_url,
+                                          'public_key': 'ssh-rsa ' + git_url})
+                       for git_url in git_urls])
+
+        def create_assembly(name, plan_uri):
+            time.sleep(0.2)
+            return mock.Mock(trigger_uri='http://solum/triggers/t1')
+        client.assemblies.create.side_effect = create_assembly
+
+        args = mock.Mock(app_name='app', command='tox', public=False,
+                         user_key=False)
+        results, timings = app_setup.run_steps(app_setup.setup_steps(
+            client, self.github(), args, git_urls))
+
+        definition = yamlutils.load(client.plans.create.call_args[0][0])
+        self.assertEqual(2, len(set(arti['status_token']
+                                    for arti in definition['artifacts'])))
+        client.assemblies.create.assert_called_once_with(
+            name='app', plan_uri='http://solum/v1/plans/p1')
+        self.assertEqual(['/authorizations', '/authorizations',
+                          '/repos/org/api/hooks', '/repos/org/api/keys',
+                          '/repos/org/web/hooks', '/repos/org/web/keys'],
+                         sorted(r[0] for r in self.server.requests))
+        self.assertEqual(['https://solum/triggers/t1'] * 2,
+                         [r[2]['config']['url'] for r in self.server.requests
+                          if r[0].endswith('/hooks')])
+        timing = dict((t.name, t) for t in timings)
+        self.assertEqual(set(['tokens', 'plan', 'ssh keys', 'assembly',
+                              'webhooks']), set(timing))
+        # The keys are added while the assembly is being created.
+        self.assertLess(timing['ssh keys'].start + timing['ssh keys'].seconds,
+                        timing['assembly'].start + timing['assembly'].seconds)
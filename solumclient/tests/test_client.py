@@ -12,6 +12,7 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from keystoneclient.v2_0 import client as ksclient
 import mock
 
 from solumclient import client
@@ -29,3 +30,25 @@ class ClientTest(base.TestCase):
     def test_client(self):
         with mock.patch.object(auth, 'KeystoneAuthPlugin'):
             client.Client('1', **{})
+
+    @mock.patch.object(ksclient, 'Client')
+    def test_clients_share_authentication(self, mock_ksclient):
+        catalog = {'application_deployment': 'http://solum',
+                   'image_builder': 'http://builder'}
+        mock_ksclient.return_value.service_catalog.url_for.side_effect = (
+            lambda service_type, endpoint_type: catalog[service_type])
+        clients = client.get_clients('1', os_username='user',
+                                     os_password='pass',
+                                     os_tenant_name='tenant',
+                                     os_auth_url='http://auth')
+        http_client = clients['solum'].http_client
+        self.assertIs(http_client, clients['builder'].http_client)
+
+        with mock.patch.object(http_client, 'request') as mock_request:
+            clients['solum'].client_request('GET', '/v1/plans')
+            clients['builder'].client_request('GET', '/v1/images')
+            self.assertEqual(['http://solum/v1/plans',
+                              'http://builder/v1/images'],
+                             [call[0][1] for call
+                              in mock_request.call_args_list])
+        self.assertEqual(1, mock_ksclient.call_count)
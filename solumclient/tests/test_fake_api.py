@@ -0,0 +1,220 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import sys
+
+import fixtures
+import mock
+import six
+
+from solumclient.builder.v1 import image
+from solumclient import client
+from solumclient.common import apputils
+from solumclient.common import polling
+from solumclient.common import yamlutils
+from solumclient.openstack.common.apiclient import exceptions
+from solumclient import solum
+from solumclient.tests import base
+from solumclient.tests import fake_api
+from solumclient.v1 import assembly as v1_assembly
+
+PLAN = {
+    'version': 1,
+    'name': 'ex_plan1',
+    'description': 'An example plan.',
+    'artifacts': [{
+        'name': 'web',
+        'artifact_type': 'heroku',
+        'content': {'href': 'https://github.com/user/repo.git'},
+        'language_pack': 'auto',
+    }],
+}
+
+
+class FakeSolumAPITest(base.TestCase):
+    """Drives the real clients against the fake API, over HTTP."""
+
+    def setUp(self):
+        super(FakeSolumAPITest, self).setUp()
+        self.api = fake_api.FakeSolumAPI().start()
+        self.addCleanup(self.api.stop)
+        self.clients = client.get_clients('1', os_auth_token='fake',
+                                          solum_url=self.api.url)
+        self.solum = self.clients['solum']
+        for name, value in [('MIN_POLL_INTERVAL', 0.01),
+                            ('MAX_POLL_INTERVAL', 0.05)]:
+            patcher = mock.patch.object(polling, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_plans(self):
+        plan = self.solum.plans.create(yamlutils.dump(PLAN))
+        self.assertEqual('ex_plan1', plan.name)
+        self.assertEqual('https://github.com/user/repo.git',
+                         plan.artifacts[0].content['href'])
+        self.assertEqual('%s/v1/plans/%s' % (self.api.url, plan.uuid),
+                         plan.uri)
+        self.assertEqual([plan.uuid],
+                         [p.uuid for p in self.solum.plans.list()])
+
+        # Chunks are sent with chunked transfer encoding.
+        text = yamlutils.dump(dict(PLAN, name='ex_plan2'))
+        chunked = self.solum.plans.create(iter([text[:10], text[10:]]))
+        self.assertEqual('ex_plan2',
+                         self.solum.plans.get(plan_id=chunked.uuid).name)
+
+        updated = self.solum.plans.update(
+            yamlutils.dump(dict(PLAN, description='Changed.')),
+            plan_id=plan.uuid)
+        self.assertEqual('Changed.', updated.description)
+        self.solum.plans.delete(plan_id=plan.uuid)
+        self.assertEqual([chunked.uuid],
+                         [p.uuid for p in self.solum.plans.list()])
+
+    def test_assemblies(self):
+        self.api.step_time = 0.05
+        plan = self.solum.plans.create(yamlutils.dump(PLAN))
+        assem = self.solum.assemblies.create(name='app', plan_uri=plan.uri)
+        self.assertEqual('QUEUED', assem.status)
+        ready = list(self.solum.assemblies.wait_for([assem]))
+        self.assertEqual(['READY'], [a.status for a in ready])
+
+        components = self.solum.components.list()
+        self.assertEqual([assem.uuid], [c.assembly_uuid for c in components])
+        index = apputils.ResourceIndex.from_client(self.solum)
+        self.assertEqual([assem.uuid],
+                         [a.uuid for a in index.assemblies_of(plan)])
+
+        self.solum.assemblies.delete(assembly_id=assem.uuid)
+        self.assertEqual([], self.solum.assemblies.list())
+        self.assertEqual([], self.solum.components.list())
+
+    def test_failing_assembly(self):
+        self.api.failing.add('broken')
+        assem = self.solum.assemblies.create(name='broken',
+                                             plan_uri='http://plan')
+        self.assertEqual('ERROR', assem.status)
+
+    def test_logs_are_paged(self):
+        self.api.logs_per_assembly = 5
+        assem = self.solum.assemblies.create(name='app',
+                                             plan_uri='http://plan')
+        logs = list(v1_assembly.UserLogManager(self.solum).list(
+            assem.uuid, page_size=2))
+        self.assertEqual(['%s/%d.log' % (assem.uuid, number)
+                          for number in range(5)],
+                         [log.location for log in logs])
+        # Three pages: 2, 2 and 1 logs.
+        self.assertEqual(3, len([path for method, path in self.api.requests
+                                 if path.endswith('/logs/')]))
+
+    def test_fetch_logs(self):
+        self.api.log_bytes = 100
+        assem = self.solum.assemblies.create(name='app',
+                                             plan_uri='http://plan')
+        logs = list(self.solum.userlogs.list(assem.uuid))
+        directory = self.useFixture(fixtures.TempDir()).path
+        # The start of the first log was fetched before.
+        first = v1_assembly.fetch_path(directory, logs[0])
+        os.makedirs(os.path.dirname(first))
+        with open(first, 'wb') as log_file:
+            log_file.write(self.api.log_content(logs[0])[:40])
+
+        # The object-store endpoint is found in the Keystone catalog.
+        self.useFixture(fixtures.MonkeyPatch('os.environ', {
+            'OS_USERNAME': 'user', 'OS_PASSWORD': 'secret',
+            'OS_TENANT_NAME': 'tenant', 'OS_AUTH_URL': self.api.auth_url}))
+        self.useFixture(fixtures.MonkeyPatch('sys.argv', [
+            'solum', 'assembly', 'logs', 'app', '--fetch', directory,
+            '--format', 'value']))
+        orig, sys.stdout = sys.stdout, six.StringIO()
+        try:
+            code = solum.main()
+            out = sys.stdout.getvalue()
+        finally:
+            sys.stdout = orig
+        self.assertFalse(code)
+
+        self.assertEqual(3, out.count(' fetched\n'))
+        for number, log in enumerate(logs):
+            # The locations start with the assembly uuid, kept only once.
+            path = os.path.join(directory, assem.uuid, '%d.log' % number)
+            with open(path, 'rb') as f:
+                self.assertEqual(self.api.log_content(log), f.read())
+        self.assertEqual([assem.uuid], os.listdir(directory))
+        self.assertEqual(1, self.api.requests.count(('POST', '/v2.0/tokens')))
+        self.assertEqual(3, len([path for method, path in self.api.requests
+                                 if path.startswith(fake_api.OBJECT_STORE)]))
+
+    def test_batch_authenticates_once(self):
+        self.api.latency = 0.05
+        self.useFixture(fixtures.MonkeyPatch('os.environ', {
+            'OS_USERNAME': 'user', 'OS_PASSWORD': 'secret',
+            'OS_TENANT_NAME': 'tenant', 'OS_AUTH_URL': self.api.auth_url}))
+        # The first command makes no client, so the others all start
+        # without one, at the same time.
+        lines = ['bogus list\n', 'plan list\n', 'assembly list\n',
+                 'component list\n', 'languagepack build lp1 https://a\n',
+                 'languagepack build lp2 https://b\n']
+        out = six.StringIO()
+        self.assertEqual(1, solum.run_batch(lines, workers=len(lines),
+                                            out=out))
+        self.assertEqual(1, self.api.requests.count(('POST', '/v2.0/tokens')))
+        self.assertEqual(2, self.api.requests.count(('POST', '/v1/images')))
+
+    def test_pipelines_and_languagepacks(self):
+        pipeline = self.solum.pipelines.create(
+            name='pipe', plan_uri='http://plan', workbook_name='build')
+        self.assertTrue(pipeline.trigger_uri.startswith(self.api.url))
+        lp = self.solum.languagepacks.create(name='python')
+        self.assertEqual('python',
+                         self.solum.languagepacks.get(lp_id=lp.uuid).name)
+        self.solum.languagepacks.delete(lp_id=lp.uuid)
+        self.assertEqual([], self.solum.languagepacks.list())
+
+    def test_image_builds(self):
+        self.api.step_time = 0.05
+        self.api.failing.add('bad')
+        self.api.inject_error(503, method='POST', path='/v1/images',
+                              times=2)
+        specs = [image.BuildSpec(name, 'https://github.com/user/%s' % name,
+                                 None) for name in ['good', 'bad']]
+        with mock.patch.object(image, 'RETRY_DELAY', 0.01):
+            builds = self.clients['builder'].images.build_many(specs)
+        self.assertEqual(['READY', 'ERROR'],
+                         [build.image.state for build in builds])
+        self.assertEqual(4, self.api.requests.count(('POST', '/v1/images')))
+
+    def test_errors(self):
+        self.assertRaises(exceptions.NotFound, self.solum.assemblies.get,
+                          assembly_id='missing')
+        self.api.inject_error(429, path='/v1/assemblies', retry_after=2)
+        e = self.assertRaises(exceptions.HttpError,
+                              self.solum.assemblies.list)
+        self.assertEqual(429, e.http_status)
+        self.assertEqual(2, e.retry_after)
+        self.assertEqual(e.message, 'Injected error.')
+        self.assertEqual([], self.solum.assemblies.list())
+
+        self.api.error_rate = 1
+        self.assertRaises(exceptions.ServiceUnavailable,
+                          self.solum.plans.list)
+
+    def test_latency_and_payload(self):
+        self.api.latency = 0.1
+        self.api.payload_bytes = 1000
+        self.api.add('plans', dict(PLAN))
+        listed = apputils.list_all(self.solum)
+        self.assertEqual(1000, len(listed['plans'][0].padding))
+        # The four collections were listed at the same time.
+        self.assertEqual(4, self.api.max_in_flight)
@@ -14,7 +14,9 @@
 
 import collections
 import json
+import os
 import re
+import subprocess
 import sys
 import uuid
 
@@ -24,10 +26,18 @@ import six
 from stevedore import extension
 from testtools import matchers
 
+from solumclient.builder import client as builder_client
 from solumclient.builder.v1 import image
+from solumclient import client as solum_client
+from solumclient.common import cli_utils
+from solumclient.common import completion
+from solumclient.common import exc
+from solumclient.common import formatutils
+from solumclient.common import parallel
+from solumclient.common import tableutils
 from solumclient.common import yamlutils
 from solumclient.openstack.common.apiclient import auth
-from solumclient.openstack.common import cliutils
+from solumclient.openstack.common.apiclient import client as apiclient
 from solumclient import solum
 from solumclient.tests import base
 from solumclient.v1 import assembly
@@ -189,6 +199,175 @@ class TestSolum(base.TestCase):
         self.shell("assembly show app2")
         mock_assembly_find.assert_called_once_with(name_or_id='app2')
 
+    @mock.patch.object(assembly.AssemblyManager, "wait_for")
+    def test_assembly_wait(self, mock_wait_for):
+        ready = assembly.Assembly(None, {'uuid': 'u1', 'name': 'app1',
+                                         'status': 'READY'}, loaded=True)
+        building = assembly.Assembly(None, {'uuid': 'u2', 'name': 'app2',
+                                            'status': 'BUILDING'},
+                                     loaded=True)
+
+        def settle(*args, **kwargs):
+            yield ready
+            raise exc.WaitTimeout([building, 'app3'])
+
+        mock_wait_for.side_effect = settle
+        self.make_env()
+        out = self.shell("assembly wait app1 app2 app3 --timeout 5 "
+                         "--format value")
+        mock_wait_for.assert_called_once_with(
+            ['app1', 'app2', 'app3'], statuses=['READY'], timeout=5)
+        self.assertIn('u1 app1 READY\nu2 app2 BUILDING\n app3 NOT FOUND\n',
+                      out)
+        self.assertIn('ERROR: Not READY: app2, app3.', out)
+
+    @mock.patch.object(assembly.UserLogManager, "follow")
+    @mock.patch.object(assembly.AssemblyManager, "find")
+    def test_assembly_logs_follow(self, mock_find, mock_follow):
+        mock_find.return_value = assembly.Assembly(None, {'uuid': 'a1'},
+                                                   loaded=True)
+        mock_follow.return_value = iter([
+            assembly.UserLog(None, {'assembly_uuid': 'a1',
+                                    'strategy': strategy,
+                                    'location': location}, loaded=True)
+            for strategy, location in [('local', '/l1'), ('swift', 'l2')]])
+        self.make_env()
+        out = self.shell("assembly logs app1 --follow")
+        mock_follow.assert_called_once_with('a1', strategy=None, since=None)
+        # Printed one line per log as it is added, not as a table.
+        self.assertEqual('a1 local /l1\na1 swift l2\n', out)
+
+    @mock.patch.object(assembly.UserLogManager, "content")
+    @mock.patch.object(assembly.AssemblyManager, "find")
+    def test_assembly_logs_content(self, mock_find, mock_content):
+        mock_find.return_value = assembly.Assembly(None, {'uuid': 'a1'},
+                                                   loaded=True)
+        log1, log2 = [assembly.UserLog(None, {'location': location},
+                                       loaded=True)
+                      for location in ['/l1', '/l2']]
+        mock_content.return_value = iter([
+            (log1, b'one\n'), (log1, b'two\n'), (log2, b'three\n')])
+        self.make_env()
+        out = self.shell("assembly logs app1 --content --strategy local")
+        mock_content.assert_called_once_with('a1', timeout=0,
+                                             strategy='local', since=None)
+        self.assertEqual('==> /l1 <==\none\ntwo\n==> /l2 <==\nthree\n', out)
+
+    @mock.patch.object(assembly.UserLogManager, "fetch")
+    @mock.patch.object(assembly.UserLogManager, "list")
+    @mock.patch.object(assembly.AssemblyManager, "list")
+    def test_assembly_logs_fetch(self, mock_list, mock_log_list, mock_fetch):
+        mock_list.return_value = [
+            assembly.Assembly(None, {'uuid': assembly_id, 'name': name},
+                              loaded=True)
+            for assembly_id, name in [('a1', 'app1'), ('a2', 'app2')]]
+        logs = dict(
+            (assembly_id, [assembly.UserLog(
+                None, {'assembly_uuid': assembly_id,
+                       'location': '%s.log' % assembly_id}, loaded=True)])
+            for assembly_id in ['a1', 'a2'])
+        mock_log_list.side_effect = (
+            lambda assembly_id, **kwargs: iter(logs[assembly_id]))
+        mock_fetch.side_effect = lambda logs, directory, workers: iter([
+            parallel.Result(logs[0], 'd/a1/a1.log', None),
+            parallel.Result(logs[1], None, Exception('gone'))])
+        self.make_env()
+        out = self.shell("assembly logs app1 a2 --fetch d --workers 4 "
+                         "--format value")
+        self.assertEqual(1, mock_list.call_count)
+        mock_fetch.assert_called_once_with(logs['a1'] + logs['a2'], 'd',
+                                           workers=4)
+        self.assertIn('a1 a1.log d/a1/a1.log fetched\n'
+                      'a2 a2.log  ERROR: gone\n', out)
+        self.assertIn('ERROR: Could not fetch: a2.log.', out)
+
+    @mock.patch.object(assembly.AssemblyManager, "list")
+    def test_assembly_logs_follow_many(self, mock_list):
+        mock_list.return_value = [
+            assembly.Assembly(None, {'uuid': 'a1', 'name': 'app1'},
+                              loaded=True)]
+        self.make_env()
+        out = self.shell("assembly logs app1 app2 --follow")
+        self.assertIn('ERROR: Assemblies not found: app2.', out)
+        mock_list.return_value.append(assembly.Assembly(
+            None, {'uuid': 'a2', 'name': 'app2'}, loaded=True))
+        out = self.shell("assembly logs app1 app2 --follow")
+        self.assertIn('ERROR: --follow and --content take a single '
+                      'assembly.', out)
+
+    # App Tests #
+    @mock.patch.object(apiclient.HTTPClient, "authenticate")
+    @mock.patch.object(pipeline.PipelineManager, "list")
+    @mock.patch.object(component.ComponentManager, "list")
+    @mock.patch.object(assembly.AssemblyManager, "list")
+    @mock.patch.object(plan.PlanManager, "list")
+    def test_app_status(self, mock_plans, mock_assemblies, mock_components,
+                        mock_pipelines, mock_authenticate):
+        mock_plans.return_value = [
+            plan.Plan(None, {'uuid': uuid, 'name': name}, loaded=True)
+            for uuid, name in [('p1', 'web'), ('p2', 'db')]]
+        mock_assemblies.return_value = [
+            assembly.Assembly(None, {'uuid': 'a1', 'status': 'READY',
+                                     'plan_uri': 'http://x/v1/plans/p1'},
+                              loaded=True)]
+        mock_components.return_value = [
+            component.Component(None, {'uuid': 'c1', 'assembly_uuid': 'a1'},
+                                loaded=True)]
+        mock_pipelines.return_value = []
+        self.make_env()
+        out = self.shell("app status --format value")
+        self.assertEqual('web p1 READY 1 READY 1 0\n'
+                         'db p2 NOT DEPLOYED  0 0\n', out)
+        out = self.shell("app status web missing")
+        self.assertIn('ERROR: Applications not found: missing.', out)
+        # Each collection listed once per command.
+        for listing in [mock_plans, mock_assemblies, mock_components,
+                        mock_pipelines]:
+            self.assertEqual(2, listing.call_count)
+
+    def _app_delete(self, argstr):
+        self.make_env()
+        fake_plan = plan.Plan(None, {'uuid': 'p1', 'name': 'app'},
+                              loaded=True)
+        listed = [assembly.Assembly(None, {'uuid': uuid, 'name': uuid,
+                                           'plan_uri': '/v1/plans/%s' % p},
+                                    loaded=True)
+                  for uuid, p in [('a1', 'p1'), ('a2', 'p2'), ('a3', 'p1')]]
+        with mock.patch.object(plan.PlanManager, "find",
+                               return_value=fake_plan), \
+                mock.patch.object(plan.PlanManager, "delete") as plan_delete, \
+                mock.patch.object(assembly.AssemblyManager, "list",
+                                  return_value=listed):
+            out = self.shell(argstr)
+        return out, plan_delete
+
+    @mock.patch.object(assembly.AssemblyManager, "wait_for_removal")
+    @mock.patch.object(assembly.AssemblyManager, "delete")
+    def test_app_delete(self, mock_delete, mock_wait_for_removal):
+        out, plan_delete = self._app_delete("app delete app")
+        self.assertEqual(['a1', 'a3'], sorted(
+            c[1]['assembly_id'] for c in mock_delete.call_args_list))
+        self.assertFalse(mock_wait_for_removal.called)
+        plan_delete.assert_called_once_with(plan_id='p1')
+
+    @mock.patch.object(assembly.AssemblyManager, "wait_for_removal")
+    @mock.patch.object(assembly.AssemblyManager, "delete")
+    def test_app_delete_wait(self, mock_delete, mock_wait_for_removal):
+        out, plan_delete = self._app_delete("app delete --wait app "
+                                            "--timeout 30")
+        deleted = mock_wait_for_removal.call_args[0][0]
+        self.assertEqual(['a1', 'a3'], [a.uuid for a in deleted])
+        self.assertEqual(30, mock_wait_for_removal.call_args[1]['timeout'])
+        plan_delete.assert_called_once_with(plan_id='p1')
+
+    @mock.patch.object(assembly.AssemblyManager, "delete")
+    def test_app_delete_keeps_plan_on_error(self, mock_delete):
+        mock_delete.side_effect = Exception('busy')
+        out, plan_delete = self._app_delete("app delete app")
+        self.assertIn('ERROR: Could not delete assemblies: a1 (busy), '
+                      'a3 (busy). The plan was kept.', out)
+        self.assertFalse(plan_delete.called)
+
     # Pipeline Tests #
     @mock.patch.object(pipeline.PipelineManager, "list")
     def test_pipeline_list(self, mock_pipeline_list):
@@ -251,7 +430,7 @@ class TestSolum(base.TestCase):
         mock_pipeline_find.assert_called_once_with(name_or_id='app2')
 
     # Plan Tests #
-    @mock.patch.object(cliutils, "print_dict")
+    @mock.patch.object(tableutils, "print_dict")
     @mock.patch.object(plan.PlanManager, "create")
     def test_plan_create(self, mock_plan_create, mock_print_dict):
         FakeResource = collections.namedtuple("FakeResource",
@@ -261,17 +440,16 @@ class TestSolum(base.TestCase):
                                                      'foo')
         expected_printed_dict_args = mock_plan_create.return_value._asdict()
         raw_data = 'version: 1\nname: ex_plan1\ndescription: dsc1.'
-        plan_data = yamlutils.dump(yamlutils.load(raw_data))
         mopen = mock.mock_open(read_data=raw_data)
         with mock.patch('%s.open' % solum.__name__, mopen, create=True):
             self.make_env()
             self.shell("plan create /dev/null")
-            mock_plan_create.assert_called_once_with(plan_data)
+            mock_plan_create.assert_called_once_with(mopen.return_value)
             mock_print_dict.assert_called_once_with(
                 expected_printed_dict_args,
-                wrap=72)
+                wrap=72, out=None)
 
-    @mock.patch.object(cliutils, "print_dict")
+    @mock.patch.object(tableutils, "print_dict")
     @mock.patch.object(solum.PlanCommands, "_show_public_keys")
     @mock.patch.object(plan.PlanManager, "create")
     def test_plan_create_with_private_github_repo(self, mock_plan_create,
@@ -286,24 +464,98 @@ class TestSolum(base.TestCase):
         expected_printed_dict_args.pop('artifacts')
         expected_show_pub_keys_args = 'artifacts'
         raw_data = 'version: 1\nname: ex_plan1\ndescription: dsc1.'
-        plan_data = yamlutils.dump(yamlutils.load(raw_data))
         mopen = mock.mock_open(read_data=raw_data)
         with mock.patch('%s.open' % solum.__name__, mopen, create=True):
             self.make_env()
             self.shell("plan create /dev/null")
-            mock_plan_create.assert_called_once_with(plan_data)
+            mock_plan_create.assert_called_once_with(mopen.return_value)
             mock_print_dict.assert_called_once_with(
                 expected_printed_dict_args,
-                wrap=72)
+                wrap=72, out=None)
             mock_show_pub_keys.assert_called_once_with(
                 expected_show_pub_keys_args)
 
+    @mock.patch.object(tableutils, "print_dict")
+    @mock.patch.object(plan.PlanManager, "create")
+    def test_plan_create_with_param_file(self, mock_plan_create,
+                                         mock_print_dict):
+        FakeResource = collections.namedtuple("FakeResource", "uuid")
+        mock_plan_create.return_value = FakeResource('foo')
+        tmp = self.useFixture(fixtures.TempDir())
+        plan_file = tmp.join('plan.yaml')
+        param_file = tmp.join('params.yaml')
+        with open(plan_file, 'w') as f:
+            f.write('version: 1\nname: ex_plan1\n')
+        with open(param_file, 'w') as f:
+            f.write('key: value\n')
+        self.make_env()
+        self.shell("plan create %s --param-file %s" % (plan_file, param_file))
+        body = mock_plan_create.call_args[0][0]
+        self.assertEqual({'version': 1, 'name': 'ex_plan1',
+                          'parameters': {'key': 'value'}},
+                         yamlutils.load(''.join(body)))
+        # The body can be sent again, e.g. after re-authenticating.
+        self.assertEqual(''.join(body), ''.join(body))
+
+    @mock.patch.object(plan.PlanManager, "create")
+    def test_plan_create_invalid_plan(self, mock_plan_create):
+        raw_data = ('name: ex_plan1\n'
+                    'artifacts:\n- name: app\n  content: {}\n')
+        mopen = mock.mock_open(read_data=raw_data)
+        with mock.patch('%s.open' % solum.__name__, mopen, create=True):
+            self.make_env()
+            out = self.shell("plan create /dev/null")
+        self.assertFalse(mock_plan_create.called)
+        self.assertIn('version: is required', out)
+        self.assertIn('artifacts[0].content.href: is required', out)
+
+    @mock.patch.object(formatutils, "print_list")
+    @mock.patch.object(plan.PlanManager, "create")
+    def test_plan_load(self, mock_plan_create, mock_print_list):
+        FakeResource = collections.namedtuple("FakeResource", "uuid")
+        mock_plan_create.return_value = FakeResource('fake-uuid')
+        raw_data = ('version: 1\nname: ex_plan1\n---\n'
+                    '- not a plan\n---\n'
+                    'name: missing-version\n---\n'
+                    'version: 1\nname: ex_plan2\n')
+        plan_file = self.useFixture(fixtures.TempDir()).join('plans.yaml')
+        with open(plan_file, 'w') as f:
+            f.write(raw_data)
+        self.make_env()
+        self.shell("plan load %s --workers 2" % plan_file)
+        self.assertEqual(2, mock_plan_create.call_count)
+        rows = list(mock_print_list.call_args[0][0])
+        self.assertEqual([1, 2, 3, 4], [r.document for r in rows])
+        self.assertEqual(['ex_plan1', '', 'missing-version', 'ex_plan2'],
+                         [r.name for r in rows])
+        self.assertEqual('created', rows[0].status)
+        self.assertTrue(rows[1].status.startswith('ERROR'))
+        self.assertIn('version: is required', rows[2].status)
+        self.assertEqual('fake-uuid', rows[3].uuid)
+
     @mock.patch.object(plan.PlanManager, "list")
     def test_plan_list(self, mock_plan_list):
         self.make_env()
         self.shell("plan list")
         mock_plan_list.assert_called_once_with()
 
+    @mock.patch.object(plan.PlanManager, "list")
+    def test_plan_list_ndjson(self, mock_plan_list):
+        FakeResource = collections.namedtuple("FakeResource",
+                                              "uuid name description")
+        mock_plan_list.return_value = [FakeResource('u1', 'p1', 'd1'),
+                                       FakeResource('u2', 'p2', 'd2')]
+        self.make_env()
+        out = self.shell("plan list --format ndjson --column name")
+        self.assertEqual('{"name": "p1"}\n{"name": "p2"}\n', out)
+
+    @mock.patch.object(plan.PlanManager, "list")
+    def test_plan_list_unknown_format(self, mock_plan_list):
+        self.make_env()
+        out = self.shell("plan list --format xml")
+        self.assertIn('Unknown output format "xml"', out)
+        self.assertFalse(mock_plan_list.called)
+
     @mock.patch.object(plan.PlanManager, "delete")
     @mock.patch.object(plan.PlanManager, "find")
     def test_plan_delete(self, mock_plan_find, mock_plan_delete):
@@ -343,7 +595,7 @@ class TestSolum(base.TestCase):
         self.shell("languagepack list")
         mock_lp_list.assert_called_once()
 
-    @mock.patch.object(cliutils, "print_dict")
+    @mock.patch.object(tableutils, "print_dict")
     @mock.patch.object(languagepack.LanguagePackManager, "create")
     def test_languagepack_create(self, mock_lp_create, mock_print_dict):
         FakeResource = collections.namedtuple("FakeResource",
@@ -361,7 +613,7 @@ class TestSolum(base.TestCase):
             mock_lp_create.assert_called_once_with(**lp_data)
             mock_print_dict.assert_called_once_with(
                 expected_printed_dict_args,
-                wrap=72)
+                wrap=72, out=None)
 
     @mock.patch.object(image.ImageManager, "create")
     def test_languagepack_build(self, mock_image_build):
@@ -381,6 +633,79 @@ class TestSolum(base.TestCase):
                 source_uri='github.com/test',
                 lp_metadata=lp_metadata)
 
+    @mock.patch.object(image.ImageManager, "watch")
+    @mock.patch.object(image.ImageManager, "create")
+    def test_languagepack_build_wait(self, mock_image_build, mock_watch):
+        def fake_image(state):
+            return image.Image(None, {'uuid': 'i1', 'name': 'lp',
+                                      'state': state}, loaded=True)
+
+        mock_image_build.return_value = fake_image('QUEUED')
+        mock_watch.return_value = [
+            image.StateChange(fake_image('QUEUED'), None),
+            image.StateChange(fake_image('BUILDING'), 'QUEUED'),
+            image.StateChange(fake_image('ERROR'), 'BUILDING')]
+        self.make_env()
+        out = self.shell("languagepack build lp github.com/test --wait "
+                         "--timeout 60")
+        self.assertEqual(60, mock_watch.call_args[1]['timeout'])
+        self.assertIn('lp: QUEUED -> BUILDING\nlp: BUILDING -> ERROR\n',
+                      out)
+        self.assertNotIn('lp: None', out)
+        self.assertIn('ERROR: Language pack build ended in ERROR.', out)
+
+        mock_watch.side_effect = exc.WaitTimeout([fake_image('BUILDING')])
+        out = self.shell("languagepack build lp github.com/test --wait")
+        self.assertEqual(1800, mock_watch.call_args[1]['timeout'])
+        self.assertIn('ERROR: Timed out waiting for the language pack '
+                      'build; it is QUEUED.', out)
+
+    @mock.patch.object(image.ImageManager, "build_many")
+    def test_languagepack_buildmany(self, mock_build_many):
+        tempdir = self.useFixture(fixtures.TempDir()).path
+        manifest = os.path.join(tempdir, 'manifest.yaml')
+        with open(manifest, 'w') as f:
+            f.write('- {name: java, git_url: git://example.com/java.git}\n'
+                    '- {name: php, git_url: git://example.com/php.git}\n'
+                    '- {name: go, git_url: git://example.com/go.git}\n'
+                    '- {name: rb, git_url: git://example.com/rb.git}\n')
+
+        def build_many(specs, workers, timeout, on_change):
+            def built(name, state):
+                return image.Image(None, {'uuid': name + '-id', 'name': name,
+                                          'state': state}, loaded=True)
+            on_change(image.StateChange(built('java', 'BUILDING'), None))
+            on_change(image.StateChange(built('java', 'READY'), 'BUILDING'))
+            return [image.Build(specs[0], built('java', 'READY'), None,
+                                10.0, 72.4),
+                    image.Build(specs[1], built('php', 'BUILDING'), None,
+                                11.0, None),
+                    image.Build(specs[2], None, Exception('rejected'), None,
+                                None),
+                    image.Build(specs[3], built('rb', 'BUILDING'),
+                                Exception('lost'), 12.0, None)]
+        mock_build_many.side_effect = build_many
+
+        self.make_env()
+        out = self.shell("languagepack buildmany %s --workers 3 "
+                         "--format value" % manifest)
+        self.assertEqual(3, mock_build_many.call_args[1]['workers'])
+        self.assertEqual(['java', 'php', 'go', 'rb'],
+                         [spec.name for spec
+                          in mock_build_many.call_args[0][0]])
+        self.assertIn('java java-id READY 62 \n'
+                      'php php-id BUILDING  timed out\n'
+                      'go  NOT SUBMITTED  rejected\n'
+                      'rb rb-id BUILDING  lost\n', out)
+        self.assertIn('ERROR: Not READY: php, go, rb.', out)
+
+        out = self.shell("languagepack buildmany %s" % manifest)
+        self.assertIn('java: BUILDING -> READY\n', out)
+
+        out = self.shell("languagepack buildmany %s" %
+                         os.path.join(tempdir, 'missing.yaml'))
+        self.assertIn('ERROR: Could not read manifest:', out)
+
     @mock.patch.object(languagepack.LanguagePackManager, "delete")
     def test_languagepack_delete(self, mock_lp_delete):
         self.make_env()
@@ -412,3 +737,239 @@ class TestSolum(base.TestCase):
         self.make_env()
         self.shell("component show comp1")
         mock_component_find.assert_called_once_with(name_or_id='comp1')
+
+    def test_command_words(self):
+        self.assertEqual(['plan', 'show'], solum._command_words(
+            ['--format', 'json', 'plan', '--column=name', 'show', 'p1']))
+        self.assertEqual(['batch', '-'], solum._command_words(
+            ['batch', '-', '--workers', '2']))
+        self.assertEqual([None, None], solum._command_words(
+            ['--os-username', 'plan']))
+        self.assertEqual(['app', 'delete', 'myapp'], solum._positional_words(
+            ['app', 'delete', '--wait', 'myapp', '--timeout', '5']))
+
+    def test_missing_positional_is_named(self):
+        self.make_env()
+        out = self.shell("plan show")
+        self.assertIn('ERROR: You must specify a plan.', out)
+
+    # Completion Tests #
+    @mock.patch.object(completion, "read_names")
+    def test_complete_words(self, mock_read_names):
+        self.make_env()
+        mock_read_names.return_value = ['app1', 'app2', 'web']
+        options = cli_utils.default_options()
+        self.assertEqual(['pipeline', 'plan'],
+                         solum.complete_words(['p'], options))
+        self.assertEqual(['show'],
+                         solum.complete_words(['plan', 'sh'], options))
+        self.assertEqual(['app1', 'app2'],
+                         solum.complete_words(['plan', 'show', 'a'], options))
+        mock_read_names.assert_called_once_with(mock.ANY, 'plan')
+        self.assertEqual('tenant_name',
+                         mock_read_names.call_args[0][0].os_tenant_name)
+
+    @mock.patch.object(completion, "read_names")
+    def test_complete_resource_argument(self, mock_read_names):
+        self.make_env()
+        mock_read_names.return_value = ['p1']
+        options = cli_utils.default_options()
+        # The name of a new assembly can't be completed, its plan can.
+        self.assertEqual([], solum.complete_words(
+            ['assembly', 'create', ''], options))
+        self.assertEqual(['p1'], solum.complete_words(
+            ['assembly', 'create', '--description', 'd', 'new', ''],
+            options))
+        self.assertEqual([], solum.complete_words(
+            ['plan', 'show', '--format', ''], options))
+        self.assertEqual([], solum.complete_words(
+            ['plan', 'list', ''], options))
+        self.assertEqual([], solum.complete_words(
+            ['plan', 'show', 'p1', ''], options))
+        self.assertEqual(['p1'], solum.complete_words(
+            ['assembly', 'wait', 'a1', 'a2', ''], options))
+        # Credentials on the command line pick the tenant.
+        solum.complete_words(['--os-tenant-name', 'other', 'app', 'show',
+                              ''], options)
+        self.assertEqual('other',
+                         mock_read_names.call_args[0][0].os_tenant_name)
+
+    @mock.patch.object(completion, "read_names")
+    def test_complete_command(self, mock_read_names):
+        mock_read_names.return_value = ['p1', 'p2']
+        out = self.shell("complete -- component show p")
+        self.assertEqual('p1\np2\n', out)
+
+    # Shell Tests #
+    def _run_shell(self, lines, options=None):
+        orig = sys.stdout
+        try:
+            sys.stdout = six.StringIO()
+            # Options given to 'solum shell' itself.
+            argv = ['shell'] + (options or [])
+            options, _ = solum.build_parser(argv).parse_known_args(
+                argv, cli_utils.default_options())
+            session = solum.SolumShell(options=options,
+                                       stdin=six.StringIO(lines))
+            session.use_rawinput = False
+            session.cmdloop()
+        finally:
+            out = sys.stdout.getvalue()
+            sys.stdout.close()
+            sys.stdout = orig
+        return out
+
+    @mock.patch.object(solum_client, "get_client")
+    def test_shell_reuses_client(self, mock_get_client):
+        self.make_env()
+        out = self._run_shell('plan list\n\nassembly list\nplan list\n')
+        self.assertEqual(1, mock_get_client.call_count)
+        fake_client = mock_get_client.return_value
+        self.assertEqual(2, fake_client.plans.list.call_count)
+        self.assertEqual(1, fake_client.assemblies.list.call_count)
+        self.assertNotIn('ERROR', out)
+
+    @mock.patch.object(builder_client, "get_client")
+    @mock.patch.object(solum_client, "get_client")
+    def test_shell_clients_share_http_client(self, mock_get_client,
+                                             mock_get_builder):
+        self.make_env()
+        self._run_shell('plan list\nlanguagepack build lp http://git\n')
+        self.assertIs(mock_get_client.return_value.http_client,
+                      mock_get_builder.call_args[1]['http_client'])
+
+    @mock.patch.object(solum_client, "get_client")
+    def test_shell_options_apply_to_every_command(self, mock_get_client):
+        self.make_env(exclude='OS_USERNAME')
+        self._run_shell('plan list\n',
+                        options=['--os-username', 'shell-user'])
+        self.assertEqual('shell-user',
+                         mock_get_client.call_args[1]['os_username'])
+
+    @mock.patch.object(solum_client, "get_client")
+    def test_shell_errors_do_not_end_session(self, mock_get_client):
+        self.make_env()
+        fake_client = mock_get_client.return_value
+        fake_client.plans.list.side_effect = Exception('boom')
+        out = self._run_shell('plan list\nbogus\n"unbalanced\n'
+                              'assembly list\nexit\n')
+        self.assertIn('ERROR: boom', out)
+        self.assertIn('ERROR: Unknown command "bogus"', out)
+        self.assertIn('ERROR: No closing quotation', out)
+        self.assertEqual(1, fake_client.assemblies.list.call_count)
+
+    @mock.patch.object(solum_client, "get_client")
+    def test_client_error_exits_non_zero(self, mock_get_client):
+        self.make_env()
+        mock_get_client.side_effect = RuntimeError(u'no client \u2603')
+        self.useFixture(fixtures.MonkeyPatch('sys.argv',
+                                             ['solum', 'plan', 'list']))
+        orig, sys.stdout = sys.stdout, six.StringIO()
+        try:
+            code = solum.main()
+            out = sys.stdout.getvalue()
+        finally:
+            sys.stdout = orig
+        self.assertEqual(1, code)
+        self.assertIn(u'ERROR: no client \u2603', out)
+
+    # Batch Tests #
+    def test_read_batch(self):
+        groups = solum.read_batch(['plan list\n', '\n', '# comment\n',
+                                   'assembly list\n', 'wait\n', 'wait\n',
+                                   'component list\n'])
+        self.assertEqual([[(1, 'plan list'), (4, 'assembly list')],
+                          [(7, 'component list')]], groups)
+
+    @mock.patch.object(formatutils, "print_list")
+    @mock.patch.object(solum_client, "get_client")
+    def test_batch(self, mock_get_client, mock_print_list):
+        self.make_env()
+        fake_client = mock_get_client.return_value
+        fake_client.plans.find.side_effect = Exception('no such plan')
+        mock_print_list.side_effect = (
+            lambda *args, **kwargs: sys.stdout.write('table\n'))
+        out = six.StringIO()
+        failures = solum.run_batch(['plan list\n', 'assembly list\n',
+                                    'plan show missing\n', 'wait\n',
+                                    'bogus list\n'],
+                                   workers=2, out=out)
+        self.assertEqual(2, failures)
+        self.assertEqual(1, mock_get_client.call_count)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([1, 2, 3, 5], [r['line'] for r in records])
+        self.assertEqual(['ok', 'ok', 'error', 'error'],
+                         [r['status'] for r in records])
+        self.assertEqual('table\n', records[0]['output'])
+        self.assertEqual('no such plan', records[2]['error'])
+        self.assertEqual('Unknown command "bogus".', records[3]['error'])
+
+    @mock.patch.object(solum, "run_batch")
+    def test_batch_command(self, mock_run_batch):
+        mock_run_batch.return_value = 0
+        batch_file = self.useFixture(fixtures.TempDir()).join('batch')
+        with open(batch_file, 'w') as f:
+            f.write('plan list\n')
+        self.make_env()
+        self.shell("batch %s --workers 3 --solum-url http://solum" %
+                   batch_file)
+        mock_run_batch.assert_called_once_with(
+            ['plan list\n'], options=mock.ANY, workers=3)
+        options = mock_run_batch.call_args[1]['options']
+        self.assertEqual('http://solum', options.solum_url)
+
+    def test_batch_missing_file(self):
+        out = self.shell("batch /no/such/file")
+        self.assertIn('Could not open batch file /no/such/file.', out)
+
+
+class TestSolumStartup(base.TestCase):
+    """Guard the CLI against loading heavy modules it does not need."""
+
+    heavy_modules = ['keystoneclient', 'pbr', 'prettytable', 'requests',
+                     'stevedore', 'yaml']
+
+    def _loaded_heavy_modules(self, code, modules=None):
+        # The command prints its own output first, so the module list is
+        # reported on the last line.
+        script = ('import sys\n%s\n'
+                  'print("\\n" + " ".join(m for m in %r if m in sys.modules))'
+                  % (code, modules or self.heavy_modules))
+        output = subprocess.check_output([sys.executable, '-c', script],
+                                         universal_newlines=True)
+        return output.splitlines()[-1].split()
+
+    def test_import(self):
+        self.assertEqual(
+            [], self._loaded_heavy_modules('import solumclient.solum'))
+
+    def test_help(self):
+        code = ('import sys\nsys.argv = ["solum", "help"]\n'
+                'from solumclient import solum\nsolum.main()')
+        self.assertEqual([], self._loaded_heavy_modules(code))
+
+    def test_missing_credentials(self):
+        code = ('import os, sys\nos.environ.clear()\n'
+                'sys.argv = ["solum", "plan", "list"]\n'
+                'from solumclient import solum\nsolum.main()')
+        self.assertEqual([], self._loaded_heavy_modules(code))
+
+    def test_complete(self):
+        # The child process inherits the environment.
+        cache = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable('SOLUM_COMPLETION_CACHE',
+                                                     cache))
+        code = ('import sys\n'
+                'sys.argv = ["solum", "complete", "--", "plan", "show", ""]\n'
+                'from solumclient import solum\n'
+                'solum.completion.spawn_refresh = lambda *args: None\n'
+                'solum.main()')
+        self.assertEqual([], self._loaded_heavy_modules(code))
+
+    def test_token_client_skips_keystone(self):
+        code = ('from solumclient import client\n'
+                'c = client.get_client("1", os_auth_token="fake-token",\n'
+                '                      solum_url="http://solum")\n'
+                'c.http_client.authenticate()')
+        self.assertEqual([], self._loaded_heavy_modules(
+            code, modules=['keystoneclient']))
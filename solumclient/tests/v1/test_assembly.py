@@ -12,6 +12,16 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import os
+import threading
+
+import fixtures
+import mock
+from six.moves import BaseHTTPServer
+
+from solumclient.common import client
+from solumclient.common import exc
+from solumclient.common import polling
 from solumclient.openstack.common.apiclient import exceptions
 from solumclient.openstack.common.apiclient import fake_client
 from solumclient.tests import base
@@ -74,7 +84,7 @@ log_fixture = [
 ]
 
 fixtures_logs = {
-    '/v1/assemblies/a1/logs/': {
+    '/v1/assemblies/a1/logs/?limit=100': {
         'GET': (
             {},
             log_fixture
@@ -191,6 +201,8 @@ class AssemblyManagerTest(base.TestCase):
         mgr = assembly.AssemblyManager(api_client)
         logs_obj = mgr.logs(assembly_id='a1')
         self.assert_logs_object(logs_obj, 'a1')
+        # Assemblies are still read as assemblies afterwards.
+        self.assertIs(assembly.Assembly, mgr.resource_class)
 
     def test_put(self):
         fake_http_client = fake_client.FakeHTTPClient(fixtures=fixtures_put)
@@ -198,3 +210,342 @@ class AssemblyManagerTest(base.TestCase):
         mgr = assembly.AssemblyManager(api_client)
         assembly_obj = mgr.put(assembly_id='x1')
         self.assert_assembly_object(assembly_obj)
+
+
+class AssemblyWaitTest(base.TestCase):
+
+    def setUp(self):
+        super(AssemblyWaitTest, self).setUp()
+        self.mgr = assembly.AssemblyManager(None)
+        self.clock = self.use_fake_clock(polling)
+
+    def set_polls(self, *polls):
+        self.mgr.list = mock.Mock(side_effect=[
+            [assembly.Assembly(self.mgr, {'uuid': uuid, 'name': name,
+                                          'status': status}, loaded=True)
+             for uuid, name, status in poll]
+            for poll in polls])
+
+    def test_wait_for(self):
+        self.set_polls([('u1', 'a1', 'BUILDING'), ('u2', 'a2', 'BUILDING')],
+                       [('u1', 'a1', 'READY'), ('u2', 'a2', 'BUILDING')],
+                       [('u1', 'a1', 'READY'), ('u2', 'a2', 'BUILDING')],
+                       [('u1', 'a1', 'READY'), ('u2', 'a2', 'ERROR')])
+        settled = list(self.mgr.wait_for(['u1', 'a2']))
+        self.assertEqual([('u1', 'READY'), ('u2', 'ERROR')],
+                         [(a.uuid, a.status) for a in settled])
+        # One list() per poll, backing off while nothing changes.
+        self.assertEqual(4, self.mgr.list.call_count)
+        self.assertEqual([1, 1, 2], self.clock.sleeps)
+
+    def test_wait_for_repeated_keys(self):
+        self.set_polls([('u1', 'a1', 'BUILDING'), ('u2', 'a2', 'BUILDING')],
+                       [('u1', 'a1', 'READY'), ('u2', 'a2', 'BUILDING')],
+                       [('u1', 'a1', 'READY'), ('u2', 'a2', 'READY')])
+        assem = assembly.Assembly(self.mgr, {'uuid': 'u2'}, loaded=True)
+        settled = list(self.mgr.wait_for(['u1', 'a1', 'u1', assem, 'a2']))
+        self.assertEqual(['u1', 'u2'], [a.uuid for a in settled])
+
+    def test_wait_for_timeout_repeated_keys(self):
+        self.set_polls(*[[('u1', 'a1', 'BUILDING')]] * 10)
+        waiter = self.mgr.wait_for(['a1', 'u1', 'a1'], timeout=3)
+        e = self.assertRaises(exc.WaitTimeout, list, waiter)
+        self.assertEqual(['u1'], [a.uuid for a in e.pending])
+
+    def test_wait_for_yields_settled_first(self):
+        self.set_polls([('u1', 'a1', 'READY'), ('u2', 'a2', 'BUILDING')],
+                       [('u2', 'a2', 'DEPLOYING')])
+        waiter = self.mgr.wait_for(['u1', 'u2'], statuses=['READY',
+                                                           'DEPLOYING'])
+        self.assertEqual('u1', next(waiter).uuid)
+        self.assertEqual(1, self.mgr.list.call_count)
+        self.assertEqual('u2', next(waiter).uuid)
+
+    def test_is_failed(self):
+        self.assertTrue(assembly.is_failed('ERROR_STACK_CREATE_FAILED'))
+        self.assertTrue(assembly.is_failed('BUILD_FAILED'))
+        self.assertFalse(assembly.is_failed('BUILDING'))
+        self.assertFalse(assembly.is_failed(None))
+
+    def test_wait_for_timeout(self):
+        self.set_polls(*[[('u1', 'a1', 'BUILDING')]] * 10)
+        waiter = self.mgr.wait_for(['u1', 'missing'], timeout=10)
+        e = self.assertRaises(exc.WaitTimeout, list, waiter)
+        self.assertEqual(['BUILDING', 'missing'],
+                         [getattr(p, 'status', p) for p in e.pending])
+        self.assertEqual(10, self.clock.now)
+        self.assertEqual([1, 2, 4, 3], self.clock.sleeps)
+
+    def test_delete_many(self):
+        self.mgr.delete = mock.Mock(side_effect=[None, Exception('busy')])
+        results = list(self.mgr.delete_many(['u1', 'u2'], workers=2))
+        self.assertEqual([None, 'busy'],
+                         [r.error and str(r.error) for r in results])
+        self.mgr.delete.assert_has_calls([mock.call(assembly_id='u1'),
+                                          mock.call(assembly_id='u2')],
+                                         any_order=True)
+
+    def test_wait_for_removal(self):
+        self.set_polls([('u1', 'a1', 'DELETING'), ('u2', 'a2', 'DELETING'),
+                        ('u3', 'a3', 'READY')],
+                       [('u2', 'a2', 'DELETING'), ('u3', 'a3', 'READY')],
+                       [('u3', 'a3', 'READY')])
+        self.mgr.wait_for_removal(['u1', 'u2'])
+        self.assertEqual(3, self.mgr.list.call_count)
+        self.assertEqual([2, 1], self.clock.sleeps)
+
+    def test_wait_for_removal_timeout(self):
+        self.set_polls(*[[('u1', 'a1', 'DELETING')]] * 10)
+        e = self.assertRaises(exc.WaitTimeout, self.mgr.wait_for_removal,
+                              ['u1'], timeout=3)
+        self.assertEqual(['a1'], [a.name for a in e.pending])
+
+
+class AssemblyLogsTest(base.TestCase):
+
+    def setUp(self):
+        super(AssemblyLogsTest, self).setUp()
+        self.mgr = assembly.UserLogManager(mock.Mock())
+        self.clock = self.use_fake_clock(polling)
+
+    def make_log(self, location, strategy='local', strategy_info='{}',
+                 created_at=None):
+        return {'assembly_uuid': 'a1', 'location': location,
+                'strategy': strategy, 'strategy_info': strategy_info,
+                'created_at': created_at}
+
+    def set_pages(self, *pages):
+        self.mgr.client.get.side_effect = [
+            mock.Mock(json=mock.Mock(return_value=page)) for page in pages]
+
+    def requested(self):
+        return [c[0][0] for c in self.mgr.client.get.call_args_list]
+
+    def test_list_pages(self):
+        self.set_pages([self.make_log('l1'), self.make_log('l2')],
+                       [self.make_log('l3')])
+        logs = list(self.mgr.list('a1', strategy='local', page_size=2))
+        self.assertEqual(['l1', 'l2', 'l3'], [log.location for log in logs])
+        self.assertEqual(
+            ['/v1/assemblies/a1/logs/?limit=2&strategy=local',
+             '/v1/assemblies/a1/logs/?limit=2&marker=l2&strategy=local'],
+            self.requested())
+
+    def test_list_is_lazy(self):
+        self.set_pages([self.make_log('l1'), self.make_log('l2')],
+                       [self.make_log('l3')])
+        logs = self.mgr.list('a1', page_size=2)
+        self.assertEqual('l1', next(logs).location)
+        self.assertEqual(1, self.mgr.client.get.call_count)
+
+    def test_list_without_server_paging(self):
+        everything = [self.make_log('l1'), self.make_log('l2')]
+        # Ignoring marker, and ignoring limit.
+        self.set_pages(everything, everything)
+        self.assertEqual(2, len(list(self.mgr.list('a1', page_size=2))))
+        self.set_pages(everything)
+        self.assertEqual(2, len(list(self.mgr.list('a1', page_size=1))))
+
+    def test_list_filters_again(self):
+        self.set_pages([
+            self.make_log('l1', created_at='2014-01-01T00:00:00'),
+            self.make_log('l2', created_at='2014-01-02T00:00:00'),
+            self.make_log('l3', created_at='2014-01-03T00:00:00',
+                          strategy='swift'),
+            self.make_log('l4', created_at='2014-01-04T00:00:00')])
+        logs = self.mgr.list('a1', strategy='local',
+                             since='2014-01-02T00:00:00',
+                             until='2014-01-03T12:00:00')
+        self.assertEqual(['l2'], [log.location for log in logs])
+
+    def test_follow(self):
+        log1 = self.make_log('/l1', created_at='2014-01-01T00:00:00')
+        log2 = self.make_log('/l2', created_at='2014-01-02T00:00:00')
+        self.set_pages([log1], [log1], [log1, log2])
+        follower = self.mgr.follow('a1')
+        self.assertEqual('/l1', next(follower).location)
+        self.assertEqual('/l2', next(follower).location)
+        # Only the logs since the newest one seen are asked for.
+        self.assertEqual(
+            ['/v1/assemblies/a1/logs/?limit=100'] +
+            ['/v1/assemblies/a1/logs/?limit=100&'
+             'since=2014-01-01T00%3A00%3A00'] * 2,
+            self.requested())
+        self.assertEqual([1, 2], self.clock.sleeps)
+
+    def test_content_local(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'log')
+        with open(path, 'wb') as log_file:
+            log_file.write(b'hello')
+        self.set_pages([self.make_log(path),
+                        self.make_log('x', strategy='other')])
+        with mock.patch.object(assembly, 'CHUNK_SIZE', 2):
+            content = list(self.mgr.content('a1'))
+        self.assertEqual([b'he', b'll', b'o'], [c for _, c in content])
+        self.assertEqual(set([path]), set(log.location for log, _ in content))
+
+    def test_read_local_resumes(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'log')
+        with open(path, 'wb') as log_file:
+            log_file.write(b'hello')
+        reader = assembly.LogReader(self.mgr, assembly.UserLog(
+            self.mgr, self.make_log(path), loaded=True))
+        self.assertEqual(b'hello', b''.join(reader.read()))
+        with open(path, 'ab') as log_file:
+            log_file.write(b' world')
+        self.assertEqual(b' world', b''.join(reader.read()))
+        self.assertEqual(b'', b''.join(reader.read()))
+
+    def test_read_swift(self):
+        http_client = self.mgr.client.http_client
+        http_client.auth_plugin.catalog_endpoint.return_value = (
+            'http://swift/v1/AUTH_t/')
+        http_client.cached_token = 'token'
+        http_client.request.side_effect = [
+            mock.Mock(status_code=200,
+                      iter_content=mock.Mock(return_value=[b'abc'])),
+            exceptions.RequestedRangeNotSatisfiable(),
+            # This one ignores Range and sends everything again.
+            mock.Mock(status_code=200,
+                      iter_content=mock.Mock(return_value=[b'ab', b'cdef'])),
+        ]
+        reader = assembly.LogReader(self.mgr, assembly.UserLog(
+            self.mgr, self.make_log('/app/build.log', strategy='swift',
+                                    strategy_info='{"container": "logs"}'),
+            loaded=True))
+        self.assertEqual(b'abc', b''.join(reader.read()))
+        self.assertEqual(b'', b''.join(reader.read()))
+        self.assertEqual(b'def', b''.join(reader.read()))
+        http_client.request.assert_called_with(
+            'GET', 'http://swift/v1/AUTH_t/logs/app/build.log',
+            headers={'X-Auth-Token': 'token', 'Range': 'bytes=3-'},
+            stream=True)
+        self.assertEqual(
+            {'X-Auth-Token': 'token'},
+            http_client.request.call_args_list[0][1]['headers'])
+
+    def test_read_swift_without_catalog(self):
+        plugin = self.mgr.client.http_client.auth_plugin
+        plugin.catalog_endpoint.return_value = None
+        reader = assembly.LogReader(self.mgr, assembly.UserLog(
+            self.mgr, self.make_log('l', strategy='swift',
+                                    strategy_info='{"container": "c"}'),
+            loaded=True))
+        self.assertRaises(exceptions.EndpointNotFound, list, reader.read())
+
+
+class _SwiftStandIn(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves server.objects, honouring single 'bytes=<start>-' ranges."""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('Range')))
+        body = self.server.objects.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        status, start = 200, 0
+        if self.headers.get('Range'):
+            status, start = 206, int(self.headers['Range'][6:-1])
+            if start >= len(body):
+                self.send_response(416)
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+class UserLogFetchTest(base.TestCase):
+
+    def setUp(self):
+        super(UserLogFetchTest, self).setUp()
+        server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), _SwiftStandIn)
+        server.objects = {'/v1/AUTH_t/logs/a1/build.log': b'built a1',
+                          '/v1/AUTH_t/logs/a2/build.log': b'built a2'}
+        server.requests = []
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+
+        plugin = mock.Mock()
+        plugin.catalog_endpoint.return_value = (
+            'http://127.0.0.1:%d/v1/AUTH_t' % server.server_port)
+        http_client = client.HTTPClient(auth_plugin=plugin)
+        http_client.http.trust_env = False
+        http_client.cached_token = 'token'
+        self.mgr = assembly.UserLogManager(mock.Mock(http_client=http_client))
+
+        self.source = self.useFixture(fixtures.TempDir()).path
+        self.target = self.useFixture(fixtures.TempDir()).path
+        with open(os.path.join(self.source, 'deploy.log'), 'wb') as log_file:
+            log_file.write(b'deployed a1')
+
+    def make_logs(self):
+        logs = [('a1', 'swift', 'a1/build.log'),
+                ('a2', 'swift', 'a2/build.log'),
+                ('a1', 'local', os.path.join(self.source, 'deploy.log')),
+                ('a2', 'swift', 'a2/missing.log')]
+        return [assembly.UserLog(self.mgr, {
+            'assembly_uuid': uuid, 'strategy': strategy, 'location': location,
+            'strategy_info': '{"container": "logs"}'}, loaded=True)
+            for uuid, strategy, location in logs]
+
+    def read(self, path):
+        with open(path, 'rb') as log_file:
+            return log_file.read()
+
+    def test_fetch(self):
+        results = list(self.mgr.fetch(self.make_logs(), self.target,
+                                      workers=3))
+        self.assertEqual([b'built a1', b'built a2', b'deployed a1'],
+                         [self.read(r.value) for r in results[:3]])
+        self.assertEqual(os.path.join(self.target, 'a1', 'build.log'),
+                         results[0].value)
+        self.assertTrue(results[2].value.startswith(
+            os.path.join(self.target, 'a1')))
+        self.assertIsInstance(results[3].error, exceptions.NotFound)
+        self.assertFalse(os.path.exists(
+            assembly.fetch_path(self.target, results[3].item)))
+
+    def test_failed_fetch_leaves_nothing(self):
+        log = assembly.UserLog(self.mgr, {
+            'assembly_uuid': 'a3', 'strategy': 'swift',
+            'location': 'deep/dir/missing.log',
+            'strategy_info': '{"container": "logs"}'}, loaded=True)
+        results = list(self.mgr.fetch([log], self.target))
+        self.assertIsInstance(results[0].error, exceptions.NotFound)
+        self.assertEqual([], os.listdir(self.target))
+
+    def test_fetch_resumes(self):
+        logs = self.make_logs()[:3]
+        for log, partial in zip(logs, [b'built', b'built a2', b'deploy']):
+            path = assembly.fetch_path(self.target, log)
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as log_file:
+                log_file.write(partial)
+        results = list(self.mgr.fetch(logs, self.target))
+        self.assertEqual([b'built a1', b'built a2', b'deployed a1'],
+                         [self.read(r.value) for r in results])
+        self.assertEqual(
+            [('/v1/AUTH_t/logs/a1/build.log', 'bytes=5-'),
+             ('/v1/AUTH_t/logs/a2/build.log', 'bytes=8-')],
+            sorted(self.server.requests))
+
+    def test_fetch_path(self):
+        log = assembly.UserLog(None, {'assembly_uuid': 'a1',
+                                      'location': '/../x/./y.log'},
+                               loaded=True)
+        self.assertEqual(os.path.join('d', 'a1', 'x', 'y.log'),
+                         assembly.fetch_path('d', log))
+        # A location under the assembly uuid is not put under it twice.
+        log.location = 'a1/x/a1/y.log'
+        self.assertEqual(os.path.join('d', 'a1', 'x', 'a1', 'y.log'),
+                         assembly.fetch_path('d', log))
@@ -172,3 +172,17 @@ class PlanManagerTest(base.TestCase):
         plan_obj = mgr.update('version: 1\nname: ex_plan1\ndescription: dsc1.',
                               plan_id='p1')
         self.assert_plan_obj(plan_obj)
+
+    def test_create_many(self):
+        fake_http_client = fake_client.FakeHTTPClient(fixtures=fixtures_create)
+        api_client = sclient.Client(fake_http_client)
+        mgr = plan.PlanManager(api_client)
+        definitions = [{'version': 1, 'name': 'ex_plan1'},
+                       'version: 1\nname: ex_plan2',
+                       ['not', 'a', 'mapping']]
+        results = list(mgr.create_many(iter(definitions), workers=2))
+        self.assertEqual(definitions, [r.item for r in results])
+        self.assert_plan_obj(results[0].value)
+        self.assert_plan_obj(results[1].value)
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertEqual(2, len(fake_http_client.callstack))
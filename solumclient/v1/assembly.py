@@ -12,11 +12,39 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
+import os
+
+from six.moves.urllib import parse as urlparse
+
 from solumclient.common import base as solum_base
+from solumclient.common import exc
+from solumclient.common import parallel
+from solumclient.common import polling
 from solumclient.openstack.common.apiclient import base as apiclient_base
+from solumclient.openstack.common.apiclient import exceptions
 from solumclient.openstack.common import uuidutils
 
 
+READY = 'READY'
+
+# Seconds wait_for() waits in total.
+DEFAULT_WAIT_TIMEOUT = 600
+
+# Log strategies whose content LogReader can read, and how much of it is
+# read at a time.
+STREAMED_STRATEGIES = ('local', 'swift')
+CHUNK_SIZE = 64 * 1024
+
+# Logs asked for per request by UserLogManager.list().
+DEFAULT_PAGE_SIZE = 100
+
+
+def is_failed(status):
+    """Whether `status` means the assembly stopped on an error."""
+    return polling.is_failed(status)
+
+
 class Assembly(apiclient_base.Resource):
     def __repr__(self):
         return "<Assembly %s>" % self._info
@@ -27,6 +55,255 @@ class UserLog(apiclient_base.Resource):
         return "<Log %s>" % self._info
 
 
+class _LogIndex(object):
+    """The logs of an assembly, as polled by UserLogManager.follow().
+
+    Each poll only asks for the logs created since the newest one seen,
+    and returns each log the first time it is seen.
+    """
+
+    def __init__(self, manager, assembly_id, strategy=None, since=None):
+        self.manager = manager
+        self.assembly_id = assembly_id
+        self.strategy = strategy
+        self.since = since
+        self.seen = set()
+
+    def poll(self):
+        """Return the :class:`UserLog` entries added since the last poll."""
+        added = []
+        for log in self.manager.list(self.assembly_id, strategy=self.strategy,
+                                     since=self.since):
+            key = (log.strategy, log.location)
+            if key not in self.seen:
+                self.seen.add(key)
+                added.append(log)
+            created_at = getattr(log, 'created_at', None)
+            if created_at and created_at > (self.since or ''):
+                self.since = created_at
+        return added
+
+
+class LogReader(object):
+    """Reads the content of a log, resuming where the last read stopped.
+
+    Content is read CHUNK_SIZE bytes at a time and never held whole. A
+    'local' log is read from its file, so only on the host that wrote
+    it. A 'swift' log is fetched from the object store in the Keystone
+    catalog, asking for the bytes past those already read.
+    """
+
+    def __init__(self, manager, log):
+        if log.strategy not in STREAMED_STRATEGIES:
+            raise ValueError('Cannot read logs stored with strategy "%s"'
+                             % log.strategy)
+        self.manager = manager
+        self.log = log
+        self.offset = 0
+
+    def read(self):
+        """Yield the content added to the log since the last read."""
+        if self.log.strategy == 'local':
+            return self._read_local()
+        return self._read_swift()
+
+    def _read_local(self):
+        with open(self.log.location, 'rb') as log_file:
+            if os.fstat(log_file.fileno()).st_size < self.offset:
+                # Truncated; start over.
+                self.offset = 0
+            log_file.seek(self.offset)
+            for chunk in iter(lambda: log_file.read(CHUNK_SIZE), b''):
+                self.offset += len(chunk)
+                yield chunk
+
+    def _read_swift(self):
+        http_client = self.manager.client.http_client
+        endpoint = http_client.auth_plugin.catalog_endpoint(
+            http_client.endpoint_type, 'object-store')
+        if not endpoint:
+            raise exceptions.EndpointNotFound(
+                'No object-store endpoint to read Swift logs from')
+        container = json.loads(self.log.strategy_info)['container']
+        url = '/'.join([endpoint.rstrip('/'), container,
+                        self.log.location.lstrip('/')])
+        headers = {'X-Auth-Token': http_client.cached_token}
+        if self.offset:
+            headers['Range'] = 'bytes=%d-' % self.offset
+        try:
+            resp = http_client.request('GET', url, headers=headers,
+                                       stream=True)
+        except exceptions.RequestedRangeNotSatisfiable:
+            # Nothing past the offset yet.
+            return
+        try:
+            # A server ignoring Range sends the whole object again.
+            position = self.offset if resp.status_code == 206 else 0
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                start = self.offset - position
+                position += len(chunk)
+                if position > self.offset:
+                    chunk = chunk[max(start, 0):]
+                    self.offset += len(chunk)
+                    yield chunk
+        finally:
+            resp.close()
+
+
+def fetch_path(directory, log):
+    """Return where :meth:`UserLogManager.fetch` saves `log`.
+
+    That is <directory>/<assembly uuid>/<location>, leaving out any '..'
+    of the location, and the assembly uuid it may start with.
+    """
+    parts = [part for part in log.location.split('/')
+             if part not in ('', '.', '..')]
+    if parts[:1] == [log.assembly_uuid]:
+        parts = parts[1:]
+    return os.path.join(directory, log.assembly_uuid, *parts)
+
+
+class UserLogManager(apiclient_base.BaseManager):
+    """Lists, follows, reads and fetches the logs of assemblies."""
+    resource_class = UserLog
+
+    def list(self, assembly_id, strategy=None, since=None, until=None,
+             page_size=DEFAULT_PAGE_SIZE):
+        """List the logs of an assembly, one page at a time.
+
+        Each page after the first starts after the location of the last
+        log received. The filters are applied again to the logs returned,
+        for servers that ignore them.
+
+        :param strategy: only list logs stored with this strategy
+        :param since: only list logs created at or after this ISO 8601
+            time
+        :param until: only list logs created at or before this ISO 8601
+            time
+        :param page_size: number of logs asked for per request
+        :returns: generator of :class:`UserLog`
+        """
+        url = '/v1/assemblies/%s/logs/' % assembly_id
+        params = {'limit': page_size}
+        for name, value in [('strategy', strategy), ('since', since),
+                            ('until', until)]:
+            if value is not None:
+                params[name] = value
+        marker = None
+        while True:
+            if marker is not None:
+                params['marker'] = marker
+            page = self.client.get(
+                '%s?%s' % (url, urlparse.urlencode(sorted(params.items())))
+            ).json()
+            if marker is not None and page[-1:] and (
+                    page[-1].get('location') == marker):
+                # The marker was ignored and this page was already listed.
+                return
+            for info in page:
+                created_at = info.get('created_at') or ''
+                if ((strategy is None or info.get('strategy') == strategy)
+                        and (since is None or created_at >= since)
+                        and (until is None or created_at <= until)):
+                    yield self.resource_class(self, info, loaded=True)
+            if len(page) != page_size:
+                # The last page, or a server ignoring limit sent them all.
+                return
+            marker = page[-1].get('location')
+
+    def follow(self, assembly_id, timeout=None, strategy=None, since=None):
+        """Yield the logs of an assembly as they are added.
+
+        Polls back off as in :meth:`AssemblyManager.wait_for` while no log
+        is added.
+
+        :param timeout: seconds to follow the logs for; None to follow
+            them until the caller stops iterating
+        :param strategy, since: as for :meth:`list`
+        :returns: generator of :class:`UserLog`
+        """
+        index = _LogIndex(self, assembly_id, strategy=strategy, since=since)
+        poller = polling.Poller(timeout)
+        while True:
+            added = index.poll()
+            for log in added:
+                yield log
+            if not poller.wait(bool(added)):
+                return
+
+    def content(self, assembly_id, timeout=0, strategy=None, since=None):
+        """Yield the content of an assembly's logs, chunk by chunk.
+
+        Only logs of the :data:`STREAMED_STRATEGIES` are read; others are
+        skipped. Polls back off while no log grows and none is added.
+
+        :param timeout: seconds to keep following the logs for; 0 reads
+            what they hold now, None follows them until the caller stops
+            iterating
+        :param strategy, since: as for :meth:`list`
+        :returns: generator of (:class:`UserLog`, bytes) pairs
+        """
+        index = _LogIndex(self, assembly_id, strategy=strategy, since=since)
+        readers = []
+        poller = polling.Poller(timeout)
+        while True:
+            changed = False
+            for log in index.poll():
+                if log.strategy in STREAMED_STRATEGIES:
+                    readers.append(LogReader(self, log))
+                    changed = True
+            for reader in readers:
+                for chunk in reader.read():
+                    changed = True
+                    yield reader.log, chunk
+            if not poller.wait(changed):
+                return
+
+    def fetch(self, logs, directory, workers=parallel.DEFAULT_WORKERS):
+        """Download logs into files under `directory`, several at a time.
+
+        A file already at the :func:`fetch_path` of a log is taken as the
+        start of that log and only the rest is downloaded, so running an
+        interrupted fetch again finishes it.
+
+        :param logs: :class:`UserLog` objects, of any assemblies
+        :param workers: maximum number of downloads at the same time
+        :returns: generator of :class:`parallel.Result` holding the path
+            of each file, one per log in input order
+        """
+        def open_file(path):
+            # Nothing is created on disk until there is something to write,
+            # so a failed download leaves no empty file or directories.
+            parent = os.path.dirname(path)
+            try:
+                os.makedirs(parent)
+            except OSError:
+                if not os.path.isdir(parent):
+                    raise
+            return open(path, 'ab')
+
+        def fetch_one(log):
+            path = fetch_path(directory, log)
+            reader = LogReader(self, log)
+            if os.path.isfile(path):
+                reader.offset = os.path.getsize(path)
+            log_file = None
+            try:
+                for chunk in reader.read():
+                    if log_file is None:
+                        log_file = open_file(path)
+                    log_file.write(chunk)
+            finally:
+                if log_file is not None:
+                    log_file.close()
+            if log_file is None and not os.path.isfile(path):
+                # An empty log.
+                open_file(path).close()
+            return path
+
+        return parallel.imap(fetch_one, logs, workers=workers)
+
+
 class AssemblyManager(solum_base.CrudManager, solum_base.FindMixin):
     resource_class = Assembly
     collection_key = 'assemblies'
@@ -48,10 +325,96 @@ class AssemblyManager(solum_base.CrudManager, solum_base.FindMixin):
         return super(AssemblyManager, self).delete(base_url="/v1", **kwargs)
 
     def logs(self, **kwargs):
-        self.resource_class = UserLog
-        url = self.build_url(base_url="/v1", **kwargs)
-        url += '/logs/'
-        return self._list(url)
+        return list(UserLogManager(self.client).list(kwargs['assembly_id']))
+
+    def wait_for(self, assemblies, statuses=(READY,),
+                 timeout=DEFAULT_WAIT_TIMEOUT):
+        """Wait for assemblies to reach one of `statuses` or to fail.
+
+        Each poll is a single list() of all assemblies, however many are
+        waited for. Polls back off as :class:`polling.Poller` does while
+        no status changes.
+
+        :param assemblies: uuids, names or :class:`Assembly` objects
+        :param statuses: statuses to wait for; failed statuses (see
+            :func:`is_failed`) end the wait too
+        :param timeout: seconds to wait for all of them
+        :returns: generator of :class:`Assembly`, each yielded once, as
+            soon as it settles, however many of `assemblies` name it
+        :raises: exc.WaitTimeout once `timeout` has passed, holding the
+            assemblies still pending
+        """
+        pending = []
+        for key in (getattr(a, 'uuid', a) for a in assemblies):
+            if key not in pending:
+                pending.append(key)
+        settled = set()
+        last_seen = {}
+        poller = polling.Poller(timeout)
+        while True:
+            by_key = {}
+            for found in self.list():
+                by_key.setdefault(found.uuid, found)
+                by_key.setdefault(found.name, found)
+
+            changed = False
+            for key in list(pending):
+                found = by_key.get(key)
+                if found is None:
+                    # It may not be listed yet.
+                    continue
+                if key != found.uuid:
+                    # Follow a name by its uuid, once however many keys
+                    # name the same assembly.
+                    if found.uuid in pending or found.uuid in settled:
+                        pending.remove(key)
+                        continue
+                    pending[pending.index(key)] = key = found.uuid
+                previous = last_seen.get(key)
+                if previous is None or previous.status != found.status:
+                    changed = True
+                last_seen[key] = found
+                if found.status in statuses or is_failed(found.status):
+                    pending.remove(key)
+                    settled.add(key)
+                    yield found
+            if not pending:
+                return
+            if not poller.wait(changed):
+                raise exc.WaitTimeout([last_seen.get(key, key)
+                                       for key in pending])
+
+    def delete_many(self, assemblies, workers=parallel.DEFAULT_WORKERS):
+        """Delete assemblies concurrently.
+
+        :param assemblies: uuids or :class:`Assembly` objects
+        :param workers: maximum number of deletions at the same time
+        :returns: generator of :class:`parallel.Result`, one per assembly
+            in input order
+        """
+        def delete_one(assem):
+            return self.delete(assembly_id=str(getattr(assem, 'uuid', assem)))
+
+        return parallel.imap(delete_one, assemblies, workers=workers)
+
+    def wait_for_removal(self, assemblies, timeout=DEFAULT_WAIT_TIMEOUT):
+        """Wait until none of `assemblies` is listed any more.
+
+        Deleting an assembly only starts tearing it down. Polls as
+        :meth:`wait_for` does, one list() at a time.
+
+        :param assemblies: uuids or :class:`Assembly` objects
+        :raises: exc.WaitTimeout once `timeout` has passed, holding the
+            assemblies still listed
+        """
+        pending = set(getattr(a, 'uuid', a) for a in assemblies)
+        poller = polling.Poller(timeout)
+        while pending:
+            listed = [a for a in self.list() if a.uuid in pending]
+            changed = len(listed) < len(pending)
+            pending = set(a.uuid for a in listed)
+            if pending and not poller.wait(changed):
+                raise exc.WaitTimeout(listed)
 
     def find(self, **kwargs):
         if 'assembly_id' in kwargs:
@@ -35,3 +35,4 @@ class Client(client.BaseClient):
         self.platform = platform.PlatformManager(self)
         self.plans = plan.PlanManager(self)
         self.languagepacks = languagepack.LanguagePackManager(self)
+        self.userlogs = assembly.UserLogManager(self)
@@ -16,6 +16,8 @@ import six
 
 from solumclient.common import base as solum_base
 from solumclient.common import exc
+from solumclient.common import parallel
+from solumclient.common import planutils
 from solumclient.common import yamlutils
 from solumclient.openstack.common.apiclient import base as apiclient_base
 from solumclient.openstack.common import uuidutils
@@ -96,6 +98,13 @@ class PlanManager(solum_base.CrudManager, solum_base.FindMixin):
         return [Plan(self, res, loaded=True) for res in resp_plan if res]
 
     def create(self, plan, **kwargs):
+        """Register a plan.
+
+        :param plan: the plan in YAML, either as a string, an open file or
+            any iterable of string chunks. Files are streamed from their
+            current position and iterables are sent with chunked transfer
+            encoding, so the body never needs to be held in memory.
+        """
         kwargs = self._filter_kwargs(kwargs)
         kwargs['data'] = plan
         kwargs.setdefault("headers", kwargs.get("headers", {}))
@@ -109,6 +118,28 @@ class PlanManager(solum_base.CrudManager, solum_base.FindMixin):
                                             'Reason: %s' % e.message)
         return Plan(self, resp_plan)
 
+    def create_many(self, plans, workers=parallel.DEFAULT_WORKERS, **kwargs):
+        """Register many plans concurrently.
+
+        :param plans: iterable of plan definitions, either YAML strings or
+            already-loaded mappings; a generator such as
+            ``yamlutils.load_all(f)`` is consumed lazily
+        :param workers: maximum number of plans uploaded at the same time
+        :returns: generator of :class:`parallel.Result`, one per plan in
+            input order, holding the new :class:`Plan` or the error.
+            Loaded mappings are checked with :func:`planutils.validate`
+            first, so invalid plans are never uploaded.
+        """
+        def create_one(definition):
+            if not isinstance(definition, six.string_types):
+                if not isinstance(definition, dict) or not definition:
+                    raise ValueError('The plan is not a YAML mapping.')
+                planutils.validate(definition)
+                definition = yamlutils.dump(definition)
+            return self.create(definition, **kwargs)
+
+        return parallel.imap(create_one, plans, workers=workers)
+
     def _get(self, url, response_key=None):
         kwargs = {'headers': {}}
         kwargs['headers']['Content-Type'] = 'x-application/yaml'
@@ -136,12 +167,15 @@ class PlanManager(solum_base.CrudManager, solum_base.FindMixin):
                 return super(PlanManager, self).findone(name=name_or_uuid)
 
     def update(self, plan, **kwargs):
+        """Replace a plan; `plan` is accepted in the same forms as create."""
         kwargs = self._filter_kwargs(kwargs)
         kwargs['data'] = plan
         kwargs.setdefault("headers", kwargs.get("headers", {}))
         kwargs['headers']['Content-Type'] = 'x-application/yaml'
-        resp = self.client.put(self.build_url(base_url="/v1", **kwargs),
-                               **kwargs)
+        url = self.build_url(base_url="/v1", **kwargs)
+        # plan_id is part of the URL, not an argument of the request.
+        kwargs.pop('plan_id', None)
+        resp = self.client.put(url, **kwargs)
         try:
             resp_plan = yamlutils.load(resp.content)
         except ValueError as e:
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure solum commands end to end, against a fake Solum API.
+
+Starts solumclient.tests.fake_api in this process, fills it with plans
+and their assemblies, and runs a few commands through solum.main() as
+the shell would, over HTTP to the fake. Each answer is delayed by
+--latency, to stand for the network and the server; no network is used.
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+import six
+
+from solumclient import solum
+from solumclient.tests import fake_api
+
+COMMANDS = [
+    ['plan', 'list', '--format', 'value'],
+    ['assembly', 'list', '--format', 'value'],
+    ['component', 'list', '--format', 'value'],
+    ['app', 'status', '--format', 'value'],
+]
+DEFAULT_LATENCY = 0.02
+DEFAULT_PLANS = 20
+DEFAULT_ASSEMBLIES = 3
+DEFAULT_REPEAT = 3
+
+
+def fill(api, plans, assemblies):
+    """Add `plans` plans to the fake, with `assemblies` assemblies each."""
+    for number in range(plans):
+        plan = api.add('plans', {
+            'version': 1, 'name': 'plan%d' % number,
+            'artifacts': [{'name': 'web', 'artifact_type': 'heroku',
+                           'content': {'href': 'https://example.com/app'}}]})
+        for assem in range(assemblies):
+            api.add('assemblies', {'name': 'plan%d-assembly%d' % (number,
+                                                                  assem),
+                                   'plan_uri': plan['uri']})
+
+
+def run(argv):
+    """Run `argv` as the solum shell does; returns the seconds it took."""
+    orig_argv, sys.argv = sys.argv, ['solum'] + argv
+    orig_stdout, sys.stdout = sys.stdout, six.StringIO()
+    try:
+        start = time.time()
+        solum.main()
+        return time.time() - start
+    finally:
+        sys.argv, sys.stdout = orig_argv, orig_stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY,
+                        help='Seconds each answer is delayed by '
+                             '(default: %(default)s)')
+    parser.add_argument('--plans', type=int, default=DEFAULT_PLANS,
+                        help='Plans in the fake API (default: %(default)s)')
+    parser.add_argument('--assemblies', type=int, default=DEFAULT_ASSEMBLIES,
+                        help='Assemblies per plan (default: %(default)s)')
+    parser.add_argument('--payload-bytes', type=int, default=0,
+                        help='Padding added to every resource answered '
+                             '(default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Take the best of this many runs '
+                             '(default: %(default)s)')
+    args = parser.parse_args()
+
+    with fake_api.FakeSolumAPI(latency=args.latency,
+                               payload_bytes=args.payload_bytes) as api:
+        fill(api, args.plans, args.assemblies)
+        for name in ['OS_USERNAME', 'OS_PASSWORD', 'OS_TENANT_NAME',
+                     'OS_AUTH_URL']:
+            os.environ.pop(name, None)
+        os.environ.update({'OS_AUTH_TOKEN': 'bench', 'SOLUM_URL': api.url})
+        for argv in COMMANDS:
+            del api.requests[:]
+            best = min(run(argv) for _ in range(args.repeat))
+            print('%-40s %8.1f ms %4d requests' % (
+                ' '.join(argv), best * 1e3, len(api.requests) // args.repeat))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
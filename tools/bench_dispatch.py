@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure how long the solum CLI takes to dispatch a command.
+
+Builds the command parser, parses a few typical command lines and runs
+their actions against a client that returns no resources, so only the
+CLI's own work is timed: no authentication and no HTTP requests.
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import timeit
+
+import six
+
+from solumclient.common import cli_utils
+from solumclient import solum
+
+COMMANDS = [
+    ['plan', 'list', '--format', 'value'],
+    ['--format', 'value', 'assembly', 'list'],
+    ['component', 'list', '--format', 'value', '--column', 'uuid'],
+    ['pipeline', 'list', '--format', 'value', '--os-username', 'other'],
+]
+DEFAULT_NUMBER = 200
+DEFAULT_REPEAT = 5
+
+
+class _EmptyClient(object):
+    """Stands for the API client; every list it returns is empty."""
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return []
+
+
+def dispatch(argv):
+    """Parse `argv` and run its action, as solum.main() does."""
+    parser = solum.build_parser(argv)
+    args, _ = parser.parse_known_args(argv, cli_utils.default_options())
+    command = parser.command_class(args, clients={'solum': _EmptyClient()})
+    if command.error is not None:
+        raise command.error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=DEFAULT_NUMBER,
+                        help='Commands dispatched per timing run '
+                             '(default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Take the best of this many runs '
+                             '(default: %(default)s)')
+    args = parser.parse_args()
+
+    os.environ.update({'OS_USERNAME': 'bench', 'OS_PASSWORD': 'bench',
+                       'OS_TENANT_NAME': 'bench',
+                       'OS_AUTH_URL': 'http://bench'})
+    orig, sys.stdout = sys.stdout, six.StringIO()
+    try:
+        results = []
+        for argv in COMMANDS:
+            best = min(timeit.repeat(lambda: dispatch(argv),
+                                     number=args.number,
+                                     repeat=args.repeat))
+            results.append((argv, best / args.number * 1e6))
+        build = min(timeit.repeat(lambda: solum.build_parser(COMMANDS[0]),
+                                  number=args.number, repeat=args.repeat))
+    finally:
+        sys.stdout = orig
+
+    for argv, usec in results:
+        print('%-60s %8.1f us' % (' '.join(argv), usec))
+    print('%-60s %8.1f us' % ('(building the parser alone)',
+                              build / args.number * 1e6))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Time the client's hot paths and compare them against a baseline.
+
+Measures CLI startup, loading and dumping plans of several sizes,
+building Resource objects for a long list, printing a long table, and
+finding, listing, getting and creating assemblies through the real
+client against solumclient.tests.fake_api, with no network.
+
+Each benchmark is timed as the best of --repeat runs, in seconds per
+operation, and its spread is how much slower the median run is than the
+best. Results are written as JSON with --output.
+
+Timings depend on the machine, so no baseline is kept in the tree: write
+one with --save-baseline, to tools/bench_baseline.json, which git
+ignores, then compare later runs on the same machine with it, e.g.
+`tox -e bench -- --baseline`. Any benchmark more than --tolerance slower
+than the baseline fails the run, unless its spread, now or in the
+baseline, is larger than the tolerance: such a benchmark is too noisy to
+tell and is only warned about.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+from solumclient import client
+from solumclient.common import formatutils
+from solumclient.common import yamlutils
+from solumclient.tests import fake_api
+from solumclient.v1 import assembly as v1_assembly
+
+# The other benchmarks of tools/, run from here.
+import bench_api
+import bench_table
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'bench_baseline.json')
+DEFAULT_REPEAT = 15
+# Fewer runs than this tell nothing of the spread.
+MIN_REPEAT = 3
+DEFAULT_TOLERANCE = 0.5
+
+# Artifacts in the plans loaded and dumped.
+PLAN_SIZES = (1, 10, 100)
+# Resources built, rows printed, and assemblies in the fake API.
+LIST_SIZE = 10000
+API_ASSEMBLIES = 500
+
+CLI_STARTUP = ('import sys\n'
+               'from solumclient import solum\n'
+               'sys.argv = ["solum", "help"]\n'
+               'solum.main()\n')
+
+
+def make_plan(artifacts):
+    return {
+        'version': 1,
+        'name': 'bench',
+        'description': 'A plan of %d artifacts.' % artifacts,
+        'artifacts': [{
+            'name': 'artifact%d' % number,
+            'artifact_type': 'heroku',
+            'content': {'href': 'https://example.com/app%d.git' % number,
+                        'private': False},
+            'language_pack': 'auto',
+            'run_cmd': 'python app.py --port 80',
+            'ports': [80, 443],
+        } for number in range(artifacts)],
+    }
+
+
+def cli_startup():
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call([sys.executable, '-c', CLI_STARTUP],
+                              stdout=devnull)
+
+
+def print_rows(rows):
+    orig, sys.stdout = sys.stdout, bench_table._NullOut()
+    try:
+        formatutils.print_list(rows, bench_table.FIELDS, sortby_index=5)
+    finally:
+        sys.stdout = orig
+
+
+def benchmarks(api):
+    """Yield (name, callable, operations per call) of each benchmark.
+
+    :param api: a running :class:`fake_api.FakeSolumAPI`, filled with
+        API_ASSEMBLIES assemblies
+    """
+    yield 'cli.startup', cli_startup, 1
+
+    for size in PLAN_SIZES:
+        plan = make_plan(size)
+        text = yamlutils.dump(plan)
+        yield ('yaml.load.%d_artifacts' % size,
+               lambda text=text: yamlutils.load(text), 1)
+        yield ('yaml.dump.%d_artifacts' % size,
+               lambda plan=plan: yamlutils.dump(plan), 1)
+
+    infos = [row._asdict() for row in bench_table.make_rows(LIST_SIZE)]
+    yield ('resource.build_%d' % LIST_SIZE,
+           lambda: [v1_assembly.Assembly(None, info, loaded=True)
+                    for info in infos], 1)
+
+    rows = bench_table.make_rows(LIST_SIZE)
+    yield 'table.print_list_%d' % LIST_SIZE, lambda: print_rows(rows), 1
+
+    solum = client.get_client('1', os_auth_token='bench',
+                              solum_url=api.url)
+    assemblies = solum.assemblies.list()
+    last = assemblies[-1]
+    yield ('api.find_by_name',
+           lambda: solum.assemblies.find(name_or_id=last.name), 1)
+    yield ('api.find_by_uuid',
+           lambda: solum.assemblies.find(name_or_id=last.uuid), 1)
+    yield 'api.list_%d' % API_ASSEMBLIES, solum.assemblies.list, 1
+    yield ('api.get_x10',
+           lambda: [solum.assemblies.get(assembly_id=a.uuid)
+                    for a in assemblies[:10]], 10)
+    yield ('api.create_x10',
+           lambda: [solum.assemblies.create(name='bench', plan_uri=last.uri)
+                    for _ in range(10)], 10)
+
+
+def run(repeat, only=None):
+    """Time each benchmark.
+
+    :returns: (results, spreads): the best seconds per operation of each
+        benchmark, and how much slower its median run was, e.g. 0.1 for
+        10%, both by name
+    """
+    results = {}
+    spreads = {}
+    with fake_api.FakeSolumAPI() as api:
+        bench_api.fill(api, API_ASSEMBLIES, 1)
+        for name, func, operations in benchmarks(api):
+            if only and not any(word in name for word in only):
+                continue
+            times = sorted(timeit.repeat(func, number=1, repeat=repeat))
+            results[name] = round(times[0] / operations, 7)
+            spreads[name] = round(times[len(times) // 2] / times[0] - 1, 3)
+            print('%-32s %12.6f s %7.0f%%' % (
+                name, results[name], spreads[name] * 100))
+    return results, spreads
+
+
+def compare(results, spreads, baseline, tolerance):
+    """Print how results changed since the baseline.
+
+    :param baseline: a report written by :func:`write_report`
+    :returns: (regressions, noisy): names of the benchmarks more than
+        `tolerance` slower, and of those with a spread over `tolerance`
+        now or in the baseline, which are never regressions
+    """
+    regressions = []
+    noisy = []
+    before = baseline['results']
+    before_spreads = baseline.get('spreads', {})
+    print('%-32s %12s %12s %8s %8s' % ('benchmark', 'baseline', 'now',
+                                       'change', 'spread'))
+    for name in sorted(results):
+        spread = max(spreads[name], before_spreads.get(name, 0))
+        if name not in before:
+            print('%-32s %12s %12.6f %8s %7.0f%%' % (
+                name, '-', results[name], '', spread * 100))
+            continue
+        change = results[name] / before[name] - 1
+        flag = ''
+        if spread > tolerance:
+            noisy.append(name)
+            flag = '  NOISY'
+        elif change > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print('%-32s %12.6f %12.6f %+7.0f%% %7.0f%%%s' % (
+            name, before[name], results[name], change * 100,
+            spread * 100, flag))
+    return regressions, noisy
+
+
+def environment():
+    """Return the platform and Python the timings are taken on."""
+    return {
+        'python': platform.python_version(),
+        'platform': '%s-%s' % (platform.system(), platform.machine()),
+    }
+
+
+def write_report(path, results, spreads):
+    report = environment()
+    report.update({
+        'unit': 'seconds per operation',
+        'results': results,
+        'spreads': spreads,
+    })
+    with open(path, 'w') as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+        output.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Take the best of this many runs, at least '
+                             '%d (default: %%(default)s)' % MIN_REPEAT)
+    parser.add_argument('--only', action='append',
+                        help='Only run the benchmarks whose name holds '
+                             'this; may be repeated')
+    parser.add_argument('--output',
+                        help='Write the results to this JSON file')
+    parser.add_argument('--baseline', nargs='?', const=BASELINE,
+                        help='Compare with the results in this JSON file '
+                             '(default: %s)' % os.path.relpath(BASELINE))
+    parser.add_argument('--tolerance', type=float,
+                        default=DEFAULT_TOLERANCE,
+                        help='Slowdown over the baseline taken as a '
+                             'regression, e.g. 0.5 for 50%%; benchmarks '
+                             'with a larger spread are only warned about '
+                             '(default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Write the results into %s, replacing those '
+                             'of the same benchmarks' %
+                             os.path.relpath(BASELINE))
+    args = parser.parse_args()
+    if args.repeat < MIN_REPEAT:
+        parser.error('--repeat must be at least %d' % MIN_REPEAT)
+
+    results, spreads = run(args.repeat, args.only)
+    if args.output:
+        write_report(args.output, results, spreads)
+    if args.save_baseline:
+        # Benchmarks left out with --only keep their baseline.
+        saved, saved_spreads = {}, {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE) as baseline:
+                baseline = json.load(baseline)
+            saved = baseline['results']
+            saved_spreads = baseline.get('spreads', {})
+        saved.update(results)
+        saved_spreads.update(spreads)
+        write_report(BASELINE, saved, saved_spreads)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            baseline = json.load(baseline)
+        print()
+        current = environment()
+        for key in sorted(current):
+            if baseline.get(key) != current[key]:
+                print('WARNING: the baseline %s is %s, not %s; timings '
+                      'may not compare.' % (key, baseline.get(key),
+                                            current[key]))
+        regressions, noisy = compare(results, spreads, baseline,
+                                     args.tolerance)
+        if noisy:
+            print('WARNING: %s vary more than the tolerance between runs; '
+                  'not compared (try a larger --repeat).' %
+                  ', '.join(noisy))
+        if regressions:
+            print('FAIL: %s slower than the baseline.' %
+                  ', '.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Measure how long printing a long list as a table takes.
+
+Renders the same rows, shaped like 'solum assembly list' output sorted
+by updated_at, with tableutils and with the PrettyTable based
+cliutils.print_list it replaced, discarding the output. Sampled tables
+start printing long before the last row is read.
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import sys
+import time
+
+from solumclient.common import formatutils
+from solumclient.openstack.common import cliutils
+
+DEFAULT_ROWS = 100000
+FIELDS = ['uuid', 'name', 'description', 'status', 'created_at',
+          'updated_at']
+Assembly = collections.namedtuple('Assembly', FIELDS)
+
+
+def make_rows(count):
+    return [Assembly('%08d-4f7c-4a3e-9c55-0123456789ab' % i,
+                     'app-%d' % i,
+                     'Assembly number %d' % i,
+                     ('READY', 'BUILDING', 'ERROR')[i % 3],
+                     '2014-06-%02dT10:00:00' % (i % 28 + 1),
+                     '2014-07-%02dT%02d:%02d:00' % (i % 28 + 1, i % 24,
+                                                    i % 60))
+            for i in range(count)]
+
+
+class _NullOut(object):
+    """Discards output, noting when the first of it was written."""
+
+    def __init__(self):
+        self.first_write = None
+
+    def write(self, data):
+        if self.first_write is None:
+            self.first_write = time.time()
+
+    def flush(self):
+        pass
+
+
+def timed(func):
+    """Return seconds until func's first output, and until it returned."""
+    sys.stdout = out = _NullOut()
+    start = time.time()
+    func()
+    end = time.time()
+    return out.first_write - start, end - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help='Rows in the table (default: %(default)s)')
+    parser.add_argument('--skip-prettytable', action='store_true',
+                        help='Only time tableutils')
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    results = []
+    orig = sys.stdout
+    try:
+        results.append(('tableutils, sorted', timed(
+            lambda: formatutils.print_list(rows, FIELDS, sortby_index=5))))
+        results.append(('tableutils, unsorted, sampled', timed(
+            lambda: formatutils.print_list(
+                rows, FIELDS, sortby_index=None,
+                sample=formatutils.TABLE_SAMPLE))))
+        if not args.skip_prettytable:
+            results.append(('cliutils.print_list (PrettyTable)', timed(
+                lambda: cliutils.print_list(rows, FIELDS, sortby_index=5))))
+    finally:
+        sys.stdout = orig
+
+    print('%-36s %12s %10s' % ('%d rows' % args.rows, 'first output',
+                               'total'))
+    for name, (first, total) in results:
+        print('%-36s %10.3f s %8.2f s' % (name, first, total))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
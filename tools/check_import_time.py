@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Fail if importing the solum CLI entry point takes too long.
+
+Runs ``python -X importtime -c 'import solumclient.solum'`` a few times
+and compares the best cumulative time of the entry point module against a
+threshold in milliseconds. Requires Python 3.7 or later.
+"""
+
+from __future__ import print_function
+
+import argparse
+import subprocess
+import sys
+
+MODULE = 'solumclient.solum'
+DEFAULT_THRESHOLD_MS = 150
+DEFAULT_RUNS = 5
+
+
+def import_time_us(module):
+    """Return the cumulative import time of `module` in microseconds."""
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        stderr=subprocess.STDOUT, universal_newlines=True)
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() == module:
+            return int(cumulative)
+    raise RuntimeError('No import time reported for %s.' % module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threshold', type=float,
+                        default=DEFAULT_THRESHOLD_MS,
+                        help='Maximum import time in milliseconds '
+                             '(default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help='Take the best of this many runs '
+                             '(default: %(default)s)')
+    args = parser.parse_args()
+
+    if sys.version_info < (3, 7):
+        print('-X importtime requires Python 3.7 or later.')
+        return 2
+
+    best = min(import_time_us(MODULE) for _ in range(args.runs)) / 1000.0
+    print('import %s: %.1f ms (threshold %.1f ms)' %
+          (MODULE, best, args.threshold))
+    if best > args.threshold:
+        print('FAIL: import time regression.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())